@@ -1,4 +1,4 @@
-from fastapi import FastAPI, APIRouter, HTTPException, BackgroundTasks
+from fastapi import FastAPI, APIRouter, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -6,11 +6,14 @@ import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
 import uuid
 from datetime import datetime, timezone
 import asyncio
 import json
+import math
+import numpy as np
+import pandas as pd
 from fastapi import WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse
 
@@ -18,14 +21,29 @@ from fastapi.responses import HTMLResponse
 from src.data_ingestion.exchange_collector import ExchangeDataCollector
 from src.data_ingestion.onchain_collector import OnChainCollector
 from src.data_ingestion.social_collector import SocialCollector
-from src.feature_engineering.market_features import MarketFeatureExtractor
+from src.feature_engineering.market_features import MarketFeatureExtractor, FEATURE_SET_VERSION
+from src.feature_engineering.feature_cache import FeatureCache
+from src.feature_engineering.multi_timeframe import MultiTimeframeFeatureBuilder
+from src.feature_engineering.feature_store import FeatureStore
+from src.feature_engineering.order_book_features import OrderBookHistory
 from src.feature_engineering.onchain_features import OnChainFeatureExtractor
 from src.feature_engineering.sentiment_features import SentimentFeatureExtractor
 from src.models.pump_detector import PumpDetectorModel
 from src.models.exit_predictor import ExitPredictorModel
 from src.models.signal_generator import SignalGenerator
+from src.models.model_registry import ModelRegistry
+from src.models.training_jobs import TrainingJobRunner, train_and_register, train_pooled_and_register
+from src.models.incremental import IncrementalUpdater
+from src.models.prediction_cache import PredictionCache
+from src.models.cascade import CascadeScreener
+from src.models.fused_scorer import FusedScorer
 from src.trading.portfolio import Portfolio
 from src.trading.risk_manager import RiskManager
+from src.trading.market_scanner import MarketScanner
+from src.trading.signal_stream import SignalStream
+from src.trading.portfolio_store import PortfolioStore
+from src.trading.backtester import Backtester
+from src.trading.parameter_sweep import ParameterSweep
 from src.ai_insights.insights_generator import AIInsightsGenerator
 
 ROOT_DIR = Path(__file__).parent
@@ -99,6 +117,176 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+# The event loop only keeps weak references to tasks, so hold background ones until they finish
+background_tasks: Set[asyncio.Task] = set()
+
+def run_in_background(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+# Services created in startup_event
+exchange_collector = None
+onchain_collector = None
+social_collector = None
+ai_insights = None
+
+# Feature extraction, models and trading state
+market_features = MarketFeatureExtractor()
+# Keep cached and stored feature matrices as float32 (computed in float64)
+use_compact_features = os.getenv('COMPACT_FEATURES', 'false').lower() == 'true'
+feature_cache = FeatureCache(
+    max_entries=int(os.getenv('FEATURE_CACHE_MAX_ENTRIES', '256')),
+    max_bytes=int(os.getenv('FEATURE_CACHE_MAX_MB', '256')) * 1024 * 1024,
+    compact=use_compact_features
+)
+feature_store = FeatureStore(
+    os.getenv('FEATURE_STORE_DIR', str(ROOT_DIR / 'data' / 'feature_store')),
+    compact=use_compact_features
+)
+use_multi_timeframe = os.getenv('USE_MULTI_TIMEFRAME_FEATURES', 'false').lower() == 'true'
+multi_timeframe_builder = MultiTimeframeFeatureBuilder(
+    market_features,
+    timeframes=os.getenv('MULTI_TIMEFRAMES', '5m,15m,1h').split(',')
+)
+use_cascade_screen = os.getenv('USE_CASCADE_SCREEN', 'false').lower() == 'true'
+# Every Nth cascaded batch also scores the screened-out symbols to measure recall (0 disables)
+cascade_audit_every = int(os.getenv('CASCADE_AUDIT_EVERY', '20'))
+cascade_screener = CascadeScreener(
+    window=int(os.getenv('CASCADE_WINDOW', '20')),
+    volume_ratio_threshold=float(os.getenv('CASCADE_VOLUME_RATIO', '1.5')),
+    return_z_threshold=float(os.getenv('CASCADE_RETURN_Z', '1.5'))
+)
+prediction_cache = PredictionCache(int(os.getenv('PREDICTION_CACHE_MAX_ENTRIES', '4096')))
+fused_scorer = FusedScorer(prediction_cache)
+model_registry = ModelRegistry(os.getenv('MODEL_REGISTRY_DIR', str(ROOT_DIR / 'data' / 'models')))
+training_jobs = TrainingJobRunner(max_workers=int(os.getenv('TRAINING_WORKERS', '1')))
+# 'walk_forward', 'purged_kfold' or 'none'
+training_validation = os.getenv('TRAINING_VALIDATION', 'walk_forward')
+training_validation = None if training_validation == 'none' else training_validation
+# Retrain on the top-k important features within FEATURE_PRUNING_TOLERANCE of validation PR-AUC
+training_feature_selection = {
+    'tolerance': float(os.getenv('FEATURE_PRUNING_TOLERANCE', '0.01'))
+} if os.getenv('FEATURE_PRUNING', 'false').lower() == 'true' else None
+use_incremental_updates = os.getenv('INCREMENTAL_UPDATES', 'false').lower() == 'true'
+incremental_symbol = os.getenv('INCREMENTAL_SYMBOL', 'BTC/USDT')
+incremental_updater = IncrementalUpdater(
+    trees_per_update=int(os.getenv('INCREMENTAL_TREES_PER_UPDATE', '5')),
+    rebuild_every=int(os.getenv('INCREMENTAL_REBUILD_EVERY', '96')),
+    rebuild_cooldown=float(os.getenv('INCREMENTAL_REBUILD_COOLDOWN', '300'))
+)
+incremental_rebuild_job = None  # job_id of the full rebuild started by the update loop
+pump_detector = PumpDetectorModel()
+exit_predictor = ExitPredictorModel()
+signal_generator = SignalGenerator()
+portfolio = Portfolio()
+risk_manager = RiskManager()
+# Trades are journaled to Mongo in the background and restored at startup
+use_portfolio_persistence = os.getenv('PORTFOLIO_PERSISTENCE', 'true').lower() == 'true'
+portfolio_restore_timeout = float(os.getenv('PORTFOLIO_RESTORE_TIMEOUT', '10'))
+portfolio_store = PortfolioStore(
+    db,
+    flush_interval=float(os.getenv('PORTFOLIO_FLUSH_INTERVAL', '1.0')),
+    snapshot_every=int(os.getenv('PORTFOLIO_SNAPSHOT_EVERY', '100')),
+    snapshot_interval=float(os.getenv('PORTFOLIO_SNAPSHOT_INTERVAL', '60'))
+)
+
+def get_cached_features(symbol: str, timeframe: str, df, columns: List[str] = None):
+    """Extract market features, reusing the cached frame while the candles are unchanged.
+
+    When columns is given only those features (and their inputs) are computed.
+    """
+    feature_set = FEATURE_SET_VERSION if columns is None else (FEATURE_SET_VERSION, tuple(columns))
+    return feature_cache.get_or_compute(
+        symbol,
+        timeframe,
+        df,
+        lambda candles: market_features.extract_features(candles, columns),
+        feature_set
+    )
+
+def serving_models() -> Dict:
+    """The serving models, read once on the event loop thread.
+
+    Work that runs in a worker thread takes this dict as an argument instead
+    of reading the model globals, so a hot swap mid-evaluation cannot mix
+    versions or race the loop.
+    """
+    return {'pump_detector': pump_detector, 'exit_predictor': exit_predictor}
+
+def get_inference_columns(models: Dict) -> Optional[List[str]]:
+    """Feature columns needed by the trained models, or None to compute everything."""
+    columns = []
+    for model in models.values():
+        if model.model is None:
+            return None
+        columns.extend(col for col in model.feature_columns if col not in columns)
+    # Used for the volume surge bonus in opportunity scoring
+    if 'volume_ratio' not in columns:
+        columns.append('volume_ratio')
+    return columns
+
+async def get_symbol_features(symbol: str, limit: int = 500, models: Dict = None):
+    """Fetch 1m candles for a symbol and return its model-ready feature frame."""
+    models = models or serving_models()
+    df = await exchange_collector.fetch_ohlcv(symbol, '1m', limit)
+    return features_from_candles(symbol, df, models)
+
+def features_from_candles(symbol: str, df, models: Dict):
+    """Model-ready feature frame for already fetched 1m candles."""
+    if df.empty:
+        return df
+    if use_multi_timeframe:
+        return get_multi_timeframe_features(symbol, df)
+    return get_cached_features(symbol, '1m', df, get_inference_columns(models))
+
+def score_feature_rows(rows, models: Dict, index=None):
+    """Score stacked feature rows with both models over one shared feature matrix.
+
+    Returns a frame with pump_detector and exit_predictor probability
+    columns, labelled by index (e.g. symbols). Untrained models score 0.5,
+    matching the single-symbol endpoint.
+    """
+    if 'timestamp' in rows.columns and len(rows):
+        prediction_cache.observe_candle(rows['timestamp'].max())
+    
+    return fused_scorer.score(rows, models, index=index)
+
+def swap_models(new_pump_detector: PumpDetectorModel = None, new_exit_predictor: ExitPredictorModel = None):
+    """Hot-swap the serving models.
+
+    Must run on the event loop thread: handlers read the model globals without
+    awaiting in between, so a request sees either the old or the new model.
+    """
+    global pump_detector, exit_predictor
+    if new_pump_detector is not None or new_exit_predictor is not None:
+        prediction_cache.clear()
+    if new_pump_detector is not None:
+        pump_detector = new_pump_detector
+        logger.info(f"Serving pump detector version {new_pump_detector.version}")
+    if new_exit_predictor is not None:
+        exit_predictor = new_exit_predictor
+        logger.info(f"Serving exit predictor version {new_exit_predictor.version}")
+
+def load_active_models() -> Dict:
+    """Load the active registry version of each model (None if never registered)."""
+    loaded = {}
+    for name in ('pump_detector', 'exit_predictor'):
+        try:
+            loaded[name] = model_registry.load(name)
+        except Exception as e:
+            logger.error(f"Error loading active {name}: {e}")
+            loaded[name] = None
+    return loaded
+
+def get_multi_timeframe_features(symbol: str, df, builder: MultiTimeframeFeatureBuilder = None):
+    """Fold closed 1m candles into the builder and return aligned multi-timeframe features."""
+    builder = builder or multi_timeframe_builder
+    # The last candle from the exchange is still forming
+    builder.update(symbol, df.iloc[:-1])
+    return builder.build_features(symbol)
+
 # Pydantic Models
 class ConfigUpdate(BaseModel):
     binance_api_key: Optional[str] = None
@@ -120,6 +308,10 @@ class SignalRequest(BaseModel):
     symbol: str
     keywords: Optional[List[str]] = None
 
+class BatchSignalRequest(BaseModel):
+    symbols: List[str]
+    cascade: Optional[bool] = None  # Defaults to USE_CASCADE_SCREEN
+
 class TradeRequest(BaseModel):
     symbol: str
     action: str
@@ -137,6 +329,18 @@ async def startup_event():
     global exchange_collector, onchain_collector, social_collector, ai_insights
     
     try:
+        # Load registered models before serving anything
+        loaded = await asyncio.to_thread(load_active_models)
+        swap_models(loaded['pump_detector'], loaded['exit_predictor'])
+        
+        if use_portfolio_persistence:
+            try:
+                await asyncio.wait_for(portfolio_store.restore(portfolio), timeout=portfolio_restore_timeout)
+                portfolio_store.start()
+            except Exception as e:
+                # Journaling without the stored sequence would clash with it, so stay in memory only
+                logger.error(f"Error restoring portfolio, persistence disabled: {e}")
+        
         # Initialize exchange collector
         binance_key = os.getenv('BINANCE_API_KEY')
         binance_secret = os.getenv('BINANCE_API_SECRET')
@@ -174,9 +378,17 @@ async def startup_event():
             logger.warning("EMERGENT_LLM_KEY not found, AI insights disabled")
         
         # Start real-time data broadcasting
-        asyncio.create_task(broadcast_realtime_data())
+        run_in_background(broadcast_realtime_data())
         logger.info("Real-time data broadcasting started")
         
+        if use_market_scanner:
+            market_scanner.start()
+            logger.info(f"Market scanner started for {len(market_scanner.universe)} symbols")
+        
+        if use_incremental_updates:
+            run_in_background(incremental_update_loop())
+            logger.info(f"Incremental model updates started for {incremental_symbol}")
+        
     except Exception as e:
         logger.error(f"Error during startup: {e}")
 
@@ -253,7 +465,7 @@ async def get_market_data(request: MarketDataRequest):
         if df.empty:
             raise HTTPException(status_code=404, detail="No data found")
         
-        df = market_features.extract_all_features(df)
+        df = get_cached_features(request.symbol, request.timeframe, df)
         data = df.tail(50).to_dict('records')
         
         for record in data:
@@ -270,30 +482,51 @@ async def get_market_data(request: MarketDataRequest):
         logger.error(f"Error fetching market data: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.post("/market/multi-timeframe")
+async def get_multi_timeframe_data(request: MarketDataRequest):
+    """Get the latest aligned multi-timeframe feature row, resampled from 1m candles."""
+    try:
+        df = await exchange_collector.fetch_ohlcv(request.symbol, '1m', request.limit)
+        
+        if df.empty:
+            raise HTTPException(status_code=404, detail="No data found")
+        
+        features = get_multi_timeframe_features(request.symbol, df)
+        if features.empty:
+            raise HTTPException(status_code=404, detail="Not enough closed candles")
+        
+        record = features.iloc[-1].to_dict()
+        record['timestamp'] = record['timestamp'].isoformat()
+        
+        return {
+            "symbol": request.symbol,
+            "timeframes": ['1m'] + multi_timeframe_builder.timeframes,
+            "features": {
+                k: None if isinstance(v, float) and math.isnan(v) else v
+                for k, v in record.items()
+            }
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error building multi-timeframe features: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @api_router.post("/signals/generate")
 async def generate_signal(request: SignalRequest):
     """Generate trading signal for a symbol."""
     try:
-        df = await exchange_collector.fetch_ohlcv(request.symbol, '1m', 500)
+        models = serving_models()
+        df = await get_symbol_features(request.symbol, models=models)
         
         if df.empty:
             raise HTTPException(status_code=404, detail="No market data available")
         
-        df = market_features.extract_all_features(df)
         current_features = df.tail(1)
-        
-        pump_prob = 0.5
-        exit_prob = 0.5
-        
-        if pump_detector.model is not None:
-            pump_probs = pump_detector.predict_proba(current_features)
-            if pump_probs is not None:
-                pump_prob = float(pump_probs[0])
-        
-        if exit_predictor.model is not None:
-            exit_probs = exit_predictor.predict_proba(current_features)
-            if exit_probs is not None:
-                exit_prob = float(exit_probs[0])
+        scores = score_feature_rows(current_features, models)
+        pump_prob = float(scores['pump_detector'].iloc[0])
+        exit_prob = float(scores['exit_predictor'].iloc[0])
         
         has_position = request.symbol in portfolio.positions
         
@@ -337,6 +570,293 @@ async def generate_signal(request: SignalRequest):
         logger.error(f"Error generating signal: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.post("/signals/batch")
+async def generate_signals_batch(request: BatchSignalRequest):
+    """Generate trading signals for many symbols with one model call per model."""
+    max_symbols = int(os.getenv('MAX_BATCH_SYMBOLS', '200'))
+    if len(request.symbols) > max_symbols:
+        raise HTTPException(status_code=400, detail=f"At most {max_symbols} symbols per batch")
+    
+    try:
+        symbols = list(dict.fromkeys(request.symbols))
+        cascade = use_cascade_screen if request.cascade is None else request.cascade
+        candles = await fetch_universe_candles(symbols)
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            **(await asyncio.to_thread(evaluate_candles, candles, serving_models(), cascade))
+        }
+    
+    except Exception as e:
+        logger.error(f"Error generating batch signals: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def fetch_universe_candles(symbols: List[str], limit: int = 500) -> Dict:
+    """Fetch 1m candles for many symbols concurrently, keyed by symbol."""
+    frames = await asyncio.gather(*(exchange_collector.fetch_ohlcv(symbol, '1m', limit) for symbol in symbols))
+    return dict(zip(symbols, frames))
+
+def evaluate_candles(
+    candles: Dict,
+    models: Dict,
+    cascade: bool = False,
+    top_n: int = None,
+    include: List[str] = ()
+) -> Dict:
+    """Signals for every symbol's candles, ranked by opportunity score.
+
+    With cascade, only symbols passing the pre-screen get features and
+    model scores. With top_n, only the top_n by score plus every buy/sell
+    and every symbol in include are emitted. Used by the batch endpoint
+    and the market scanner, both from a worker thread: models comes from
+    serving_models(), and the shared feature builder, scorer and cascade
+    screen lock their own state.
+    """
+    missing = [symbol for symbol, df in candles.items() if df.empty]
+    screened_out = []
+    if cascade:
+        passed, screened_out, _ = cascade_screener.screen(
+            {symbol: df for symbol, df in candles.items() if not df.empty}
+        )
+        audit_cascade(candles, passed, screened_out, models)
+    else:
+        passed = [symbol for symbol, df in candles.items() if not df.empty]
+    
+    scored = [(symbol, features_from_candles(symbol, candles[symbol], models)) for symbol in passed]
+    missing.extend(symbol for symbol, df in scored if df.empty)
+    scored = [(symbol, df) for symbol, df in scored if not df.empty]
+    
+    if not scored:
+        return {"signals": [], "missing": missing, "screened_out": screened_out}
+    
+    rows = pd.concat([df.tail(1) for _, df in scored], ignore_index=True)
+    scores = score_feature_rows(rows, models)
+    symbols = [symbol for symbol, _ in scored]
+    pump_probs = scores['pump_detector'].to_numpy()
+    exit_probs = scores['exit_predictor'].to_numpy()
+    has_position = np.array([symbol in portfolio.positions for symbol in symbols])
+    volume_ratio = rows['volume_ratio'].to_numpy() if 'volume_ratio' in rows.columns else np.ones(len(rows))
+    
+    results = signal_generator.generate_signals(
+        pump_probs,
+        exit_probs,
+        has_position,
+        sentiment_scores=0.0,
+        volume_surge=volume_ratio > 2.0
+    )
+    
+    order = np.argsort(-results['score'], kind='stable')
+    if top_n is not None:
+        emitted = np.zeros(len(order), dtype=bool)
+        emitted[order[:top_n]] = True
+        emitted |= results['action'] != signal_generator.HOLD
+        emitted |= np.isin(symbols, list(include))
+        order = order[emitted[order]]
+    
+    close = rows['close'].to_numpy()
+    signals = [
+        {
+            "symbol": symbols[i],
+            "signal": signal_generator.format_signal(results, i, pump_probs[i], exit_probs[i]),
+            "current_price": float(close[i]),
+            "opportunity_score": float(results['score'][i]),
+            "has_position": bool(has_position[i])
+        }
+        for i in order
+    ]
+    return {"signals": signals, "missing": missing, "screened_out": screened_out}
+
+async def scan_universe(symbols: List[str]) -> Dict:
+    """Scanner evaluation: fetch on the loop, features and models in a worker thread.
+
+    Symbols with websocket signal subscribers are always evaluated and emitted.
+    """
+    subscribed = signal_stream.symbols()
+    candles = await fetch_universe_candles(list(dict.fromkeys(symbols + subscribed)))
+    result = await asyncio.to_thread(
+        evaluate_candles, candles, serving_models(), use_cascade_screen, scanner_top_n, subscribed
+    )
+    if use_order_book_features:
+        await attach_order_book_features(result['signals'])
+    return result
+
+async def attach_order_book_features(signals: List[Dict]):
+    """Record an order book snapshot for every emitted signal and attach its order-flow features."""
+    symbols = [item['symbol'] for item in signals]
+    books = await asyncio.gather(*(exchange_collector.fetch_order_book(symbol, order_book_depth) for symbol in symbols))
+    recorded = [symbol for symbol, book in zip(symbols, books) if order_book_history.record(symbol, book)]
+    latest = await asyncio.to_thread(lambda: {symbol: order_book_history.latest(symbol) for symbol in recorded})
+    for item in signals:
+        if latest.get(item['symbol']) is not None:
+            item['order_book'] = latest[item['symbol']]
+
+use_market_scanner = os.getenv('MARKET_SCANNER', 'true').lower() == 'true'
+# Order book snapshots for scanned signals, kept as a history for order-flow features
+use_order_book_features = os.getenv('ORDER_BOOK_FEATURES', 'false').lower() == 'true'
+order_book_depth = int(os.getenv('ORDER_BOOK_DEPTH', '20'))
+order_book_history = OrderBookHistory(
+    max_snapshots=int(os.getenv('ORDER_BOOK_HISTORY', '1440')),
+    levels=order_book_depth
+)
+# Signals kept per scan beyond every buy/sell (0 keeps all)
+scanner_top_n = int(os.getenv('SCANNER_TOP_N', '100')) or None
+market_scanner = MarketScanner(
+    scan_universe,
+    universe=os.getenv('SCANNER_SYMBOLS', 'BTC/USDT,ETH/USDT,SOL/USDT,DOGE/USDT,SHIB/USDT').split(','),
+    close_delay=float(os.getenv('SCANNER_CLOSE_DELAY', '2'))
+)
+
+signal_stream = SignalStream(bucket_size=float(os.getenv('SIGNAL_CONFIDENCE_BUCKET', '0.1')))
+max_signal_subscriptions = int(os.getenv('MAX_SIGNAL_SUBSCRIPTIONS', '50'))
+
+async def send_signal_message(websocket: WebSocket, message: str):
+    try:
+        await websocket.send_text(message)
+    except Exception:
+        manager.disconnect(websocket)
+        signal_stream.unsubscribe(websocket)
+
+async def push_signal_changes(snapshot: Dict):
+    """Push symbols whose action or confidence bucket changed to their subscribers."""
+    await signal_stream.publish(snapshot, send_signal_message)
+
+market_scanner.add_listener(push_signal_changes)
+
+def audit_cascade(candles: Dict, passed: List[str], screened_out: List[str], models: Dict):
+    """On every cascade_audit_every-th batch, score the screened-out symbols too and record recall.
+
+    A symbol counts as positive when the full pump model alone would reach
+    the buy threshold, i.e. what the uncascaded run would have flagged.
+    """
+    if not cascade_screener.audit_due(cascade_audit_every) or models['pump_detector'].model is None:
+        return
+    
+    try:
+        frames = [(symbol, features_from_candles(symbol, candles[symbol], models)) for symbol in passed + screened_out]
+        frames = [(symbol, df) for symbol, df in frames if not df.empty]
+        if not frames:
+            return
+        rows = pd.concat([df.tail(1) for _, df in frames], ignore_index=True)
+        scores = score_feature_rows(rows, models, index=[symbol for symbol, _ in frames])
+        positives = list(scores.index[scores['pump_detector'] >= signal_generator.pump_threshold])
+        cascade_screener.record_audit(passed, positives)
+    
+    except Exception as e:
+        logger.error(f"Error auditing cascade screen: {e}")
+
+class BacktestRequest(BaseModel):
+    symbol: str
+    timeframe: str = '1m'
+    start: Optional[str] = None  # ISO date, inclusive
+    end: Optional[str] = None  # ISO date, exclusive
+    initial_cash: float = 10000.0
+    fee_rate: float = 0.001
+
+class SweepRequest(BacktestRequest):
+    grid: Dict[str, List[float]]  # SignalGenerator / RiskManager parameter -> values
+    max_workers: Optional[int] = None
+
+def load_backtest_data(request: BacktestRequest):
+    """Stored feature rows for a backtest window, plus one earlier day to warm up indicators."""
+    partitions = feature_store.list_partitions(request.symbol, request.timeframe)
+    if request.end:
+        partitions = [p for p in partitions if p < request.end[:10]]
+    if request.start:
+        first = next((i for i, p in enumerate(partitions) if p >= request.start[:10]), len(partitions))
+        partitions = partitions[max(0, first - 1):]
+    
+    data = feature_store.load(request.symbol, request.timeframe, partitions)
+    if data.empty:
+        raise HTTPException(status_code=404, detail=f"No stored candles for {request.symbol}")
+    return data
+
+@api_router.post("/backtest")
+async def run_backtest(request: BacktestRequest):
+    """Backtest the serving models on candles stored in the feature store."""
+    if pump_detector.model is None or exit_predictor.model is None:
+        raise HTTPException(status_code=400, detail="Models are not trained")
+    
+    try:
+        data = load_backtest_data(request)
+        backtester = Backtester(
+            pump_detector,
+            exit_predictor,
+            market_features,
+            signal_generator,
+            initial_cash=request.initial_cash,
+            fee_rate=request.fee_rate
+        )
+        result = await asyncio.to_thread(backtester.run, data, request.symbol, request.start, request.end)
+        
+        equity = result['equity'].resample('1h').last().dropna()
+        return {
+            "symbol": result['symbol'],
+            "start": result['start'],
+            "end": result['end'],
+            "metrics": {k: float(v) if isinstance(v, (np.floating, np.integer)) else v for k, v in result['metrics'].items()},
+            "trades": [
+                {
+                    **trade,
+                    "timestamp": trade['timestamp'].isoformat(),
+                    "quantity": float(trade['quantity']),
+                    "price": float(trade['price']),
+                    "pnl": float(trade['pnl']),
+                    "pnl_pct": float(trade['pnl_pct'])
+                }
+                for trade in result['trades']
+            ],
+            "equity": [{"timestamp": ts.isoformat(), "value": float(v)} for ts, v in equity.items()]
+        }
+    
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error running backtest: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.post("/backtest/sweep")
+async def run_backtest_sweep(request: SweepRequest):
+    """Backtest every grid combination in parallel processes; poll the returned job for the result table."""
+    if pump_detector.model is None or exit_predictor.model is None:
+        raise HTTPException(status_code=400, detail="Models are not trained")
+    
+    try:
+        combinations = ParameterSweep.expand_grid(request.grid)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    max_combinations = int(os.getenv('MAX_SWEEP_COMBINATIONS', '1000'))
+    if len(combinations) > max_combinations:
+        raise HTTPException(status_code=400, detail=f"At most {max_combinations} combinations per sweep")
+    
+    data = load_backtest_data(request)
+    job = training_jobs.create_job('sweep', request.model_dump())
+    run_in_background(run_sweep_job(job['job_id'], request, data))
+    return {"status": "sweep_started", "combinations": len(combinations), "job_id": job['job_id']}
+
+async def run_sweep_job(job_id: str, request: SweepRequest, data):
+    """Prepare bars once with the serving models, then run the sweep off the event loop."""
+    try:
+        training_jobs.update(job_id, status='running', stage='preparing')
+        models = serving_models()
+        backtester = Backtester(models['pump_detector'], models['exit_predictor'], market_features)
+        bars = await asyncio.to_thread(backtester.prepare, data)
+        if request.start:
+            bars = bars[bars['timestamp'] >= pd.Timestamp(request.start)]
+        if request.end:
+            bars = bars[bars['timestamp'] < pd.Timestamp(request.end)]
+        
+        def progress(done: int, total: int):
+            training_jobs.update(job_id, stage='backtesting', progress=done / total)
+        
+        sweep = ParameterSweep(request.max_workers, request.initial_cash, request.fee_rate)
+        table = await asyncio.to_thread(sweep.run, bars.reset_index(drop=True), request.grid, request.symbol, progress)
+        training_jobs.complete(job_id, {"results": table.to_dict(orient='records')})
+    
+    except Exception as e:
+        logger.error(f"Error in sweep job {job_id}: {e}")
+        training_jobs.fail(job_id, str(e))
+
 @api_router.post("/trade/execute")
 async def execute_trade(request: TradeRequest):
     """Execute a trade (paper trading)."""
@@ -414,6 +934,11 @@ async def get_portfolio():
         logger.error(f"Error getting portfolio: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.get("/portfolio/persistence/stats")
+async def get_portfolio_persistence_stats():
+    """Get portfolio journal and snapshot status."""
+    return {"enabled": use_portfolio_persistence, **portfolio_store.get_stats()}
+
 @api_router.post("/ai/analyze")
 async def get_ai_analysis(request: AIAnalysisRequest):
     """Get AI-powered analysis."""
@@ -443,6 +968,96 @@ async def get_ai_analysis(request: AIAnalysisRequest):
         logger.error(f"Error getting AI analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.get("/features/cache/stats")
+async def get_feature_cache_stats():
+    """Get feature cache hit rates and memory usage."""
+    return feature_cache.get_stats()
+
+class CascadeCalibrateRequest(BaseModel):
+    symbols: List[str]
+    limit: int = 5000
+    target_recall: float = 0.95
+
+@api_router.get("/signals/snapshot")
+async def get_signal_snapshot(symbol: Optional[str] = None):
+    """Get the latest market scan, or one symbol's entry in it."""
+    if symbol is None:
+        return market_scanner.snapshot
+    item = market_scanner.get_signal(symbol)
+    if item is None:
+        raise HTTPException(status_code=404, detail=f"{symbol} not in the latest scan")
+    return item
+
+@api_router.get("/signals/scanner/stats")
+async def get_scanner_stats():
+    """Get market scanner status and timing."""
+    return {
+        "enabled": use_market_scanner,
+        **market_scanner.get_stats(),
+        "stream": signal_stream.get_stats(),
+        "order_book": {"enabled": use_order_book_features, **order_book_history.get_stats()}
+    }
+
+@api_router.get("/orderbook/features")
+async def get_order_book_features(symbol: str, limit: Optional[int] = None):
+    """Order-flow features for a symbol's recorded order book snapshots, oldest first."""
+    features = await asyncio.to_thread(order_book_history.features, symbol, limit)
+    if features.empty:
+        raise HTTPException(status_code=404, detail=f"No order book snapshots recorded for {symbol}")
+    features['timestamp'] = features['timestamp'].map(lambda ts: ts.isoformat())
+    return {
+        "symbol": symbol,
+        "features": features.astype(object).where(features.notna(), None).to_dict('records')
+    }
+
+@api_router.get("/models/cascade/stats")
+async def get_cascade_stats():
+    """Get cascade pre-screen pass rate and audited recall."""
+    return {"enabled": use_cascade_screen, **cascade_screener.get_stats()}
+
+@api_router.post("/models/cascade/calibrate")
+async def calibrate_cascade(request: CascadeCalibrateRequest):
+    """Fit the pre-screen thresholds to keep target_recall of historical pump labels."""
+    try:
+        frames = await asyncio.gather(
+            *(exchange_collector.fetch_ohlcv(symbol, '1m', request.limit) for symbol in request.symbols)
+        )
+        stats, labels = [], []
+        for df in frames:
+            if df.empty:
+                continue
+            future_return = df['close'].shift(-pump_detector.lookahead_period) / df['close'] - 1
+            stats.append(cascade_screener.rolling_stats(df))
+            labels.append((future_return >= pump_detector.pump_threshold).astype(float).where(future_return.notna()))
+        
+        if not stats:
+            raise HTTPException(status_code=404, detail="No market data for calibration")
+        
+        return cascade_screener.calibrate(
+            pd.concat(stats, ignore_index=True),
+            pd.concat(labels, ignore_index=True),
+            request.target_recall
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error calibrating cascade screen: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/models/prediction-cache/stats")
+async def get_prediction_cache_stats():
+    """Get prediction cache hit/miss statistics."""
+    return prediction_cache.get_stats()
+
+@api_router.get("/features/store/stats")
+async def get_feature_store_stats():
+    """Get stored feature partitions per symbol and timeframe."""
+    return {
+        "feature_set_version": feature_store.version,
+        "partitions": feature_store.get_stats()
+    }
+
 @api_router.get("/markets/list")
 async def list_markets():
     """Get list of available markets."""
@@ -458,44 +1073,249 @@ async def list_markets():
         logger.error(f"Error listing markets: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+class PooledTrainRequest(BaseModel):
+    symbols: List[str]
+    limit: int = 5000
+    validation_fraction: float = 0.1
+
+class ModelActivateRequest(BaseModel):
+    model: str
+    version: str
+
+@api_router.get("/models/versions")
+async def list_model_versions():
+    """List registered model versions and which ones are serving."""
+    try:
+        return {
+            name: {
+                "active": model_registry.get_active_version(name),
+                "serving": model.version,
+                "versions": model_registry.list_versions(name)
+            }
+            for name, model in (('pump_detector', pump_detector), ('exit_predictor', exit_predictor))
+        }
+    
+    except Exception as e:
+        logger.error(f"Error listing model versions: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.post("/models/activate")
+async def activate_model_version(request: ModelActivateRequest):
+    """Activate a registered version and hot-swap it into serving."""
+    try:
+        model = await asyncio.to_thread(model_registry.load, request.model, request.version)
+        model_registry.activate(request.model, request.version)
+        
+        if request.model == 'pump_detector':
+            swap_models(new_pump_detector=model)
+        else:
+            swap_models(new_exit_predictor=model)
+        
+        return {"status": "success", "model": request.model, "version": request.version}
+    
+    except (ValueError, FileNotFoundError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error activating model: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @api_router.post("/models/train")
-async def train_models(background_tasks: BackgroundTasks, symbol: str = "BTC/USDT"):
-    """Train ML models with historical data."""
+async def train_models(
+    symbol: str = "BTC/USDT",
+    search: bool = False,
+    search_budget_seconds: float = 300,
+    prune_features: Optional[bool] = None,
+    prune_tolerance: float = 0.01
+):
+    """Train ML models with historical data in a worker process.
+
+    With search=true each model's hyperparameters are tuned first, within
+    search_budget_seconds per model. With prune_features=true (default
+    FEATURE_PRUNING) each model keeps only its top-k features that stay
+    within prune_tolerance of the full model's validation PR-AUC.
+    """
     try:
-        background_tasks.add_task(train_models_background, symbol)
-        return {"status": "training_started", "symbol": symbol}
+        search_options = {"budget_seconds": search_budget_seconds} if search else None
+        if prune_features is None:
+            feature_selection = training_feature_selection
+        else:
+            feature_selection = {"tolerance": prune_tolerance} if prune_features else None
+        job = start_training_job(symbol, search_options, feature_selection)
+        return {"status": "training_started", "symbol": symbol, "job_id": job['job_id']}
     
     except Exception as e:
         logger.error(f"Error starting model training: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-async def train_models_background(symbol: str):
-    """Background task to train models."""
+@api_router.post("/models/train/pooled")
+async def train_models_pooled(request: PooledTrainRequest):
+    """Train both models on many symbols, streaming stored feature partitions."""
     try:
-        logger.info(f"Starting model training for {symbol}")
+        job = training_jobs.create_job('train_pooled', request.model_dump())
+        run_in_background(run_pooled_training_job(job['job_id'], request))
+        return {"status": "training_started", "symbols": request.symbols, "job_id": job['job_id']}
+    
+    except Exception as e:
+        logger.error(f"Error starting pooled model training: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/models/incremental/stats")
+async def get_incremental_stats():
+    """Get incremental update window and per-model update counters."""
+    return {
+        "enabled": use_incremental_updates,
+        "symbol": incremental_symbol,
+        **incremental_updater.get_stats()
+    }
+
+@api_router.get("/models/jobs")
+async def list_training_jobs():
+    """List training jobs, newest first."""
+    return {"jobs": training_jobs.list_jobs()}
+
+@api_router.get("/models/jobs/{job_id}")
+async def get_training_job(job_id: str):
+    """Get a training job's status and progress."""
+    job = training_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown training job: {job_id}")
+    return job
+
+def start_training_job(symbol: str, search_options: Dict = None, feature_selection: Dict = None) -> Dict:
+    """Queue a full training job and run it in the background."""
+    job = training_jobs.create_job('train', {
+        "symbol": symbol,
+        "search": search_options,
+        "feature_selection": feature_selection
+    })
+    run_in_background(run_training_job(job['job_id'], symbol, search_options, feature_selection))
+    return job
+
+async def run_training_job(job_id: str, symbol: str, search_options: Dict = None, feature_selection: Dict = None):
+    """Fetch data, train in a worker process and hot-swap the new models.
+
+    Feature extraction and fitting run in the process pool, so the event loop
+    keeps serving requests and websocket updates while a job runs.
+    """
+    try:
+        logger.info(f"Starting model training for {symbol} (job {job_id})")
+        training_jobs.update(job_id, stage='fetching_data')
         
         df = await exchange_collector.fetch_ohlcv(symbol, '1m', 5000)
         
         if df.empty:
+            training_jobs.fail(job_id, "No data for training")
             logger.error("No data for training")
             return
         
-        df = market_features.extract_all_features(df)
-        
-        X_train, X_test, y_train, y_test = pump_detector.prepare_training_data(df)
-        if X_train is not None:
-            pump_detector.train(X_train, y_train, X_test, y_test)
-            logger.info("Pump detector trained successfully")
+        config = {
+            "registry_dir": str(model_registry.root),
+            "feature_store_dir": str(feature_store.root),
+            "compact_features": use_compact_features,
+            "use_multi_timeframe": use_multi_timeframe,
+            "timeframes": multi_timeframe_builder.timeframes,
+            "validation": training_validation,
+            "search": search_options,
+            "feature_selection": feature_selection
+        }
+        result = await training_jobs.run_in_process(job_id, train_and_register, symbol, df, config)
         
-        X_train, X_test, y_train, y_test = exit_predictor.prepare_training_data(df)
-        if X_train is not None:
-            exit_predictor.train(X_train, y_train, X_test, y_test)
-            logger.info("Exit predictor trained successfully")
+        # Load in a thread, then activate and swap on the loop thread
+        await activate_trained_versions(job_id, result)
         
     except Exception as e:
+        training_jobs.fail(job_id, str(e))
         logger.error(f"Error in background training: {e}")
 
 
+async def activate_trained_versions(job_id: str, result: Dict):
+    """Load newly registered versions, activate them and hot-swap them in."""
+    training_jobs.update(job_id, stage='loading_models')
+    versions = result['versions']
+    loaded = {}
+    for name, version in versions.items():
+        loaded[name] = await asyncio.to_thread(model_registry.load, name, version)
+    for name, version in versions.items():
+        model_registry.activate(name, version)
+    swap_models(loaded.get('pump_detector'), loaded.get('exit_predictor'))
+    training_jobs.complete(job_id, result)
+    logger.info(f"Training job {job_id} finished: {versions}")
+
+async def run_pooled_training_job(job_id: str, request: PooledTrainRequest):
+    """Store features for every symbol, then train on all stored days out of core."""
+    try:
+        training_jobs.update(job_id, stage='fetching_data')
+        for i, symbol in enumerate(request.symbols):
+            df = await exchange_collector.fetch_ohlcv(symbol, '1m', request.limit)
+            if df.empty:
+                logger.warning(f"No candles for {symbol}, training on stored days only")
+                continue
+            # Writes complete days to the store; the frame itself is dropped right away
+            await asyncio.to_thread(feature_store.load_or_build, symbol, '1m', df, market_features.extract_all_features)
+            training_jobs.update(job_id, progress=0.5 * (i + 1) / len(request.symbols))
+        
+        config = {
+            "registry_dir": str(model_registry.root),
+            "feature_store_dir": str(feature_store.root),
+            "validation_fraction": request.validation_fraction
+        }
+        result = await training_jobs.run_in_process(job_id, train_pooled_and_register, request.symbols, config)
+        await activate_trained_versions(job_id, result)
+        
+    except Exception as e:
+        training_jobs.fail(job_id, str(e))
+        logger.error(f"Error in pooled training: {e}")
+
+async def incremental_update_loop():
+    """Fold newly closed candles into the serving models within seconds of the close.
+
+    Updated copies are built in a thread and swapped in on the loop thread.
+    When the updater reports a rebuild is due, a full training job replaces
+    the warm-started models.
+    """
+    global incremental_rebuild_job
+    while True:
+        try:
+            if incremental_rebuild_job is not None:
+                job = training_jobs.get_job(incremental_rebuild_job)
+                if job is None or job['status'] in ('completed', 'failed'):
+                    # A rebuild that registered nothing leaves the old models (and the rebuild) due
+                    succeeded = job is not None and job['status'] == 'completed' and bool((job['result'] or {}).get('versions'))
+                    cooldown = incremental_updater.rebuild_finished(succeeded)
+                    if not succeeded:
+                        logger.warning(f"Full rebuild {incremental_rebuild_job} failed, next attempt in {cooldown:.0f}s")
+                    incremental_rebuild_job = None
+            
+            if exchange_collector:
+                features = await get_symbol_features(incremental_symbol)
+                if not use_multi_timeframe:
+                    # The last candle from the exchange is still forming
+                    features = features.iloc[:-1]
+                
+                if not features.empty and incremental_updater.add_features(features):
+                    updates = {}
+                    for name, model in (('pump_detector', pump_detector), ('exit_predictor', exit_predictor)):
+                        updated, info = await asyncio.to_thread(incremental_updater.update, name, model)
+                        if updated is not None:
+                            updates[name] = updated
+                        if (
+                            info['rebuild_due']
+                            and not training_jobs.active_jobs('train')
+                            and incremental_updater.can_start_rebuild()
+                        ):
+                            logger.info(f"Incremental update limit reached for {name}, starting full rebuild")
+                            job = start_training_job(incremental_symbol, feature_selection=training_feature_selection)
+                            incremental_rebuild_job = job['job_id']
+                    
+                    swap_models(updates.get('pump_detector'), updates.get('exit_predictor'))
+            
+            await asyncio.sleep(5)
+            
+        except Exception as e:
+            logger.error(f"Error in incremental model update: {e}")
+            await asyncio.sleep(10)
+
+
 # WebSocket endpoints
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
@@ -521,6 +1341,27 @@ async def websocket_endpoint(websocket: WebSocket):
                     websocket
                 )
             
+            elif message.get("type") == "subscribe_signals":
+                symbols = list(dict.fromkeys(message.get("symbols", [])))[:max_signal_subscriptions]
+                current = signal_stream.subscribe(websocket, symbols)
+                await manager.send_personal_message(
+                    json.dumps({"type": "signals_subscribed", "symbols": symbols}),
+                    websocket
+                )
+                for update in current:
+                    await manager.send_personal_message(update, websocket)
+            
+            elif message.get("type") == "unsubscribe_signals":
+                symbols = message.get("symbols")
+                signal_stream.unsubscribe(websocket, symbols)
+                await manager.send_personal_message(
+                    json.dumps({"type": "signals_unsubscribed", "symbols": symbols}),
+                    websocket
+                )
+            
+            elif message.get("type") == "request_signals":
+                await manager.send_personal_message(market_scanner.snapshot_json, websocket)
+            
             elif message.get("type") == "request_realtime_data":
                 symbols = message.get("symbols", [])
                 for symbol in symbols:
@@ -533,6 +1374,7 @@ async def websocket_endpoint(websocket: WebSocket):
     
     except WebSocketDisconnect:
         manager.disconnect(websocket)
+        signal_stream.unsubscribe(websocket)
 
 # Background task for real-time data updates
 async def broadcast_realtime_data():
@@ -601,34 +1443,21 @@ async def get_market_data():
 
 @app.get("/signals")
 async def get_signals():
-    """Get current AI trading signals"""
+    """Get current AI trading signals from the latest market scan"""
     try:
-        # Generate signals using the signal generator
+        snapshot = market_scanner.snapshot
         signals = []
-        
-        # Get pump detection signals
-        pump_signals = signal_generator.detect_pump_signals()
-        for signal in pump_signals:
-            signals.append({
-                "symbol": signal.get("symbol", "BTC/USDT"),
-                "type": "BUY" if signal.get("confidence", 0) > 70 else "HOLD",
-                "confidence": signal.get("confidence", 0),
-                "reason": signal.get("reason", "AI analysis"),
-                "timestamp": datetime.now(timezone.utc).isoformat()
-            })
-        
-        # Get exit prediction signals
-        exit_signals = signal_generator.predict_exit_signals()
-        for signal in exit_signals:
+        for item in snapshot['signals'][:10]:  # Top 10 by opportunity score
+            signal = item['signal']
             signals.append({
-                "symbol": signal.get("symbol", "BTC/USDT"),
-                "type": "SELL" if signal.get("confidence", 0) > 70 else "HOLD",
-                "confidence": signal.get("confidence", 0),
-                "reason": signal.get("reason", "Exit prediction"),
-                "timestamp": datetime.now(timezone.utc).isoformat()
+                "symbol": item['symbol'],
+                "type": signal['action'].upper(),
+                "confidence": signal['confidence'] * 100,
+                "reason": signal['reason'],
+                "timestamp": snapshot['timestamp']
             })
         
-        return signals[:10]  # Return top 10 signals
+        return signals
     except Exception as e:
         logger.error(f"Error in get_signals: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch signals")
@@ -702,4 +1531,11 @@ app.add_middleware(
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    training_jobs.shutdown()
+    fused_scorer.shutdown()
+    market_scanner.stop()
+    try:
+        await portfolio_store.close()
+    except Exception as e:
+        logger.error(f"Error persisting portfolio on shutdown: {e}")
     client.close()
\ No newline at end of file
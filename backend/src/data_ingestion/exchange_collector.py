@@ -5,6 +5,8 @@ import asyncio
 from datetime import datetime, timedelta
 import logging
 
+from ..feature_engineering.compact import CompactCandles
+
 logger = logging.getLogger(__name__)
 
 class ExchangeDataCollector:
@@ -42,6 +44,21 @@ class ExchangeDataCollector:
             logger.error(f"Error fetching OHLCV for {symbol}: {e}")
             return pd.DataFrame()
     
+    async def fetch_ohlcv_compact(self, symbol: str, timeframe: str = '1m', limit: int = 500) -> CompactCandles:
+        """Fetch OHLCV data packed as int64 timestamps and a float32 matrix."""
+        try:
+            ohlcv = await asyncio.to_thread(
+                self.exchange.fetch_ohlcv,
+                symbol,
+                timeframe,
+                limit=limit
+            )
+            return CompactCandles.from_ohlcv(symbol, ohlcv)
+            
+        except Exception as e:
+            logger.error(f"Error fetching OHLCV for {symbol}: {e}")
+            return CompactCandles.from_ohlcv(symbol, [])
+    
     async def fetch_order_book(self, symbol: str, limit: int = 100) -> Dict:
         """Fetch order book data."""
         try:
@@ -0,0 +1,177 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Sequence
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+class CompactCandles:
+    """OHLCV candles for one symbol packed into contiguous arrays.
+
+    Timestamps are int64 epoch ms and prices/volume one float32 (rows x 5) matrix.
+    """
+
+    __slots__ = ('symbol', 'timestamps', 'values')
+
+    def __init__(self, symbol: str, timestamps: np.ndarray, values: np.ndarray):
+        self.symbol = symbol
+        self.timestamps = np.ascontiguousarray(timestamps, dtype=np.int64)
+        self.values = np.ascontiguousarray(values, dtype=np.float32)
+
+    @classmethod
+    def from_ohlcv(cls, symbol: str, ohlcv: Sequence[Sequence[float]]) -> 'CompactCandles':
+        """Pack raw ccxt OHLCV rows ([ms, o, h, l, c, v]) without building a DataFrame."""
+        if not len(ohlcv):
+            return cls(symbol, np.empty(0, dtype=np.int64), np.empty((0, 5), dtype=np.float32))
+        raw = np.asarray(ohlcv, dtype=np.float64)
+        return cls(symbol, raw[:, 0].astype(np.int64), raw[:, 1:6])
+
+    @classmethod
+    def from_frame(cls, symbol: str, df: pd.DataFrame) -> 'CompactCandles':
+        """Pack an OHLCV DataFrame with a datetime64 'timestamp' column."""
+        timestamps = df['timestamp'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+        return cls(symbol, timestamps, df[OHLCV_COLUMNS].to_numpy(dtype=np.float32))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Unpack into the float64 DataFrame layout the feature extractors expect."""
+        frame = pd.DataFrame(self.values.astype(np.float64), columns=OHLCV_COLUMNS, copy=False)
+        frame.insert(0, 'timestamp', pd.to_datetime(self.timestamps, unit='ms'))
+        return frame
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + self.values.nbytes
+
+class CompactFeatures:
+    """Feature matrix for one symbol: float32 values with a column index.
+
+    Features are computed in float64 and cast once when packed, so rolling
+    statistics keep their precision.
+    """
+
+    __slots__ = ('symbol', 'timestamps', 'values', 'columns', '_index')
+
+    def __init__(self, symbol: str, timestamps: np.ndarray, values: np.ndarray, columns: List[str]):
+        self.symbol = symbol
+        self.timestamps = np.ascontiguousarray(timestamps, dtype=np.int64)
+        self.values = np.ascontiguousarray(values, dtype=np.float32)
+        self.columns = list(columns)
+        self._index = {col: i for i, col in enumerate(self.columns)}
+
+    @classmethod
+    def from_frame(cls, symbol: str, df: pd.DataFrame) -> 'CompactFeatures':
+        """Pack a feature DataFrame, casting every feature column to float32 once."""
+        columns = [col for col in df.columns if col != 'timestamp']
+        values = np.empty((len(df), len(columns)), dtype=np.float32)
+        for i, col in enumerate(columns):
+            values[:, i] = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        timestamps = df['timestamp'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+        return cls(symbol, timestamps, values, columns)
+
+    def column(self, name: str) -> np.ndarray:
+        """Get one feature column as a strided view."""
+        return self.values[:, self._index[name]]
+
+    def select(self, columns: List[str]) -> np.ndarray:
+        """Get the feature matrix in the given column order (a view when it matches)."""
+        if columns == self.columns:
+            return self.values
+        return self.values[:, [self._index[col] for col in columns]]
+
+    def tail(self, n: int = 1) -> 'CompactFeatures':
+        """Get the last n rows (views, no copy)."""
+        return CompactFeatures(self.symbol, self.timestamps[-n:], self.values[-n:], self.columns)
+
+    def to_frame(self) -> pd.DataFrame:
+        frame = pd.DataFrame(self.values, columns=self.columns, copy=False)
+        frame.insert(0, 'timestamp', pd.to_datetime(self.timestamps, unit='ms'))
+        return frame
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + self.values.nbytes
+
+def select_feature_matrix(features, feature_columns: List[str]):
+    """Get model input in feature_columns order from a DataFrame, CompactFeatures or ndarray.
+
+    A bare ndarray is assumed to already be in feature_columns order.
+    """
+    if isinstance(features, CompactFeatures):
+        return features.select(feature_columns)
+    if isinstance(features, np.ndarray):
+        return features if features.ndim == 2 else features.reshape(1, -1)
+    return features[feature_columns]
+
+def benchmark_compact_mode(n_symbols: int = 500, n_candles: int = 1440, repeats: int = 5) -> Dict:
+    """Compare memory and throughput of the pandas and compact representations.
+
+    Run `python -m src.feature_engineering.compact` from backend/ to print it.
+    """
+    from .market_features import MarketFeatureExtractor
+
+    rng = np.random.default_rng(0)
+    close = np.exp(np.cumsum(rng.normal(0, 0.002, n_candles))) * 100
+    frame = pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n_candles, freq='1min'),
+        'open': close,
+        'high': close * 1.001,
+        'low': close * 0.999,
+        'close': close,
+        'volume': rng.random(n_candles) * 1000
+    })
+    extractor = MarketFeatureExtractor()
+    features = extractor.extract_all_features(frame)
+
+    compact_candles = CompactCandles.from_frame('BENCH', frame)
+    compact_features = CompactFeatures.from_frame('BENCH', features)
+
+    pandas_candle_bytes = int(frame.memory_usage(index=True, deep=True).sum())
+    pandas_feature_bytes = int(features.memory_usage(index=True, deep=True).sum())
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        extractor.extract_all_features(frame)
+    pandas_seconds = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        extractor.extract_compact(compact_candles)
+    compact_seconds = (time.perf_counter() - start) / repeats
+
+    columns = compact_features.columns
+    start = time.perf_counter()
+    for _ in range(repeats * 100):
+        features.tail(1)[columns]
+    pandas_row_seconds = (time.perf_counter() - start) / (repeats * 100)
+
+    start = time.perf_counter()
+    for _ in range(repeats * 100):
+        compact_features.tail(1).select(columns)
+    compact_row_seconds = (time.perf_counter() - start) / (repeats * 100)
+
+    mb = 1024 * 1024
+    return {
+        'symbols': n_symbols,
+        'candles_per_symbol': n_candles,
+        'pandas_candles_mb': pandas_candle_bytes * n_symbols / mb,
+        'compact_candles_mb': compact_candles.nbytes * n_symbols / mb,
+        'pandas_features_mb': pandas_feature_bytes * n_symbols / mb,
+        'compact_features_mb': compact_features.nbytes * n_symbols / mb,
+        'pandas_extract_ms': pandas_seconds * 1000,
+        'compact_extract_ms': compact_seconds * 1000,
+        'pandas_row_select_us': pandas_row_seconds * 1e6,
+        'compact_row_select_us': compact_row_seconds * 1e6
+    }
+
+if __name__ == '__main__':
+    for key, value in benchmark_compact_mode().items():
+        print(f"{key:>24}: {value:,.2f}" if isinstance(value, float) else f"{key:>24}: {value}")
@@ -0,0 +1,132 @@
+import pandas as pd
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+import threading
+import logging
+
+from .compact import CompactFeatures
+
+logger = logging.getLogger(__name__)
+
+class FeatureCache:
+    """LRU cache of computed feature frames, bounded by entry count and memory.
+
+    Entries are keyed by (symbol, timeframe, last candle timestamp, close and
+    volume, history length, feature-set version), so callers that see the same
+    candles share one feature pass. The last candle is usually still forming,
+    so its close and volume are part of the key and a tick moves it on. The
+    history length is part of the key because EWM-based features (MACD)
+    depend on how many candles were fetched. With compact=True frames are
+    stored with float32 feature columns, halving the memory per entry.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 256 * 1024 * 1024, compact: bool = False):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.compact = compact
+        self._entries: "OrderedDict[Tuple, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(symbol: str, timeframe: str, df: pd.DataFrame, feature_set: Hashable) -> Optional[Tuple]:
+        """Build the cache key for a raw OHLCV frame, or None if it has no candles."""
+        if df is None or df.empty or 'timestamp' not in df.columns:
+            return None
+        last = df.iloc[-1]
+        return (
+            symbol,
+            timeframe,
+            last['timestamp'],
+            float(last['close']) if 'close' in df.columns else None,
+            float(last['volume']) if 'volume' in df.columns else None,
+            len(df),
+            feature_set
+        )
+
+    def get(self, key: Tuple) -> Optional[pd.DataFrame]:
+        """Return the cached frame for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple, features: pd.DataFrame):
+        """Store a feature frame and evict least recently used entries over budget."""
+        size = int(features.memory_usage(index=True, deep=True).sum())
+
+        if size > self.max_bytes:
+            logger.warning(f"Feature frame for {key[0]} ({size} bytes) exceeds cache budget, not cached")
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[1]
+
+            self._entries[key] = (features, size)
+            self._total_bytes += size
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+            ):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_compute(
+        self,
+        symbol: str,
+        timeframe: str,
+        df: pd.DataFrame,
+        compute: Callable[[pd.DataFrame], pd.DataFrame],
+        feature_set: Hashable
+    ) -> pd.DataFrame:
+        """Return cached features for df, computing and storing them on a miss.
+
+        The returned frame is shared between callers and must not be mutated.
+        """
+        key = self.make_key(symbol, timeframe, df, feature_set)
+        if key is None:
+            return compute(df)
+
+        features = self.get(key)
+        if features is not None:
+            return features
+
+        features = compute(df)
+        if not features.empty:
+            if self.compact:
+                # Computed in float64, cast once so the cached frame is backed by one float32 matrix
+                features = CompactFeatures.from_frame(symbol, features).to_frame()
+            self.put(key, features)
+        return features
+
+    def invalidate(self, symbol: str = None):
+        """Drop all entries, or only the entries for one symbol."""
+        with self._lock:
+            keys = [k for k in self._entries if symbol is None or k[0] == symbol]
+            for key in keys:
+                self._total_bytes -= self._entries.pop(key)[1]
+
+    def get_stats(self) -> Dict:
+        """Get cache hit rate and occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'compact': self.compact,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,93 @@
+import pandas as pd
+from typing import Callable, Dict, Iterable, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class FeatureSpec:
+    """A single registered feature: its name, input columns and compute function."""
+
+    def __init__(self, name: str, inputs: Tuple[str, ...], fn: Callable[..., pd.Series]):
+        self.name = name
+        self.inputs = inputs
+        self.fn = fn
+
+class FeatureRegistry:
+    """Registry of features with declared inputs, evaluated lazily as a DAG.
+
+    Each feature names the columns it is computed from, either raw OHLCV
+    columns or other registered features. Requesting a set of outputs
+    evaluates only the subgraph they need, and every intermediate is computed
+    once per call. Names starting with an underscore are intermediates and are
+    never written to the output frame.
+    """
+
+    def __init__(self, base_columns: Iterable[str] = ('open', 'high', 'low', 'close', 'volume')):
+        self.base_columns = set(base_columns)
+        self._specs: Dict[str, FeatureSpec] = {}
+
+    def register(self, name: str, inputs: Iterable[str], fn: Callable[..., pd.Series]):
+        """Register a feature computed as fn(*input_series)."""
+        inputs = tuple(inputs)
+        for dependency in inputs:
+            if dependency not in self.base_columns and dependency not in self._specs:
+                raise ValueError(f"Feature '{name}' depends on unknown input '{dependency}'")
+        self._specs[name] = FeatureSpec(name, inputs, fn)
+
+    def feature(self, name: str, *inputs: str):
+        """Decorator form of register()."""
+        def decorator(fn):
+            self.register(name, inputs, fn)
+            return fn
+        return decorator
+
+    @property
+    def outputs(self) -> List[str]:
+        """Public feature names in registration order."""
+        return [name for name in self._specs if not name.startswith('_')]
+
+    def is_known(self, name: str) -> bool:
+        return name in self._specs or name in self.base_columns
+
+    def dependencies(self, name: str) -> Tuple[str, ...]:
+        return self._specs[name].inputs
+
+    def resolve(self, outputs: Iterable[str]) -> List[str]:
+        """Return the registered features needed for outputs, in evaluation order."""
+        needed = set()
+        stack = [name for name in outputs if name not in self.base_columns]
+
+        while stack:
+            name = stack.pop()
+            if name in needed:
+                continue
+            if name not in self._specs:
+                raise KeyError(f"Unknown feature: {name}")
+            needed.add(name)
+            stack.extend(dep for dep in self._specs[name].inputs if dep not in self.base_columns)
+
+        # Registration order is already topological: inputs must exist before registering
+        return [name for name in self._specs if name in needed]
+
+    def compute(self, df: pd.DataFrame, outputs: Iterable[str] = None) -> pd.DataFrame:
+        """Compute the requested features (all public features by default).
+
+        Returns the input columns followed by the requested features in
+        registration order.
+        """
+        requested = set(self.outputs if outputs is None else outputs)
+        values: Dict[str, pd.Series] = {}
+
+        for name in self.resolve(requested):
+            spec = self._specs[name]
+            args = [values[dep] if dep in values else df[dep] for dep in spec.inputs]
+            values[name] = spec.fn(*args)
+
+        new_columns = {
+            name: values[name]
+            for name in self._specs
+            if name in requested and not name.startswith('_') and name not in df.columns
+        }
+        if not new_columns:
+            return df.copy()
+        return pd.concat([df, pd.DataFrame(new_columns, index=df.index)], axis=1)
@@ -0,0 +1,200 @@
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Callable, Dict, List
+import json
+import os
+import shutil
+import uuid
+import logging
+
+from .market_features import FEATURE_SET_VERSION
+from .multi_timeframe import TIMEFRAME_OFFSETS
+
+logger = logging.getLogger(__name__)
+
+class FeatureStore:
+    """On-disk store of computed feature matrices, partitioned by symbol, timeframe and UTC day.
+
+    Layout: <root>/v<version>/<symbol>/<timeframe>/<YYYY-MM-DD>/ holding
+    features.npy (float64, or float32 with compact=True; rows x columns),
+    timestamps.npy (int64 epoch ms) and meta.json. Partitions are
+    memory-mapped on load, and a new feature-set version writes to a fresh
+    directory so stale matrices are never reused.
+    """
+
+    def __init__(self, root: str, version: str = FEATURE_SET_VERSION, compact: bool = False):
+        self.root = Path(root)
+        self.version = version
+        self.dtype = np.float32 if compact else np.float64
+
+    def _series_path(self, symbol: str, timeframe: str) -> Path:
+        return self.root / f"v{self.version}" / symbol.replace('/', '_') / timeframe
+
+    def partition_path(self, symbol: str, timeframe: str, partition: str) -> Path:
+        return self._series_path(symbol, timeframe) / partition
+
+    def has_partition(self, symbol: str, timeframe: str, partition: str) -> bool:
+        return (self.partition_path(symbol, timeframe, partition) / 'meta.json').exists()
+
+    def list_partitions(self, symbol: str, timeframe: str) -> List[str]:
+        """List stored partitions for a symbol in chronological order."""
+        path = self._series_path(symbol, timeframe)
+        if not path.exists():
+            return []
+        return sorted(p.name for p in path.iterdir() if (p / 'meta.json').exists())
+
+    def list_symbols(self) -> List[str]:
+        """List symbols with at least one stored partition."""
+        path = self.root / f"v{self.version}"
+        if not path.exists():
+            return []
+        return sorted(p.name.replace('_', '/') for p in path.iterdir() if p.is_dir())
+
+    def write_partition(self, symbol: str, timeframe: str, partition: str, features: pd.DataFrame):
+        """Write one partition of a feature frame. The swap into place is atomic."""
+        columns = [col for col in features.columns if col != 'timestamp']
+        target = self.partition_path(symbol, timeframe, partition)
+        staging = target.parent / f".{partition}.{uuid.uuid4().hex}"
+        staging.mkdir(parents=True, exist_ok=True)
+
+        try:
+            matrix = np.ascontiguousarray(features[columns].to_numpy(dtype=self.dtype))
+            timestamps = features['timestamp'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+
+            np.save(staging / 'features.npy', matrix)
+            np.save(staging / 'timestamps.npy', timestamps)
+            with open(staging / 'meta.json', 'w') as f:
+                json.dump({
+                    'symbol': symbol,
+                    'timeframe': timeframe,
+                    'partition': partition,
+                    'feature_set_version': self.version,
+                    'columns': columns,
+                    'dtype': matrix.dtype.name,
+                    'rows': len(features)
+                }, f)
+
+            if target.exists():
+                shutil.rmtree(target)
+            os.replace(staging, target)
+
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+    def load_partition(self, symbol: str, timeframe: str, partition: str, mmap: bool = True) -> pd.DataFrame:
+        """Load one partition as a DataFrame backed by the memory-mapped matrix."""
+        path = self.partition_path(symbol, timeframe, partition)
+        with open(path / 'meta.json') as f:
+            meta = json.load(f)
+
+        mmap_mode = 'r' if mmap else None
+        matrix = np.load(path / 'features.npy', mmap_mode=mmap_mode)
+        timestamps = np.load(path / 'timestamps.npy')
+
+        # Wraps the mmap without copying; the frame is read-only
+        frame = pd.DataFrame(matrix, columns=meta['columns'], copy=False)
+        frame.insert(0, 'timestamp', pd.to_datetime(timestamps, unit='ms'))
+        return frame
+
+    def load(self, symbol: str, timeframe: str, partitions: List[str] = None) -> pd.DataFrame:
+        """Load several partitions. A single partition is returned without copying."""
+        partitions = partitions if partitions is not None else self.list_partitions(symbol, timeframe)
+        frames = [self.load_partition(symbol, timeframe, p) for p in partitions]
+        if not frames:
+            return pd.DataFrame()
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True)
+
+    def load_or_build(
+        self,
+        symbol: str,
+        timeframe: str,
+        candles: pd.DataFrame,
+        extract: Callable[[pd.DataFrame], pd.DataFrame],
+        warmup: int = 100
+    ) -> pd.DataFrame:
+        """Return features for candles, reusing stored days and computing only the rest.
+
+        Every complete day in the store is loaded; each run of missing days is
+        computed with `warmup` extra candles of history so rolling windows are
+        filled at the day boundary, and its complete days are written back.
+        Partial days (exchange history rarely starts at midnight, and the
+        current day is still running) are computed in memory and never stored.
+        The first `warmup` candles only serve as history, so features are
+        returned for every candle after them.
+        """
+        if candles.empty:
+            return candles
+
+        try:
+            offset = pd.Timedelta(TIMEFRAME_OFFSETS[timeframe])
+            days = candles['timestamp'].dt.floor('D')
+            day_groups = candles.groupby(days, sort=True).indices
+            day_keys = sorted(day_groups)
+
+            complete = {}
+            for day in day_keys:
+                rows = day_groups[day]
+                first = candles['timestamp'].iloc[rows[0]]
+                last = candles['timestamp'].iloc[rows[-1]]
+                complete[day] = first == day and last + offset == day + pd.Timedelta(days=1)
+
+            # Runs of consecutive days, each either stored (loaded) or missing (computed)
+            runs = []
+            for day in day_keys:
+                partition = day.strftime('%Y-%m-%d')
+                is_stored = complete[day] and self.has_partition(symbol, timeframe, partition)
+                if runs and runs[-1][0] == is_stored:
+                    runs[-1][1].append(day)
+                else:
+                    runs.append((is_stored, [day]))
+
+            frames = []
+            reused = computed_days = 0
+            for is_stored, run_days in runs:
+                if is_stored:
+                    frames.append(self.load(symbol, timeframe, [day.strftime('%Y-%m-%d') for day in run_days]))
+                    reused += len(run_days)
+                    continue
+
+                start_row = day_groups[run_days[0]][0]
+                end_row = day_groups[run_days[-1]][-1]
+                window = candles.iloc[max(0, start_row - warmup):end_row + 1].reset_index(drop=True)
+                computed = extract(window)
+                computed = computed[computed['timestamp'] >= run_days[0]].reset_index(drop=True)
+
+                for day, rows in computed.groupby(computed['timestamp'].dt.floor('D')).indices.items():
+                    partition = day.strftime('%Y-%m-%d')
+                    if complete.get(day) and not self.has_partition(symbol, timeframe, partition):
+                        self.write_partition(symbol, timeframe, partition, computed.iloc[rows])
+
+                frames.append(computed)
+                computed_days += len(run_days)
+
+            logger.info(
+                f"Feature store {symbol} {timeframe}: reused {reused} day(s), computed {computed_days} day(s)"
+            )
+
+            features = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+            if len(candles) > warmup:
+                features = features[features['timestamp'] >= candles['timestamp'].iloc[warmup]].reset_index(drop=True)
+            return features
+
+        except Exception as e:
+            logger.error(f"Error loading features from store for {symbol}: {e}")
+            return extract(candles)
+
+    def get_stats(self) -> Dict:
+        """Get partition counts per stored symbol and timeframe."""
+        stats = {}
+        version_path = self.root / f"v{self.version}"
+        if not version_path.exists():
+            return stats
+        for symbol_path in version_path.iterdir():
+            for timeframe_path in symbol_path.iterdir():
+                key = f"{symbol_path.name.replace('_', '/')}:{timeframe_path.name}"
+                stats[key] = len(self.list_partitions(symbol_path.name, timeframe_path.name))
+        return stats
@@ -3,85 +3,110 @@ import numpy as np
 from typing import Dict, List
 import logging
 
+from .feature_registry import FeatureRegistry
+from .compact import CompactCandles, CompactFeatures
+
 logger = logging.getLogger(__name__)
 
+# Bump whenever a feature definition changes so cached/stored features are recomputed
+FEATURE_SET_VERSION = "1"
+
+def build_market_feature_registry(
+    rsi_period: int = 14,
+    macd_fast: int = 12,
+    macd_slow: int = 26,
+    macd_signal: int = 9,
+    bb_period: int = 20,
+    bb_std_dev: int = 2
+) -> FeatureRegistry:
+    """Declare the market features and their dependencies."""
+    registry = FeatureRegistry()
+    add = registry.register
+
+    # Price features
+    add('returns', ['close'], lambda close: close.pct_change())
+    add('log_returns', ['close'], lambda close: np.log(close / close.shift(1)))
+    add('price_change_1m', ['close'], lambda close: close.pct_change(1))
+    add('price_change_5m', ['close'], lambda close: close.pct_change(5))
+    add('price_change_15m', ['close'], lambda close: close.pct_change(15))
+
+    # Volume features
+    add('volume_change', ['volume'], lambda volume: volume.pct_change())
+    add('volume_ma_5', ['volume'], lambda volume: volume.rolling(5).mean())
+    add('volume_ma_15', ['volume'], lambda volume: volume.rolling(15).mean())
+    add('volume_ratio', ['volume', 'volume_ma_15'], lambda volume, ma: volume / ma)
+
+    # Volatility features
+    add('volatility_5', ['returns'], lambda returns: returns.rolling(5).std())
+    add('volatility_15', ['returns'], lambda returns: returns.rolling(15).std())
+
+    # RSI
+    add('_delta', ['close'], lambda close: close.diff())
+    add('_rsi_gain', ['_delta'], lambda delta: delta.where(delta > 0, 0).rolling(window=rsi_period).mean())
+    add('_rsi_loss', ['_delta'], lambda delta: (-delta.where(delta < 0, 0)).rolling(window=rsi_period).mean())
+    add('rsi', ['_rsi_gain', '_rsi_loss'], lambda gain, loss: 100 - (100 / (1 + gain / (loss + 1e-10))))
+
+    # MACD
+    add('_ema_fast', ['close'], lambda close: close.ewm(span=macd_fast).mean())
+    add('_ema_slow', ['close'], lambda close: close.ewm(span=macd_slow).mean())
+    add('macd', ['_ema_fast', '_ema_slow'], lambda fast, slow: fast - slow)
+    add('macd_signal', ['macd'], lambda macd: macd.ewm(span=macd_signal).mean())
+    add('macd_diff', ['macd', 'macd_signal'], lambda macd, signal: macd - signal)
+
+    # Bollinger Bands
+    add('bb_middle', ['close'], lambda close: close.rolling(bb_period).mean())
+    add('_bb_std', ['close'], lambda close: close.rolling(bb_period).std())
+    add('bb_upper', ['bb_middle', '_bb_std'], lambda middle, std: middle + (std * bb_std_dev))
+    add('bb_lower', ['bb_middle', '_bb_std'], lambda middle, std: middle - (std * bb_std_dev))
+    add('bb_width', ['bb_upper', 'bb_lower', 'bb_middle'], lambda upper, lower, middle: (upper - lower) / middle)
+    add(
+        'bb_position',
+        ['close', 'bb_upper', 'bb_lower'],
+        lambda close, upper, lower: (close - lower) / (upper - lower + 1e-10)
+    )
+
+    # Momentum features
+    add('momentum_5', ['close'], lambda close: close - close.shift(5))
+    add('momentum_15', ['close'], lambda close: close - close.shift(15))
+
+    # High/Low features
+    add('high_low_range', ['high', 'low', 'close'], lambda high, low, close: (high - low) / close)
+    add('close_position', ['close', 'high', 'low'], lambda close, high, low: (close - low) / (high - low + 1e-10))
+
+    return registry
+
 class MarketFeatureExtractor:
     """Extract market-based features from OHLCV data."""
     
-    def __init__(self):
-        pass
+    def __init__(self, registry: FeatureRegistry = None):
+        self.registry = registry or build_market_feature_registry()
     
     def extract_all_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Extract all market features from OHLCV data."""
+        return self.extract_features(df)
+    
+    def extract_features(self, df: pd.DataFrame, columns: List[str] = None) -> pd.DataFrame:
+        """Extract only the requested feature columns (all features if None).
+        
+        Only the part of the feature graph the columns depend on is computed,
+        so a model's feature_columns can be passed straight through.
+        """
         if df.empty:
             return df
         
         try:
-            df = df.copy()
-            
-            # Price features
-            df['returns'] = df['close'].pct_change()
-            df['log_returns'] = np.log(df['close'] / df['close'].shift(1))
-            df['price_change_1m'] = df['close'].pct_change(1)
-            df['price_change_5m'] = df['close'].pct_change(5)
-            df['price_change_15m'] = df['close'].pct_change(15)
-            
-            # Volume features
-            df['volume_change'] = df['volume'].pct_change()
-            df['volume_ma_5'] = df['volume'].rolling(5).mean()
-            df['volume_ma_15'] = df['volume'].rolling(15).mean()
-            df['volume_ratio'] = df['volume'] / df['volume_ma_15']
-            
-            # Volatility features
-            df['volatility_5'] = df['returns'].rolling(5).std()
-            df['volatility_15'] = df['returns'].rolling(15).std()
-            
-            # Technical indicators
-            df = self._add_rsi(df)
-            df = self._add_macd(df)
-            df = self._add_bollinger_bands(df)
-            
-            # Momentum features
-            df['momentum_5'] = df['close'] - df['close'].shift(5)
-            df['momentum_15'] = df['close'] - df['close'].shift(15)
-            
-            # High/Low features
-            df['high_low_range'] = (df['high'] - df['low']) / df['close']
-            df['close_position'] = (df['close'] - df['low']) / (df['high'] - df['low'] + 1e-10)
-            
-            return df
+            if columns is not None:
+                columns = [col for col in columns if self.registry.is_known(col)]
+            return self.registry.compute(df, columns)
             
         except Exception as e:
             logger.error(f"Error extracting market features: {e}")
             return df
     
-    def _add_rsi(self, df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
-        """Add RSI indicator."""
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / (loss + 1e-10)
-        df['rsi'] = 100 - (100 / (1 + rs))
-        return df
-    
-    def _add_macd(self, df: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9) -> pd.DataFrame:
-        """Add MACD indicator."""
-        ema_fast = df['close'].ewm(span=fast).mean()
-        ema_slow = df['close'].ewm(span=slow).mean()
-        df['macd'] = ema_fast - ema_slow
-        df['macd_signal'] = df['macd'].ewm(span=signal).mean()
-        df['macd_diff'] = df['macd'] - df['macd_signal']
-        return df
-    
-    def _add_bollinger_bands(self, df: pd.DataFrame, period: int = 20, std_dev: int = 2) -> pd.DataFrame:
-        """Add Bollinger Bands."""
-        df['bb_middle'] = df['close'].rolling(period).mean()
-        bb_std = df['close'].rolling(period).std()
-        df['bb_upper'] = df['bb_middle'] + (bb_std * std_dev)
-        df['bb_lower'] = df['bb_middle'] - (bb_std * std_dev)
-        df['bb_width'] = (df['bb_upper'] - df['bb_lower']) / df['bb_middle']
-        df['bb_position'] = (df['close'] - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'] + 1e-10)
-        return df
+    def extract_compact(self, candles: CompactCandles, columns: List[str] = None) -> CompactFeatures:
+        """Extract features from packed candles into a float32 feature matrix."""
+        features = self.extract_features(candles.to_frame(), columns)
+        return CompactFeatures.from_frame(candles.symbol, features)
     
     def extract_order_book_features(self, order_book: Dict) -> Dict:
         """Extract features from order book data."""
@@ -0,0 +1,210 @@
+import pandas as pd
+from typing import Dict, List, Optional
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ccxt timeframe -> pandas offset
+TIMEFRAME_OFFSETS = {
+    '1m': '1min',
+    '5m': '5min',
+    '15m': '15min',
+    '30m': '30min',
+    '1h': '1h',
+    '4h': '4h'
+}
+
+OHLCV_AGGREGATION = {
+    'open': 'first',
+    'high': 'max',
+    'low': 'min',
+    'close': 'last',
+    'volume': 'sum'
+}
+
+class MultiTimeframeFeatureBuilder:
+    """Build aligned multi-timeframe features from a single stored 1m series.
+
+    Higher timeframe bars are resampled from the 1m candles instead of being
+    fetched separately. Only closed bars are kept, and only the timeframes that
+    gained a bar are re-featured when new 1m candles arrive. Updates and
+    builds hold a lock, so the builder can be shared with worker threads.
+    """
+
+    def __init__(
+        self,
+        feature_extractor,
+        timeframes: List[str] = None,
+        max_base_candles: int = 5000,
+        feature_window: Optional[int] = 200
+    ):
+        self.feature_extractor = feature_extractor
+        self.timeframes = timeframes or ['5m', '15m', '1h']
+        self.max_base_candles = max_base_candles
+        # Higher timeframe bars re-featured per update; None features every stored bar
+        self.feature_window = feature_window
+
+        for timeframe in self.timeframes:
+            if timeframe not in TIMEFRAME_OFFSETS:
+                raise ValueError(f"Unsupported timeframe: {timeframe}")
+
+        self._base = {}  # symbol -> closed 1m candles
+        self._bars = {}  # symbol -> timeframe -> closed resampled bars
+        self._features = {}  # symbol -> timeframe -> feature frame
+        self._lock = threading.RLock()
+
+    def update(self, symbol: str, candles: pd.DataFrame) -> int:
+        """Append newly closed 1m candles for a symbol.
+
+        Candles at or before the last stored timestamp are ignored. Returns the
+        number of candles appended.
+        """
+        if candles.empty:
+            return 0
+
+        try:
+            with self._lock:
+                base = self._base.get(symbol)
+                if base is not None and not base.empty:
+                    new = candles[candles['timestamp'] > base['timestamp'].iloc[-1]]
+                    if new.empty:
+                        return 0
+                    base = pd.concat([base, new], ignore_index=True)
+                else:
+                    new = candles
+                    base = candles.reset_index(drop=True)
+
+                if len(base) > self.max_base_candles:
+                    base = base.iloc[-self.max_base_candles:].reset_index(drop=True)
+
+                self._base[symbol] = base
+                self._features.setdefault(symbol, {}).pop('1m', None)
+                self._update_bars(symbol, new['timestamp'].iloc[0])
+                return len(new)
+
+        except Exception as e:
+            logger.error(f"Error updating multi-timeframe candles for {symbol}: {e}")
+            return 0
+
+    def _update_bars(self, symbol: str, first_new_timestamp: pd.Timestamp):
+        """Resample only the buckets touched by new 1m candles."""
+        base = self._base[symbol]
+        last_close_time = base['timestamp'].iloc[-1] + pd.Timedelta(minutes=1)
+        symbol_bars = self._bars.setdefault(symbol, {})
+        symbol_features = self._features.setdefault(symbol, {})
+
+        for timeframe in self.timeframes:
+            offset = pd.Timedelta(TIMEFRAME_OFFSETS[timeframe])
+            bars = symbol_bars.get(timeframe)
+
+            # Start from the bucket holding the first new candle (or rebuild everything)
+            start = first_new_timestamp.floor(offset) if bars is not None else base['timestamp'].iloc[0]
+            tail = base[base['timestamp'] >= start]
+            resampled = self._resample(tail, offset)
+
+            # Keep closed buckets only
+            resampled = resampled[resampled['timestamp'] + offset <= last_close_time]
+
+            if bars is not None:
+                bars = bars[bars['timestamp'] < start]
+                if resampled.empty and len(bars) == len(symbol_bars[timeframe]):
+                    continue
+                bars = pd.concat([bars, resampled], ignore_index=True)
+            else:
+                bars = resampled
+
+            # Drop bars whose 1m history was trimmed away
+            bars = bars[bars['timestamp'] >= base['timestamp'].iloc[0]]
+            symbol_bars[timeframe] = bars.reset_index(drop=True)
+            symbol_features.pop(timeframe, None)
+
+    def _resample(self, candles: pd.DataFrame, offset: pd.Timedelta) -> pd.DataFrame:
+        """Resample 1m candles to a higher timeframe."""
+        if candles.empty:
+            return pd.DataFrame(columns=['timestamp'] + list(OHLCV_AGGREGATION))
+
+        bars = (
+            candles.set_index('timestamp')[list(OHLCV_AGGREGATION)]
+            .resample(offset, label='left', closed='left')
+            .agg(OHLCV_AGGREGATION)
+            .dropna(subset=['close'])
+            .reset_index()
+        )
+        return bars
+
+    def get_bars(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        """Get closed resampled bars for a symbol and timeframe."""
+        if timeframe == '1m':
+            return self._base.get(symbol, pd.DataFrame())
+        return self._bars.get(symbol, {}).get(timeframe, pd.DataFrame())
+
+    def _timeframe_features(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        """Get the feature frame for one timeframe, recomputing only if stale."""
+        symbol_features = self._features.setdefault(symbol, {})
+        features = symbol_features.get(timeframe)
+        if features is None:
+            bars = self.get_bars(symbol, timeframe)
+            if timeframe != '1m' and self.feature_window is not None:
+                bars = bars.tail(self.feature_window)
+            features = self.feature_extractor.extract_all_features(bars)
+            symbol_features[timeframe] = features
+        return features
+
+    def build_features(self, symbol: str) -> pd.DataFrame:
+        """Build 1m features joined with every higher timeframe.
+
+        Each 1m row only sees higher timeframe bars that had closed when that
+        1m candle closed. Higher timeframe columns are suffixed with the
+        timeframe, e.g. 'rsi_15m'.
+        """
+        try:
+            with self._lock:
+                base = self._base.get(symbol)
+                if base is None or base.empty:
+                    return pd.DataFrame()
+
+                frame = self._timeframe_features(symbol, '1m').copy()
+                frame['_close_time'] = frame['timestamp'] + pd.Timedelta(minutes=1)
+
+                for timeframe in self.timeframes:
+                    features = self._timeframe_features(symbol, timeframe)
+                    if features.empty:
+                        continue
+
+                    offset = pd.Timedelta(TIMEFRAME_OFFSETS[timeframe])
+                    features = features.rename(
+                        columns={col: f"{col}_{timeframe}" for col in features.columns if col != 'timestamp'}
+                    )
+                    features['_close_time'] = features.pop('timestamp') + offset
+
+                    frame = pd.merge_asof(frame, features, on='_close_time', direction='backward')
+
+                return frame.drop(columns=['_close_time'])
+
+        except Exception as e:
+            logger.error(f"Error building multi-timeframe features for {symbol}: {e}")
+            return pd.DataFrame()
+
+    def build_row(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Build the latest aligned feature row for model inference."""
+        frame = self.build_features(symbol)
+        if frame.empty:
+            return None
+        return frame.tail(1)
+
+    def get_symbols(self) -> List[str]:
+        """Get symbols with stored 1m history."""
+        with self._lock:
+            return list(self._base.keys())
+
+    def get_stats(self) -> Dict:
+        """Get stored candle and bar counts per symbol."""
+        with self._lock:
+            return {
+                symbol: {
+                    '1m': len(base),
+                    **{tf: len(bars) for tf, bars in self._bars.get(symbol, {}).items()}
+                }
+                for symbol, base in self._base.items()
+            }
@@ -0,0 +1,233 @@
+import pandas as pd
+import numpy as np
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+BID = 0
+ASK = 1
+
+def stack_order_books(books: List[Dict], levels: int = 20) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Stack ccxt order book snapshots into (time x levels x side) arrays.
+
+    Returns (timestamps in epoch ms, prices, sizes). Side 0 is bids and side 1
+    is asks; missing levels have NaN price and zero size.
+    """
+    n = len(books)
+    timestamps = np.zeros(n, dtype=np.int64)
+    prices = np.full((n, levels, 2), np.nan)
+    sizes = np.zeros((n, levels, 2))
+
+    for i, book in enumerate(books):
+        timestamps[i] = book.get('timestamp') or 0
+        for side, key in ((BID, 'bids'), (ASK, 'asks')):
+            entries = book.get(key) or []
+            if not entries:
+                continue
+            # ccxt levels may carry extra fields after [price, amount]
+            ladder = np.asarray([entry[:2] for entry in entries[:levels]], dtype=np.float64)
+            prices[i, :len(ladder), side] = ladder[:, 0]
+            sizes[i, :len(ladder), side] = ladder[:, 1]
+
+    return timestamps, prices, sizes
+
+class OrderBookFeatureExtractor:
+    """Extract order book features for a whole history of depth snapshots at once."""
+
+    def __init__(
+        self,
+        imbalance_levels: Sequence[int] = (1, 5, 10),
+        depth_bands_bps: Sequence[float] = (10, 25, 50, 100)
+    ):
+        self.imbalance_levels = list(imbalance_levels)
+        self.depth_bands_bps = list(depth_bands_bps)
+
+    def extract_features(self, timestamps: np.ndarray, prices: np.ndarray, sizes: np.ndarray) -> pd.DataFrame:
+        """Compute features for every snapshot.
+
+        Args:
+            timestamps: (T,) epoch ms
+            prices: (T, L, 2) level prices, best level first, side 0 bids / 1 asks
+            sizes: (T, L, 2) level sizes
+
+        Returns a frame with a 'timestamp' column and one row per snapshot.
+        """
+        try:
+            prices = np.asarray(prices, dtype=np.float64)
+            sizes = np.nan_to_num(np.asarray(sizes, dtype=np.float64))
+
+            best_bid = prices[:, 0, BID]
+            best_ask = prices[:, 0, ASK]
+            bid_size = sizes[:, 0, BID]
+            ask_size = sizes[:, 0, ASK]
+            mid = (best_bid + best_ask) / 2
+
+            features = {
+                'timestamp': pd.to_datetime(timestamps, unit='ms'),
+                'best_bid': best_bid,
+                'best_ask': best_ask,
+                'mid_price': mid,
+                # Undefined (NaN) unless both sides are quoted
+                'spread': np.where(best_bid > 0, (best_ask - best_bid) / best_bid, np.nan)
+            }
+
+            # Multi-level imbalance
+            cumulative = np.cumsum(sizes, axis=1)
+            n_levels = sizes.shape[1]
+            for k in self.imbalance_levels:
+                k = min(k, n_levels)
+                bid_volume = cumulative[:, k - 1, BID]
+                ask_volume = cumulative[:, k - 1, ASK]
+                features[f'imbalance_l{k}'] = (bid_volume - ask_volume) / (bid_volume + ask_volume + 1e-10)
+
+            # Same definition as extract_order_book_features: top 10 levels
+            top = min(10, n_levels)
+            features['bid_volume'] = cumulative[:, top - 1, BID]
+            features['ask_volume'] = cumulative[:, top - 1, ASK]
+            features['order_book_imbalance'] = (
+                (features['bid_volume'] - features['ask_volume'])
+                / (features['bid_volume'] + features['ask_volume'] + 1e-10)
+            )
+
+            # Depth within bps bands around the mid
+            distance_bps = np.abs(prices / mid[:, None, None] - 1) * 1e4
+            for band in self.depth_bands_bps:
+                in_band = distance_bps <= band  # NaN levels compare False
+                depth = np.where(in_band, sizes, 0.0).sum(axis=1)
+                label = f'{band:g}bps'
+                features[f'bid_depth_{label}'] = depth[:, BID]
+                features[f'ask_depth_{label}'] = depth[:, ASK]
+                features[f'depth_imbalance_{label}'] = (
+                    (depth[:, BID] - depth[:, ASK]) / (depth[:, BID] + depth[:, ASK] + 1e-10)
+                )
+
+            # Book slope: cumulative size per bps of distance from the mid (least squares)
+            for side, name in ((BID, 'bid_slope'), (ASK, 'ask_slope')):
+                features[name] = self._slope(distance_bps[:, :, side], cumulative[:, :, side])
+
+            # Microprice weights the touch prices by the opposite side's size
+            touch_volume = bid_size + ask_size
+            microprice = np.where(
+                touch_volume > 0,
+                (best_bid * ask_size + best_ask * bid_size) / np.where(touch_volume > 0, touch_volume, 1.0),
+                mid
+            )
+            features['microprice'] = microprice
+            features['microprice_offset'] = microprice / mid - 1
+
+            frame = pd.DataFrame(features)
+            return frame.sort_values('timestamp', kind='stable').reset_index(drop=True)
+
+        except Exception as e:
+            logger.error(f"Error extracting order book history features: {e}")
+            return pd.DataFrame()
+
+    def extract_from_books(self, books: List[Dict], levels: int = 20) -> pd.DataFrame:
+        """Stack raw ccxt order books and compute their features."""
+        if not books:
+            return pd.DataFrame()
+        return self.extract_features(*stack_order_books(books, levels))
+
+    @staticmethod
+    def _slope(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Row-wise least-squares slope of y on x, ignoring NaN levels."""
+        valid = ~np.isnan(x)
+        count = valid.sum(axis=1)
+        x = np.where(valid, x, 0.0)
+        y = np.where(valid, y, 0.0)
+        safe_count = np.maximum(count, 1)
+        x_mean = x.sum(axis=1) / safe_count
+        y_mean = y.sum(axis=1) / safe_count
+        dx = np.where(valid, x - x_mean[:, None], 0.0)
+        dy = np.where(valid, y - y_mean[:, None], 0.0)
+        variance = (dx * dx).sum(axis=1)
+        slope = (dx * dy).sum(axis=1) / np.where(variance > 0, variance, 1.0)
+        return np.where((count >= 2) & (variance > 0), slope, np.nan)
+
+    def join_to_candles(
+        self,
+        candles: pd.DataFrame,
+        book_features: pd.DataFrame,
+        candle_duration: str = '1min',
+        tolerance: str = None
+    ) -> pd.DataFrame:
+        """Attach the latest snapshot taken by each candle's close to the candle rows.
+
+        Snapshots after a candle closed are never joined, so the frame is safe
+        to use for training.
+        """
+        if candles.empty or book_features.empty:
+            return candles
+
+        left = candles.copy()
+        left['_close_time'] = left['timestamp'] + pd.Timedelta(candle_duration)
+        right = book_features.rename(columns={'timestamp': '_close_time'})
+        right = right.rename(columns={col: f'ob_{col}' for col in right.columns if col != '_close_time'})
+        right['_close_time'] = right['_close_time'].astype(left['_close_time'].dtype)
+
+        joined = pd.merge_asof(
+            left.sort_values('_close_time'),
+            right.sort_values('_close_time'),
+            on='_close_time',
+            direction='backward',
+            tolerance=pd.Timedelta(tolerance) if tolerance else None
+        )
+        return joined.drop(columns=['_close_time'])
+
+class OrderBookHistory:
+    """Bounded per-symbol history of raw order book snapshots.
+
+    Snapshots are only appended when recorded; features for a symbol's whole
+    history are computed in one vectorized pass when asked for.
+    """
+
+    def __init__(self, extractor: OrderBookFeatureExtractor = None, max_snapshots: int = 1440, levels: int = 20):
+        self.extractor = extractor or OrderBookFeatureExtractor()
+        self.max_snapshots = max_snapshots
+        self.levels = levels
+        self._books: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, symbol: str, book: Dict) -> bool:
+        """Store one snapshot; books without both sides are skipped."""
+        if not book or not book.get('bids') or not book.get('asks'):
+            return False
+        snapshot = {
+            'timestamp': book.get('timestamp') or int(time.time() * 1000),
+            'bids': [entry[:2] for entry in book['bids'][:self.levels]],
+            'asks': [entry[:2] for entry in book['asks'][:self.levels]]
+        }
+        with self._lock:
+            self._books.setdefault(symbol, deque(maxlen=self.max_snapshots)).append(snapshot)
+        return True
+
+    def features(self, symbol: str, limit: int = None) -> pd.DataFrame:
+        """Feature frame for a symbol's stored snapshots (the last `limit` if given)."""
+        with self._lock:
+            books = list(self._books.get(symbol, ()))
+        if limit is not None:
+            books = books[-limit:]
+        return self.extractor.extract_from_books(books, self.levels)
+
+    def latest(self, symbol: str) -> Optional[Dict]:
+        """Features of the most recent snapshot, or None if there is none."""
+        frame = self.features(symbol, limit=1)
+        if frame.empty:
+            return None
+        row = frame.iloc[-1]
+        return {
+            col: row[col].isoformat() if col == 'timestamp' else (None if pd.isna(row[col]) else float(row[col]))
+            for col in frame.columns
+        }
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'symbols': len(self._books),
+                'snapshots': sum(len(books) for books in self._books.values()),
+                'max_snapshots': self.max_snapshots
+            }
@@ -0,0 +1,184 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CascadeScreener:
+    """Cheap first stage of the inference cascade: screen symbols by volume ratio and return z-score.
+
+    A symbol passes to full feature extraction if either statistic reaches its threshold.
+    """
+
+    def __init__(
+        self,
+        window: int = 20,
+        volume_ratio_threshold: float = 1.5,
+        return_z_threshold: float = 1.5
+    ):
+        self.window = window
+        self.base_thresholds = (volume_ratio_threshold, return_z_threshold)
+        self.volume_ratio_threshold = volume_ratio_threshold
+        self.return_z_threshold = return_z_threshold
+        self.screened = 0
+        self.passed = 0
+        self.batches = 0
+        self.audits = 0
+        self.audit_positives = 0
+        self.audit_recalled = 0
+        self._lock = threading.Lock()
+
+    def _stack(self, candles: Dict[str, pd.DataFrame], column: str) -> np.ndarray:
+        """Last window+2 closed values of a column for every symbol, NaN-padded on the left."""
+        depth = self.window + 2
+        matrix = np.full((len(candles), depth), np.nan)
+        for i, df in enumerate(candles.values()):
+            # The last candle is still forming; its partial volume would understate the ratio
+            values = df[column].to_numpy(dtype=np.float64)[-depth - 1:-1]
+            if len(values):
+                matrix[i, depth - len(values):] = values
+        return matrix
+
+    def compute_stats(self, candles: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Volume ratio and return z-score of the latest closed candle for every symbol."""
+        symbols = list(candles)
+        if not symbols:
+            return pd.DataFrame(columns=['volume_ratio', 'return_z'])
+
+        close = self._stack(candles, 'close')
+        volume = self._stack(candles, 'volume')
+        returns = close[:, 1:] / close[:, :-1] - 1
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            history = returns[:, :-1]
+            counts = np.sum(~np.isnan(history), axis=1)
+            mean_return = np.nansum(history, axis=1) / np.maximum(counts, 1)
+            std_return = np.sqrt(np.nansum((history - mean_return[:, None]) ** 2, axis=1) / np.maximum(counts - 1, 1))
+            return_z = (returns[:, -1] - mean_return) / std_return
+
+            past_volume = volume[:, 1:-1]
+            volume_counts = np.sum(~np.isnan(past_volume), axis=1)
+            mean_volume = np.nansum(past_volume, axis=1) / np.maximum(volume_counts, 1)
+            volume_ratio = volume[:, -1] / mean_volume
+
+        return pd.DataFrame({
+            'volume_ratio': np.where(np.isfinite(volume_ratio), volume_ratio, np.nan),
+            'return_z': np.where(np.isfinite(return_z), return_z, np.nan)
+        }, index=symbols)
+
+    def passes(self, stats: pd.DataFrame, thresholds: Optional[Tuple[float, float]] = None) -> np.ndarray:
+        """Boolean mask of rows that go on to the full models.
+
+        Rows without enough history to compute either statistic pass, so
+        new listings are never screened out blind. thresholds overrides
+        (volume ratio, return z) for this call.
+        """
+        volume_threshold, z_threshold = thresholds or (self.volume_ratio_threshold, self.return_z_threshold)
+        volume_ratio = stats['volume_ratio'].to_numpy()
+        return_z = stats['return_z'].to_numpy()
+        unknown = np.isnan(volume_ratio) & np.isnan(return_z)
+        with np.errstate(invalid='ignore'):
+            hot = (volume_ratio >= volume_threshold) | (return_z >= z_threshold)
+        return hot | unknown
+
+    def screen(self, candles: Dict[str, pd.DataFrame]) -> Tuple[List[str], List[str], pd.DataFrame]:
+        """Split symbols into (passed, screened out, stats)."""
+        stats = self.compute_stats(candles)
+        if stats.empty:
+            return [], [], stats
+
+        mask = self.passes(stats)
+        passed = list(stats.index[mask])
+        rejected = list(stats.index[~mask])
+        with self._lock:
+            self.screened += len(stats)
+            self.passed += len(passed)
+        return passed, rejected, stats
+
+    def audit_due(self, every: int) -> bool:
+        """Count one cascaded batch; True on every every-th one (never if every is 0)."""
+        with self._lock:
+            self.batches += 1
+            return bool(every) and self.batches % every == 0
+
+    def rolling_stats(self, df: pd.DataFrame) -> pd.DataFrame:
+        """The screen statistics for every row of one candle frame (for calibration)."""
+        returns = df['close'].pct_change()
+        past_returns = returns.shift(1).rolling(self.window, min_periods=2)
+        past_volume = df['volume'].shift(1).rolling(self.window, min_periods=1).mean()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stats = pd.DataFrame({
+                'volume_ratio': df['volume'] / past_volume,
+                'return_z': (returns - past_returns.mean()) / past_returns.std()
+            }, index=df.index)
+        return stats.replace([np.inf, -np.inf], np.nan)
+
+    def calibrate(self, stats: pd.DataFrame, labels: pd.Series, target_recall: float = 0.95) -> Dict:
+        """Scale both base thresholds together to the tightest setting that keeps target_recall of positives.
+
+        stats come from rolling_stats and labels are the pump detector's
+        labels for the same rows (NaN rows are ignored). The scale applies
+        to the constructor's thresholds, so repeated calibrations do not
+        compound.
+        """
+        valid = labels.notna()
+        stats = stats[valid]
+        labels = labels[valid].astype(int)
+        positives = labels.to_numpy() == 1
+        if not positives.any():
+            logger.warning("No positive labels to calibrate the cascade screen on")
+            return self.get_stats()
+
+        base = self.base_thresholds
+        best_scale = None
+        for scale in np.linspace(0.25, 4.0, 76):
+            mask = self.passes(stats, (base[0] * scale, base[1] * scale))
+            if mask[positives].mean() >= target_recall:
+                best_scale = scale
+
+        # Live screens keep the old thresholds until the new pair is set
+        scale = best_scale if best_scale is not None else 0.25
+        thresholds = (base[0] * scale, base[1] * scale)
+        mask = self.passes(stats, thresholds)
+        with self._lock:
+            self.volume_ratio_threshold, self.return_z_threshold = thresholds
+
+        result = {
+            'volume_ratio_threshold': self.volume_ratio_threshold,
+            'return_z_threshold': self.return_z_threshold,
+            'scale': float(scale),
+            'recall': float(mask[positives].mean()),
+            'pass_rate': float(mask.mean()),
+            'rows': int(len(stats))
+        }
+        logger.info(
+            f"Cascade screen calibrated: recall {result['recall']:.3f}, pass rate {result['pass_rate']:.3f}"
+        )
+        return result
+
+    def record_audit(self, passed: List[str], positives: List[str]):
+        """Compare one batch with its uncascaded run.
+
+        positives are the symbols the full models would have flagged when
+        scoring every symbol; recall is the share of them that passed.
+        """
+        passed = set(passed)
+        with self._lock:
+            self.audits += 1
+            self.audit_positives += len(positives)
+            self.audit_recalled += sum(1 for symbol in positives if symbol in passed)
+
+    def get_stats(self) -> Dict:
+        return {
+            'window': self.window,
+            'volume_ratio_threshold': self.volume_ratio_threshold,
+            'return_z_threshold': self.return_z_threshold,
+            'screened': self.screened,
+            'passed': self.passed,
+            'pass_rate': self.passed / self.screened if self.screened else 0.0,
+            'audits': self.audits,
+            'audit_positives': self.audit_positives,
+            'recall': self.audit_recalled / self.audit_positives if self.audit_positives else None
+        }
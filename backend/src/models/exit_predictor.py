@@ -1,16 +1,47 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import lightgbm as lgb
-from sklearn.model_selection import train_test_split
 import logging
 import pickle
+import os
+import time
+
+from ..feature_engineering.compact import CompactFeatures, select_feature_matrix
+from .tree_compiler import CompiledTreeEnsemble
+from .validation import ranking_metrics
+from .labels import binary_labels
 
 logger = logging.getLogger(__name__)
 
+def _stop_at_deadline(deadline: float):
+    """LightGBM callback that stops boosting once a wall-clock deadline has passed."""
+    def callback(env):
+        if time.time() > deadline:
+            raise lgb.callback.EarlyStopException(env.iteration, env.evaluation_result_list)
+    callback.order = 5
+    return callback
+
 class ExitPredictorModel:
     """ML model to predict optimal exit points."""
     
+    DEFAULT_PARAMS = {
+        'n_estimators': 100,
+        'max_depth': 5,
+        'learning_rate': 0.1
+    }
+    
+    # Candidate values for hyperparameter search
+    SEARCH_SPACE = {
+        'max_depth': [3, 5, 7, -1],
+        'num_leaves': [15, 31, 63],
+        'learning_rate': [0.02, 0.05, 0.1, 0.2],
+        'subsample': [0.6, 0.8, 1.0],
+        'subsample_freq': [1],
+        'colsample_bytree': [0.5, 0.7, 1.0],
+        'min_child_samples': [10, 20, 50]
+    }
+    
     def __init__(
         self,
         lookback_period: int = 30,
@@ -21,88 +52,168 @@ class ExitPredictorModel:
         self.lookahead_period = lookahead_period
         self.exit_threshold = exit_threshold
         self.model = None
+        self.compiled = None  # CompiledTreeEnsemble for fast numpy scoring
+        self.parity_sample = None  # Rows compile() last checked; saved with the model and rechecked on load
+        self.version = None  # Registry version this model was loaded from
+        self.training_params = {}  # Hyperparameters the booster was trained with, reused for warm starts
         self.feature_columns = []
     
-    def prepare_training_data(self, df: pd.DataFrame) -> tuple:
-        """Prepare training data with exit labels."""
+    def build_dataset(self, df: pd.DataFrame, labels: pd.Series = None) -> tuple:
+        """Build time-ordered (X, y) with exit labels, without splitting.
+
+        labels overrides the default labels, e.g. with a LabelEngine excursion
+        label or a triple-barrier label aligned with df, whose positive class is
+        the lower barrier first (-1). NaN rows are dropped.
+        """
         try:
-            df = df.copy()
-            
-            # Calculate future returns
-            df['future_return'] = df['close'].shift(-self.lookahead_period) / df['close'] - 1
-            
-            # Create exit signal (when price is about to drop)
-            df['should_exit'] = (df['future_return'] <= self.exit_threshold).astype(int)
+            if isinstance(df, CompactFeatures):
+                df = df.to_frame()
             
-            # Remove rows with NaN
-            df = df.dropna()
-            
-            if df.empty:
-                logger.warning("No training data after removing NaN values")
-                return None, None, None, None
+            if labels is None:
+                # Calculate future returns (labels are kept out of df to avoid copying it)
+                future_return = df['close'].shift(-self.lookahead_period) / df['close'] - 1
+                
+                # Create exit signal (when price is about to drop)
+                labels = (future_return <= self.exit_threshold).astype(int)
+                labels = labels.where(future_return.notna())
+            else:
+                labels = binary_labels(labels, triple_barrier_positive=-1.0)
             
             # Define feature columns
             exclude_cols = ['timestamp', 'should_exit', 'future_return']
             self.feature_columns = [col for col in df.columns if col not in exclude_cols]
             
-            X = df[self.feature_columns]
-            y = df['should_exit']
+            # Remove rows with NaN
+            valid = df[self.feature_columns].notna().all(axis=1) & labels.notna()
             
-            # Split data
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42, stratify=y if len(y.unique()) > 1 else None
-            )
+            if not valid.any():
+                logger.warning("No training data after removing NaN values")
+                return None, None
+            
+            X = df.loc[valid, self.feature_columns]
+            y = labels[valid].astype(int).rename('should_exit')
             
-            return X_train, X_test, y_train, y_test
+            return X, y
             
         except Exception as e:
-            logger.error(f"Error preparing training data: {e}")
+            logger.error(f"Error building training data: {e}")
+            return None, None
+    
+    def prepare_training_data(self, df: pd.DataFrame, test_size: float = 0.2, labels: pd.Series = None) -> tuple:
+        """Split the dataset chronologically: the most recent rows are the test set.
+
+        The lookahead_period rows before the test set are dropped, since their
+        labels are computed from test-period prices.
+        """
+        X, y = self.build_dataset(df, labels)
+        if X is None:
+            return None, None, None, None
+        
+        test_start = len(X) - max(1, int(len(X) * test_size))
+        train_end = test_start - self.lookahead_period
+        if train_end <= 0:
+            logger.warning("Not enough rows for a chronological train/test split")
             return None, None, None, None
+        
+        return X.iloc[:train_end], X.iloc[test_start:], y.iloc[:train_end], y.iloc[test_start:]
     
-    def train(self, X_train, y_train, X_test, y_test) -> Dict:
-        """Train the exit prediction model."""
+    def train(
+        self,
+        X_train,
+        y_train,
+        X_test=None,
+        y_test=None,
+        params: Dict = None,
+        early_stopping_rounds: int = None,
+        deadline: float = None
+    ) -> Dict:
+        """Train the exit prediction model; params override DEFAULT_PARAMS.
+
+        With early_stopping_rounds, (X_test, y_test) is the early-stopping set
+        and the model is left uncompiled. Training stops at the deadline
+        (a time.time() value) if one is given.
+        """
         try:
             # Calculate scale_pos_weight
             neg_count = (y_train == 0).sum()
             pos_count = (y_train == 1).sum()
             scale_pos_weight = neg_count / pos_count if pos_count > 0 else 1
+            self.training_params = {**self.DEFAULT_PARAMS, **(params or {}), 'scale_pos_weight': float(scale_pos_weight)}
             
             # Train LightGBM model
             self.model = lgb.LGBMClassifier(
-                n_estimators=100,
-                max_depth=5,
-                learning_rate=0.1,
+                **{**self.DEFAULT_PARAMS, **(params or {})},
                 scale_pos_weight=scale_pos_weight,
                 random_state=42,
                 verbose=-1
             )
             
-            self.model.fit(X_train, y_train)
+            callbacks = [_stop_at_deadline(deadline)] if deadline else []
+            if early_stopping_rounds:
+                callbacks.append(lgb.early_stopping(early_stopping_rounds, verbose=False))
+                self.model.set_params(metric='average_precision')
+                self.model.fit(X_train, y_train, eval_set=[(X_test, y_test)], callbacks=callbacks)
+            else:
+                self.model.fit(X_train, y_train, callbacks=callbacks)
+                self.compile(X_test if X_test is not None else X_train[-1000:])
             
             # Evaluate
-            train_score = self.model.score(X_train, y_train)
-            test_score = self.model.score(X_test, y_test)
-            
-            logger.info(f"Exit Predictor - Train Score: {train_score:.4f}, Test Score: {test_score:.4f}")
-            
-            return {
-                'train_score': train_score,
-                'test_score': test_score,
+            metrics = {
+                'train_score': self.model.score(X_train, y_train),
                 'feature_importance': dict(zip(self.feature_columns, self.model.feature_importances_))
             }
+            if early_stopping_rounds:
+                metrics['best_iteration'] = max(self.model.best_iteration_, 1) - 1
+            if X_test is not None and len(X_test):
+                metrics['test_score'] = self.model.score(X_test, y_test)
+                metrics.update(ranking_metrics(y_test, self.predict_proba(X_test)))
+                logger.info(
+                    f"Exit Predictor - Train Score: {metrics['train_score']:.4f}, "
+                    f"Test Score: {metrics['test_score']:.4f}, PR-AUC: {metrics['pr_auc']:.4f}"
+                )
+            
+            return metrics
             
         except Exception as e:
             logger.error(f"Error training exit predictor: {e}")
             return {}
     
-    def predict_proba(self, features: pd.DataFrame) -> Optional[np.ndarray]:
+    def continue_training(self, X, y, n_estimators: int = 10) -> bool:
+        """Append n_estimators trees fit on (X, y) to the current booster.
+
+        The previous booster is copied, not modified, so a model that is
+        still serving can be used as the starting point.
+        """
+        try:
+            if isinstance(self.model, lgb.LGBMClassifier):
+                params = self.model.get_params()
+            else:
+                # Booster from train_streaming or a native file: reuse its stored training params
+                params = {**self.DEFAULT_PARAMS, **self.training_params, 'random_state': 42, 'verbose': -1}
+            params.update(n_estimators=n_estimators)
+            model = lgb.LGBMClassifier(**params)
+            model.fit(X[self.feature_columns], y, init_model=self._booster())
+            self.model = model
+            self.compile(X.tail(1000))
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error updating exit predictor: {e}")
+            return False
+    
+    def predict_proba(self, features) -> Optional[np.ndarray]:
         """Predict exit probability."""
         if self.model is None:
             logger.warning("Model not trained yet")
             return None
         
         try:
-            features = features[self.feature_columns]
+            features = select_feature_matrix(features, self.feature_columns)
+            if self.compiled is not None and isinstance(features, np.ndarray):
+                return self.compiled.predict_proba(features)
+            if isinstance(features, np.ndarray) or isinstance(self.model, lgb.Booster):
+                # Booster skips the sklearn feature-name check for bare arrays
+                return self._booster().predict(features)
             proba = self.model.predict_proba(features)
             return proba[:, 1]  # Return probability of exit
             
@@ -110,6 +221,108 @@ class ExitPredictorModel:
             logger.error(f"Error predicting exit probability: {e}")
             return None
     
+    def _booster(self) -> lgb.Booster:
+        """Underlying booster, whether trained here or loaded from a native file."""
+        return self.model if isinstance(self.model, lgb.Booster) else self.model.booster_
+    
+    def train_streaming(
+        self,
+        train_set,
+        validation_set=None,
+        params: Dict = None,
+        early_stopping_rounds: int = 20,
+        cache_dir: str = None
+    ) -> Dict:
+        """Train on a PartitionDataset, building LightGBM's Dataset from lgb.Sequence chunks.
+
+        Rows are binned batch by batch, so raw features are never
+        materialized for the whole set. The trained booster replaces
+        self.model.
+        """
+        try:
+            labels = train_set.labels()
+            self.feature_columns = list(train_set.feature_columns)
+            pos_count = int(labels.sum())
+            neg_count = len(labels) - pos_count
+            
+            params = {**self.DEFAULT_PARAMS, **(params or {})}
+            self.training_params = {**params, 'scale_pos_weight': neg_count / pos_count if pos_count > 0 else 1}
+            num_boost_round = params.pop('n_estimators')
+            booster_params = {
+                **params,
+                'objective': 'binary',
+                'metric': 'average_precision',
+                'scale_pos_weight': neg_count / pos_count if pos_count > 0 else 1,
+                'seed': 42,
+                'verbose': -1
+            }
+            
+            dtrain = lgb.Dataset(
+                train_set.lgb_sequences(),
+                label=labels,
+                feature_name=self.feature_columns,
+                params={'verbose': -1}
+            )
+            
+            valid_sets = []
+            if validation_set is not None and validation_set.chunks:
+                validation_set.feature_columns = self.feature_columns
+                if len(validation_set):
+                    valid_sets = [lgb.Dataset(
+                        validation_set.lgb_sequences(),
+                        label=validation_set.labels(),
+                        feature_name=self.feature_columns,
+                        reference=dtrain
+                    )]
+            
+            callbacks = [lgb.early_stopping(early_stopping_rounds, verbose=False)] if valid_sets else []
+            self.model = lgb.train(
+                booster_params,
+                dtrain,
+                num_boost_round=num_boost_round,
+                valid_sets=valid_sets,
+                callbacks=callbacks
+            )
+            
+            metrics = {
+                'train_rows': len(labels),
+                'feature_importance': dict(zip(
+                    self.feature_columns,
+                    self.model.feature_importance(importance_type='gain').tolist()
+                ))
+            }
+            if valid_sets:
+                self.compile(validation_set.load_chunk(len(validation_set.chunks) - 1)[0])
+                y_val, scores = validation_set.predict(self.predict_proba)
+                metrics.update(ranking_metrics(y_val, scores))
+                metrics['validation_rows'] = len(y_val)
+                logger.info(f"Exit Predictor (streaming) - {len(labels)} rows, PR-AUC: {metrics['pr_auc']:.4f}")
+            else:
+                self.compile()
+            
+            return metrics
+            
+        except Exception as e:
+            logger.error(f"Error training exit predictor from stream: {e}")
+            return {}
+    
+    def compile(self, X_check: pd.DataFrame = None) -> bool:
+        """Flatten the trained trees for fast numpy scoring, checking parity on X_check."""
+        try:
+            compiled = CompiledTreeEnsemble.from_lightgbm(self._booster(), self.feature_columns)
+            if X_check is not None and len(X_check):
+                X_check = select_feature_matrix(X_check, self.feature_columns)
+                sample = np.asarray(X_check, dtype=np.float64)[-256:]
+                compiled.check_parity(sample, self._booster().predict(sample))
+                self.parity_sample = sample
+            self.compiled = compiled
+            return True
+            
+        except Exception as e:
+            logger.warning(f"Exit predictor not compiled, scoring with LightGBM: {e}")
+            self.compiled = None
+            return False
+    
     def save_model(self, filepath: str):
         """Save model to file."""
         try:
@@ -117,11 +330,7 @@ class ExitPredictorModel:
                 pickle.dump({
                     'model': self.model,
                     'feature_columns': self.feature_columns,
-                    'params': {
-                        'lookback_period': self.lookback_period,
-                        'lookahead_period': self.lookahead_period,
-                        'exit_threshold': self.exit_threshold
-                    }
+                    'params': self.get_params()
                 }, f)
             logger.info(f"Model saved to {filepath}")
         except Exception as e:
@@ -138,6 +347,34 @@ class ExitPredictorModel:
                 self.lookback_period = params['lookback_period']
                 self.lookahead_period = params['lookahead_period']
                 self.exit_threshold = params['exit_threshold']
+            self.compile()
             logger.info(f"Model loaded from {filepath}")
         except Exception as e:
-            logger.error(f"Error loading model: {e}")
\ No newline at end of file
+            logger.error(f"Error loading model: {e}")
+    
+    def get_params(self) -> Dict:
+        """Labeling parameters stored alongside the model."""
+        return {
+            'lookback_period': self.lookback_period,
+            'lookahead_period': self.lookahead_period,
+            'exit_threshold': self.exit_threshold
+        }
+    
+    def save_native(self, directory: str) -> str:
+        """Save the booster in LightGBM's text format, plus the parity sample if there is one."""
+        path = os.path.join(directory, 'model.txt')
+        self._booster().save_model(path)
+        if self.parity_sample is not None:
+            np.save(os.path.join(directory, 'parity_sample.npy'), self.parity_sample)
+        return path
+    
+    def load_native(self, directory: str, feature_columns: List[str], params: Dict):
+        """Load a booster saved by save_native."""
+        self.model = lgb.Booster(model_file=os.path.join(directory, 'model.txt'))
+        self.feature_columns = list(feature_columns)
+        self.lookback_period = params['lookback_period']
+        self.lookahead_period = params['lookahead_period']
+        self.exit_threshold = params['exit_threshold']
+        # Falls back to the native predictor if the compiled trees disagree on the saved rows
+        sample_path = os.path.join(directory, 'parity_sample.npy')
+        self.compile(np.load(sample_path) if os.path.exists(sample_path) else None)
@@ -0,0 +1,91 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+import math
+import logging
+
+logger = logging.getLogger(__name__)
+
+class FeaturePruner:
+    """Pick the smallest top-k feature set that keeps validation accuracy within a tolerance.
+
+    A baseline model is fit on every column on a chronological train split
+    and ranked by its feature_importance. Models restricted to the top k
+    columns are then fit for each candidate k (smallest first) and scored on
+    the time-ordered holdout; the first k whose score is no more than
+    tolerance below the baseline wins. The returned columns become the
+    model's feature_columns, which the registry stores and serving extracts.
+    """
+
+    def __init__(
+        self,
+        candidate_k: Sequence[int] = (8, 12, 16, 24, 32),
+        tolerance: float = 0.01,
+        metric: str = 'pr_auc',
+        test_size: float = 0.2
+    ):
+        self.candidate_k = sorted(set(int(k) for k in candidate_k))
+        self.tolerance = tolerance
+        self.metric = metric
+        self.test_size = test_size
+
+    @staticmethod
+    def rank(feature_importance: Dict[str, float]) -> List[str]:
+        """Columns by descending importance (ties keep the training order)."""
+        return [col for col, _ in sorted(feature_importance.items(), key=lambda item: -float(item[1]))]
+
+    def _fit_score(self, model, columns: List[str], split: Tuple, train_params: Dict) -> Tuple[float, Dict]:
+        X_train, X_test, y_train, y_test = split
+        candidate = type(model)(**model.get_params())
+        candidate.feature_columns = list(columns)
+        metrics = candidate.train(X_train[columns], y_train, X_test[columns], y_test, params=train_params)
+        score = metrics.get(self.metric, np.nan) if metrics else np.nan
+        return (-np.inf if score is None or math.isnan(score) else float(score)), metrics
+
+    def select(self, model, X: pd.DataFrame, y: pd.Series, train_params: Dict = None) -> Tuple[List[str], Dict]:
+        """Choose feature columns for model from time-ordered (X, y) built by build_dataset.
+
+        Returns (columns, report). All columns are kept if no candidate
+        stays within tolerance, the data is too small to split or the
+        baseline score is undefined on the holdout.
+        """
+        columns = list(model.feature_columns) or list(X.columns)
+        report = {'metric': self.metric, 'tolerance': self.tolerance, 'n_features': len(columns), 'trials': []}
+
+        test_start = len(X) - max(1, int(len(X) * self.test_size))
+        train_end = test_start - model.lookahead_period
+        if train_end <= 0 or y.iloc[:train_end].nunique() < 2:
+            logger.warning("Not enough data to prune features; keeping all columns")
+            report['selected'] = len(columns)
+            return columns, report
+        split = (X.iloc[:train_end], X.iloc[test_start:], y.iloc[:train_end], y.iloc[test_start:])
+
+        baseline, metrics = self._fit_score(model, columns, split, train_params)
+        report['baseline'] = baseline if math.isfinite(baseline) else None
+        if not metrics:
+            report['selected'] = len(columns)
+            return columns, report
+        if not math.isfinite(baseline):
+            # E.g. a single-class holdout: every candidate would pass against -inf
+            logger.warning(f"Baseline {self.metric} is undefined on the holdout; keeping all columns")
+            report['selected'] = len(columns)
+            return columns, report
+
+        ranked = self.rank(metrics['feature_importance'])
+        selected = columns
+        for k in self.candidate_k:
+            if k >= len(columns):
+                break
+            score, _ = self._fit_score(model, ranked[:k], split, train_params)
+            report['trials'].append({'k': k, 'score': score})
+            if score >= baseline - self.tolerance:
+                selected = ranked[:k]
+                break
+
+        report['selected'] = len(selected)
+        report['columns'] = list(selected)
+        logger.info(
+            f"{type(model).__name__} feature pruning: {len(selected)}/{len(columns)} columns "
+            f"({self.metric} baseline {baseline:.4f})"
+        )
+        return list(selected), report
@@ -0,0 +1,139 @@
+import pandas as pd
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+class FusedScorer:
+    """Score several models over one shared feature matrix.
+
+    Feature rows are copied once into a float64 matrix in the union of the
+    models' feature_columns. The union is laid out so each model's columns
+    form one contiguous block whenever possible (always when the models
+    share a column order), and each model then reads a zero-copy slice of
+    it. Models run back to back, or on a small thread pool for large
+    batches. Compiled ensembles score batches of up to compiled_max_rows;
+    bigger batches (e.g. whole backtest histories) go to the native booster,
+    which is faster in bulk. Results come back as one DataFrame with a
+    column per model. score() may be called from several threads.
+    """
+
+    def __init__(
+        self,
+        prediction_cache=None,
+        default_prob: float = 0.5,
+        concurrent_min_rows: int = 256,
+        compiled_max_rows: int = 4096
+    ):
+        self.prediction_cache = prediction_cache
+        self.default_prob = default_prob
+        self.concurrent_min_rows = concurrent_min_rows
+        self.compiled_max_rows = compiled_max_rows
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._layouts: Dict[Tuple, Tuple[List[str], Dict[str, object]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def plan_layout(column_sets: Dict[str, List[str]]) -> Tuple[List[str], Dict[str, object]]:
+        """Union column order plus, per model, a slice into it (or an index array if no slice fits)."""
+        union: List[str] = []
+        for columns in column_sets.values():
+            if FusedScorer._find_block(union, columns) is not None:
+                continue
+            # Longest tail of the union that starts this model's columns, so both stay contiguous
+            for overlap in range(min(len(union), len(columns)), -1, -1):
+                rest = columns[overlap:]
+                if union[len(union) - overlap:] == columns[:overlap] and not any(col in union for col in rest):
+                    union.extend(rest)
+                    break
+            else:
+                union.extend(col for col in columns if col not in union)
+
+        position = {col: i for i, col in enumerate(union)}
+        selectors = {}
+        for name, columns in column_sets.items():
+            start = FusedScorer._find_block(union, columns)
+            if start is not None:
+                selectors[name] = slice(start, start + len(columns))
+            else:
+                selectors[name] = np.array([position[col] for col in columns])
+        return union, selectors
+
+    @staticmethod
+    def _find_block(union: List[str], columns: List[str]) -> Optional[int]:
+        """Start of columns as a contiguous run inside union, or None."""
+        if not columns or columns[0] not in union:
+            return None
+        start = union.index(columns[0])
+        return start if union[start:start + len(columns)] == columns else None
+
+    def _layout(self, column_sets: Dict[str, List[str]]) -> Tuple[List[str], Dict[str, object]]:
+        key = tuple((name, tuple(columns)) for name, columns in column_sets.items())
+        with self._lock:
+            layout = self._layouts.get(key)
+            if layout is None:
+                layout = self.plan_layout(column_sets)
+                if any(not isinstance(selector, slice) for selector in layout[1].values()):
+                    logger.debug("Fused scorer: model column orders conflict, one model reads a copied view")
+                # Only the serving models' layout is kept; a swap replaces it
+                self._layouts = {key: layout}
+        return layout
+
+    def _predict(self, name: str, model, view: np.ndarray) -> Optional[np.ndarray]:
+        if model.compiled is not None and len(view) <= self.compiled_max_rows:
+            infer = model.predict_proba
+        else:
+            # Native boosters keep their feature-name checks; the frame wraps the view without copying
+            def infer(features):
+                return model.predict_proba(pd.DataFrame(features, columns=model.feature_columns, copy=False))
+
+        if self.prediction_cache is None:
+            return infer(view)
+        return self.prediction_cache.get_or_predict(
+            (name, model.version or id(model)), view, lambda missing: infer(view[missing])
+        )
+
+    def score(self, rows: pd.DataFrame, models: Dict[str, object], index=None) -> pd.DataFrame:
+        """Probabilities of every model for every row, one column per model name.
+
+        Untrained models (or failed predictions) get default_prob. index
+        labels the result rows, e.g. with symbols.
+        """
+        result = pd.DataFrame(
+            {name: np.full(len(rows), self.default_prob) for name in models},
+            index=index if index is not None else rows.index
+        )
+        trained = {name: model for name, model in models.items() if model.model is not None}
+        if not trained or not len(rows):
+            return result
+
+        union, selectors = self._layout({name: list(model.feature_columns) for name, model in trained.items()})
+        matrix = np.ascontiguousarray(rows[union].to_numpy(dtype=np.float64))
+        views = {name: matrix[:, selectors[name]] for name in trained}
+
+        if len(trained) > 1 and len(rows) >= self.concurrent_min_rows:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=len(trained), thread_name_prefix='fused-scorer')
+                executor = self._executor
+            futures = {
+                name: executor.submit(self._predict, name, model, views[name])
+                for name, model in trained.items()
+            }
+            probs = {name: future.result() for name, future in futures.items()}
+        else:
+            probs = {name: self._predict(name, model, views[name]) for name, model in trained.items()}
+
+        for name, values in probs.items():
+            if values is not None:
+                result[name] = np.asarray(values, dtype=float)
+        return result
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
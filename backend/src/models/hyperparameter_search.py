@@ -0,0 +1,188 @@
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Dict, List, Tuple
+import multiprocessing
+import math
+import os
+import time
+import logging
+
+from .validation import ranking_metrics
+
+logger = logging.getLogger(__name__)
+
+# Train/validation data of the current search, set once per worker process
+_search_data = {}
+
+def _init_search_worker(feature_columns: List[str], X_train, y_train, X_val, y_val):
+    _search_data.update(
+        X_train=pd.DataFrame(X_train, columns=feature_columns, copy=False),
+        y_train=y_train,
+        X_val=pd.DataFrame(X_val, columns=feature_columns, copy=False),
+        y_val=y_val,
+        feature_columns=feature_columns
+    )
+
+def _run_trial(model_class, label_params: Dict, params: Dict, n_estimators: int,
+               early_stopping_rounds: int, deadline: float, top_fraction: float) -> Dict:
+    """Train one configuration with early stopping and score it on the validation split."""
+    model = model_class(**label_params)
+    model.feature_columns = list(_search_data['feature_columns'])
+    start = time.time()
+    metrics = model.train(
+        _search_data['X_train'], _search_data['y_train'],
+        _search_data['X_val'], _search_data['y_val'],
+        params={**params, 'n_estimators': n_estimators, 'n_jobs': 1},
+        early_stopping_rounds=early_stopping_rounds,
+        deadline=deadline
+    )
+    if not metrics:
+        raise RuntimeError("Trial training failed")
+
+    scores = ranking_metrics(_search_data['y_val'], model.predict_proba(_search_data['X_val']), top_fraction)
+    return {
+        'params': params,
+        'n_estimators': n_estimators,
+        'best_iteration': int(metrics['best_iteration']),
+        'pr_auc': scores['pr_auc'],
+        'precision_at_k': scores['precision_at_k'],
+        'seconds': time.time() - start,
+        'truncated': time.time() > deadline
+    }
+
+class HyperparameterSearch:
+    """Successive-halving search over a model's SEARCH_SPACE within a wall-clock budget.
+
+    Each rung trains every surviving configuration in parallel worker
+    processes (one thread each) with the library's early stopping on a
+    time-ordered validation split, then keeps the best 1/eta by validation
+    PR-AUC and multiplies the round budget by eta. Trials stop themselves at
+    the deadline; a rung cut short by it does not count, and the winner is
+    taken from the last completed rung.
+    """
+
+    def __init__(
+        self,
+        n_trials: int = 24,
+        budget_seconds: float = 300,
+        min_rounds: int = 50,
+        max_rounds: int = 800,
+        eta: int = 3,
+        early_stopping_rounds: int = 20,
+        validation_size: float = 0.2,
+        top_fraction: float = 0.05,
+        max_workers: int = None,
+        seed: int = 42
+    ):
+        self.n_trials = n_trials
+        self.budget_seconds = budget_seconds
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+        self.eta = eta
+        self.early_stopping_rounds = early_stopping_rounds
+        self.validation_size = validation_size
+        self.top_fraction = top_fraction
+        self.max_workers = max_workers or max(1, os.cpu_count() or 1)
+        self.seed = seed
+
+    def sample_configs(self, space: Dict[str, List]) -> List[Dict]:
+        """Draw n_trials distinct configurations (the defaults always included)."""
+        rng = np.random.default_rng(self.seed)
+        configs = [{}]
+        seen = {()}
+        attempts = 0
+        while len(configs) < self.n_trials and attempts < self.n_trials * 20:
+            attempts += 1
+            config = {name: values[rng.integers(len(values))] for name, values in space.items()}
+            config = {name: value.item() if hasattr(value, 'item') else value for name, value in config.items()}
+            key = tuple(sorted(config.items()))
+            if key not in seen:
+                seen.add(key)
+                configs.append(config)
+        return configs
+
+    def search(self, model, X: pd.DataFrame, y: pd.Series) -> Tuple[Dict, Dict]:
+        """Search training params for a model on time-ordered (X, y) from build_dataset.
+
+        Returns (best params for model.train, summary). The best params
+        include n_estimators taken from the winner's early-stopping point.
+        """
+        deadline = time.time() + self.budget_seconds
+        feature_columns = list(model.feature_columns) or list(X.columns)
+
+        # Chronological split with the label horizon purged in between
+        val_start = len(X) - max(1, int(len(X) * self.validation_size))
+        train_end = max(0, val_start - model.lookahead_period)
+        values = np.ascontiguousarray(X[feature_columns].to_numpy(dtype=np.float64))
+        labels = np.asarray(y, dtype=np.int64)
+
+        configs = [
+            {**model.DEFAULT_PARAMS, **config} for config in self.sample_configs(model.SEARCH_SPACE)
+        ]
+        for config in configs:
+            config.pop('n_estimators', None)
+
+        rungs = []
+        leaderboard = []
+        rounds = self.min_rounds
+        context = multiprocessing.get_context('spawn')
+        executor = ProcessPoolExecutor(
+            max_workers=min(self.max_workers, len(configs)),
+            mp_context=context,
+            initializer=_init_search_worker,
+            initargs=(feature_columns, values[:train_end], labels[:train_end], values[val_start:], labels[val_start:])
+        )
+        try:
+            while configs and time.time() < deadline:
+                futures = [
+                    executor.submit(
+                        _run_trial, type(model), model.get_params(), config, rounds,
+                        self.early_stopping_rounds, deadline, self.top_fraction
+                    )
+                    for config in configs
+                ]
+                done, pending = wait(futures, timeout=max(0.0, deadline - time.time()) + 5)
+                for future in pending:
+                    future.cancel()
+
+                results = []
+                for future in done:
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        logger.error(f"Error in search trial: {e}")
+
+                complete = not pending and not any(result['truncated'] for result in results)
+                results.sort(key=lambda r: -np.inf if math.isnan(r['pr_auc']) else r['pr_auc'], reverse=True)
+                rungs.append({'rounds': rounds, 'trials': len(futures), 'completed': complete})
+                if not complete or not results:
+                    break
+
+                leaderboard = results
+                logger.info(
+                    f"{type(model).__name__} search rung ({rounds} rounds): "
+                    f"{len(results)} trials, best PR-AUC {results[0]['pr_auc']:.4f}"
+                )
+                if rounds >= self.max_rounds or len(results) == 1:
+                    break
+                configs = [result['params'] for result in results[:max(1, len(results) // self.eta)]]
+                rounds = min(rounds * self.eta, self.max_rounds)
+
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        summary = {
+            'budget_seconds': self.budget_seconds,
+            'elapsed_seconds': self.budget_seconds - (deadline - time.time()),
+            'rungs': rungs,
+            'leaderboard': leaderboard[:5]
+        }
+        if not leaderboard:
+            logger.warning(f"{type(model).__name__} search finished no rung in budget; using defaults")
+            return dict(model.DEFAULT_PARAMS), summary
+
+        best = leaderboard[0]
+        best_params = {**best['params'], 'n_estimators': best['best_iteration'] + 1}
+        summary['best'] = {**best, 'params': best_params}
+        return best_params, summary
@@ -0,0 +1,156 @@
+import pandas as pd
+from typing import Dict, Optional, Tuple
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class IncrementalUpdater:
+    """Fold newly closed candles into the serving models by appending trees.
+
+    Keeps a sliding window of recent feature rows. Once enough rows have had
+    their labels resolved (lookahead_period candles after they closed), a
+    copy of the model gets trees_per_update new trees fit on the recent
+    labeled rows, starting from the existing booster. After rebuild_every
+    updates, or once max_added_trees have been appended, update() reports
+    that a full rebuild is due instead; the counters reset when a model
+    with a different base version is passed in. After a failed rebuild the
+    next one waits rebuild_cooldown seconds, doubling per consecutive
+    failure up to max_rebuild_cooldown.
+    """
+
+    def __init__(
+        self,
+        window_size: int = 2000,
+        trees_per_update: int = 5,
+        min_new_rows: int = 10,
+        min_fit_rows: int = 500,
+        rebuild_every: int = 96,
+        max_added_trees: int = 400,
+        rebuild_cooldown: float = 300.0,
+        max_rebuild_cooldown: float = 6 * 3600.0
+    ):
+        self.window_size = window_size
+        self.trees_per_update = trees_per_update
+        self.min_new_rows = min_new_rows
+        self.min_fit_rows = min_fit_rows
+        self.rebuild_every = rebuild_every
+        self.max_added_trees = max_added_trees
+        self.rebuild_cooldown = rebuild_cooldown
+        self.max_rebuild_cooldown = max_rebuild_cooldown
+        self.failed_rebuilds = 0
+        self.rebuild_retry_at = 0.0
+        self.window = pd.DataFrame()
+        self._state: Dict[str, Dict] = {}
+
+    def add_features(self, features: pd.DataFrame) -> int:
+        """Append closed-candle feature rows, keeping the last window_size. Returns rows added."""
+        if not self.window.empty:
+            features = features[features['timestamp'] > self.window['timestamp'].iloc[-1]]
+        if features.empty:
+            return 0
+        
+        combined = features if self.window.empty else pd.concat([self.window, features], ignore_index=True)
+        self.window = combined.iloc[-self.window_size:].reset_index(drop=True)
+        return len(features)
+
+    @staticmethod
+    def base_version(model) -> Optional[str]:
+        return model.version.split('+')[0] if model.version else None
+
+    def _model_state(self, name: str, model) -> Dict:
+        base = self.base_version(model)
+        state = self._state.get(name)
+        if state is None or state['base_version'] != base:
+            # New or swapped-in model: it has already seen everything labeled so far
+            state = {'base_version': base, 'trained_until': None, 'updates': 0, 'trees_added': 0}
+            self._state[name] = state
+        return state
+
+    def needs_rebuild(self, name: str) -> bool:
+        state = self._state.get(name)
+        return state is not None and (
+            state['updates'] >= self.rebuild_every or state['trees_added'] >= self.max_added_trees
+        )
+
+    def can_start_rebuild(self, now: float = None) -> bool:
+        """False while backing off after a failed rebuild."""
+        return (time.time() if now is None else now) >= self.rebuild_retry_at
+
+    def rebuild_finished(self, succeeded: bool, now: float = None) -> float:
+        """Record a rebuild's outcome; returns the wait before another one may start."""
+        if succeeded:
+            self.failed_rebuilds = 0
+            self.rebuild_retry_at = 0.0
+            return 0.0
+        self.failed_rebuilds += 1
+        cooldown = min(self.rebuild_cooldown * 2 ** (self.failed_rebuilds - 1), self.max_rebuild_cooldown)
+        self.rebuild_retry_at = (time.time() if now is None else now) + cooldown
+        return cooldown
+
+    def update(self, name: str, model) -> Tuple[Optional[object], Dict]:
+        """Build an updated copy of model from the window.
+
+        Returns (new model or None, info). The serving model is never
+        modified; the caller swaps the copy in.
+        """
+        info = {'model': name, 'updated': False, 'rebuild_due': False, 'new_rows': 0}
+        try:
+            if model.model is None or self.window.empty:
+                return None, info
+
+            state = self._model_state(name, model)
+            if self.needs_rebuild(name):
+                info['rebuild_due'] = True
+                return None, info
+
+            # build_dataset resets feature_columns, so label the window on the copy
+            updated = type(model)(**model.get_params())
+            X, y = updated.build_dataset(self.window)
+            if X is None or not len(X):
+                return None, info
+            updated.feature_columns = list(model.feature_columns)
+            updated.training_params = dict(model.training_params)
+            timestamps = self.window.loc[X.index, 'timestamp']
+            if state['trained_until'] is None:
+                state['trained_until'] = timestamps.iloc[-1]
+                return None, info
+
+            new_rows = int((timestamps > state['trained_until']).sum())
+            info['new_rows'] = new_rows
+            if new_rows < self.min_new_rows:
+                return None, info
+
+            # Fit on the new rows plus enough recent context to avoid tiny samples
+            fit_rows = max(new_rows, self.min_fit_rows)
+            updated.model = model.model
+            if not updated.continue_training(X.iloc[-fit_rows:], y.iloc[-fit_rows:], self.trees_per_update):
+                return None, info
+
+            state['trained_until'] = timestamps.iloc[-1]
+            state['updates'] += 1
+            state['trees_added'] += self.trees_per_update
+            updated.version = f"{state['base_version']}+{state['updates']}"
+
+            info.update(updated=True, version=updated.version, fit_rows=min(fit_rows, len(X)))
+            info['rebuild_due'] = self.needs_rebuild(name)
+            return updated, info
+
+        except Exception as e:
+            logger.error(f"Error updating {name} incrementally: {e}")
+            return None, info
+
+    def get_stats(self) -> Dict:
+        return {
+            'window_rows': len(self.window),
+            'window_end': self.window['timestamp'].iloc[-1].isoformat() if not self.window.empty else None,
+            'failed_rebuilds': self.failed_rebuilds,
+            'rebuild_retry_in': max(0.0, self.rebuild_retry_at - time.time()),
+            'models': {
+                name: {
+                    **state,
+                    'trained_until': state['trained_until'].isoformat() if state['trained_until'] is not None else None
+                }
+                for name, state in self._state.items()
+            }
+        }
@@ -0,0 +1,165 @@
+import pandas as pd
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, List, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+class LabelGrid:
+    """Forward excursions of one price series for a grid of horizons.
+
+    For the candle at row t (entered at its close) and horizon h, MFE is
+    max(high[t+1..t+h]) / close[t] - 1 and MAE is min(low[t+1..t+h]) / close[t] - 1.
+    Rows whose horizon runs past the end of the series are NaN. Any
+    (threshold, horizon) label is a cheap comparison on these arrays.
+    """
+
+    def __init__(
+        self,
+        index: pd.Index,
+        close: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        mfe: Dict[int, np.ndarray],
+        mae: Dict[int, np.ndarray]
+    ):
+        self.index = index
+        self.close = close
+        self.high = high
+        self.low = low
+        self._mfe = mfe
+        self._mae = mae
+
+    @property
+    def horizons(self) -> List[int]:
+        return sorted(self._mfe)
+
+    def _check(self, horizon: int):
+        if horizon not in self._mfe:
+            raise ValueError(f"Horizon {horizon} not in label grid {self.horizons}")
+
+    def mfe(self, horizon: int) -> pd.Series:
+        """Maximum favorable excursion over the next horizon candles."""
+        self._check(horizon)
+        return pd.Series(self._mfe[horizon], index=self.index, name=f'mfe_{horizon}')
+
+    def mae(self, horizon: int) -> pd.Series:
+        """Maximum adverse excursion over the next horizon candles (<= 0)."""
+        self._check(horizon)
+        return pd.Series(self._mae[horizon], index=self.index, name=f'mae_{horizon}')
+
+    def forward_return(self, horizon: int) -> pd.Series:
+        """Point-in-time close-to-close return, as the models label by default."""
+        future = np.full(len(self.close), np.nan)
+        if horizon < len(self.close):
+            future[:len(self.close) - horizon] = self.close[horizon:]
+        return pd.Series(future / self.close - 1, index=self.index, name=f'return_{horizon}')
+
+    def reaches(self, threshold: float, horizon: int) -> pd.Series:
+        """1.0 where price touches +threshold (MFE) or, for a negative threshold, -|threshold| (MAE).
+
+        Matches the sign convention of pump_threshold and exit_threshold.
+        NaN where the horizon is incomplete.
+        """
+        self._check(horizon)
+        excursion = self._mfe[horizon] if threshold >= 0 else self._mae[horizon]
+        hit = excursion >= threshold if threshold >= 0 else excursion <= threshold
+        labels = np.where(np.isnan(excursion), np.nan, hit.astype(float))
+        return pd.Series(labels, index=self.index, name=f'reaches_{threshold:g}_{horizon}')
+
+    def triple_barrier(self, upper: float, lower: float, horizon: int) -> pd.Series:
+        """Triple-barrier labels: 1 if +upper is hit first, -1 if -lower is hit first, 0 if neither.
+
+        Rows that touch both barriers within the horizon are resolved by
+        scanning just those rows' windows for the first touch. A candle that
+        touches both counts as the lower barrier first (the conservative
+        reading for a long entry). NaN where the horizon is incomplete.
+        """
+        self._check(horizon)
+        mfe = self._mfe[horizon]
+        mae = self._mae[horizon]
+        hit_upper = mfe >= upper
+        hit_lower = mae <= -lower
+
+        labels = np.where(hit_upper, 1.0, np.where(hit_lower, -1.0, 0.0))
+        labels[np.isnan(mfe)] = np.nan
+
+        ambiguous = np.flatnonzero(hit_upper & hit_lower)
+        if len(ambiguous):
+            # Candles t+1..t+horizon for each ambiguous row t
+            highs = sliding_window_view(self.high, horizon)[ambiguous + 1]
+            lows = sliding_window_view(self.low, horizon)[ambiguous + 1]
+            entry = self.close[ambiguous, None]
+            upper_touch = highs >= entry * (1 + upper)
+            lower_touch = lows <= entry * (1 - lower)
+            # Both are true somewhere in the window, so argmax finds the first touch
+            first_upper = upper_touch.argmax(axis=1)
+            first_lower = lower_touch.argmax(axis=1)
+            labels[ambiguous] = np.where(first_upper < first_lower, 1.0, -1.0)
+
+        return pd.Series(labels, index=self.index, name=f'tb_{upper:g}_{lower:g}_{horizon}')
+
+    def base_rates(self, thresholds: Sequence[float], horizons: Sequence[int] = None) -> pd.DataFrame:
+        """Share of rows whose MFE reaches +threshold and whose MAE reaches -threshold, per horizon."""
+        rows = []
+        for horizon in horizons or self.horizons:
+            self._check(horizon)
+            valid = ~np.isnan(self._mfe[horizon])
+            for threshold in thresholds:
+                rows.append({
+                    'horizon': horizon,
+                    'threshold': threshold,
+                    'up_rate': float((self._mfe[horizon][valid] >= threshold).mean()) if valid.any() else np.nan,
+                    'down_rate': float((self._mae[horizon][valid] <= -threshold).mean()) if valid.any() else np.nan
+                })
+        return pd.DataFrame(rows)
+
+class LabelEngine:
+    """Compute forward excursions for every horizon in one vectorized pass."""
+
+    def __init__(self, horizons: Sequence[int] = (5, 10, 15, 30, 60)):
+        self.horizons = sorted(set(int(h) for h in horizons))
+        if not self.horizons or self.horizons[0] < 1:
+            raise ValueError("Horizons must be positive candle counts")
+
+    def compute(self, df: pd.DataFrame) -> LabelGrid:
+        """Build the label grid for an OHLCV (or feature) frame ordered by time."""
+        close = df['close'].to_numpy(dtype=np.float64)
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        n = len(close)
+
+        # Running forward max/min, extended one candle at a time up to the longest horizon
+        running_max = np.full(n, -np.inf)
+        running_min = np.full(n, np.inf)
+        wanted = set(self.horizons)
+        mfe, mae = {}, {}
+        for k in range(1, self.horizons[-1] + 1):
+            if k < n:
+                np.maximum(running_max[:n - k], high[k:], out=running_max[:n - k])
+                np.minimum(running_min[:n - k], low[k:], out=running_min[:n - k])
+            if k in wanted:
+                mfe[k] = running_max / close - 1
+                mae[k] = running_min / close - 1
+                # The last k rows do not have k future candles
+                mfe[k][max(0, n - k):] = np.nan
+                mae[k][max(0, n - k):] = np.nan
+
+        return LabelGrid(df.index, close, high, low, mfe, mae)
+
+def binary_labels(labels: pd.Series, triple_barrier_positive: float) -> pd.Series:
+    """0/1 training labels (NaN kept) for a binary classifier.
+
+    0/1 labels pass through. Triple-barrier labels (-1/0/1, recognized by a
+    -1 value or their tb_ name) become 1 where they equal
+    triple_barrier_positive: 1 for the upper barrier, -1 for the lower.
+    Anything else, e.g. raw returns, raises ValueError.
+    """
+    values = set(np.unique(labels.dropna().to_numpy()))
+    triple_barrier = -1.0 in values or str(labels.name).startswith('tb_')
+    if not values <= ({-1.0, 0.0, 1.0} if triple_barrier else {0.0, 1.0}):
+        raise ValueError(f"Labels must be 0/1 or triple-barrier -1/0/1, got values like {sorted(values)[:5]}")
+    if not triple_barrier:
+        return labels
+    return (labels == triple_barrier_positive).astype(float).where(labels.notna())
@@ -0,0 +1,154 @@
+from pathlib import Path
+from typing import Dict, List, Optional
+from datetime import datetime, timezone
+import json
+import math
+import os
+import shutil
+import threading
+import uuid
+import logging
+
+from .pump_detector import PumpDetectorModel
+from .exit_predictor import ExitPredictorModel
+
+logger = logging.getLogger(__name__)
+
+MODEL_CLASSES = {
+    'pump_detector': PumpDetectorModel,
+    'exit_predictor': ExitPredictorModel
+}
+
+class ModelRegistry:
+    """Versioned model artifacts in each library's native format.
+
+    Layout: <root>/<model name>/<version>/ holds the booster file
+    (model.json for XGBoost, model.txt for LightGBM) plus metadata.json with
+    feature columns, params, training window and metrics. <root>/<model name>/ACTIVE
+    names the version to serve and is replaced atomically.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    def _model_path(self, name: str) -> Path:
+        if name not in MODEL_CLASSES:
+            raise ValueError(f"Unknown model: {name}")
+        return self.root / name
+
+    def register(
+        self,
+        name: str,
+        model,
+        metrics: Dict = None,
+        training_window: Dict = None,
+        extra: Dict = None,
+        activate: bool = False
+    ) -> str:
+        """Write a trained model as a new version and return its version id."""
+        if model.model is None:
+            raise ValueError(f"Cannot register untrained {name}")
+
+        created_at = datetime.now(timezone.utc)
+        version = f"{created_at.strftime('%Y%m%dT%H%M%SZ')}-{uuid.uuid4().hex[:6]}"
+        model_path = self._model_path(name)
+        staging = model_path / f".{version}.tmp"
+        staging.mkdir(parents=True, exist_ok=True)
+
+        try:
+            model.save_native(str(staging))
+            metadata = {
+                'name': name,
+                'version': version,
+                'created_at': created_at.isoformat(),
+                'feature_columns': list(model.feature_columns),
+                'params': model.get_params(),
+                'training_params': _to_json_safe(model.training_params),
+                'training_window': training_window or {},
+                'metrics': _to_json_safe(metrics or {}),
+                **_to_json_safe(extra or {})
+            }
+            with open(staging / 'metadata.json', 'w') as f:
+                json.dump(metadata, f, indent=2)
+
+            os.replace(staging, model_path / version)
+
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        model.version = version
+        logger.info(f"Registered {name} version {version}")
+
+        if activate:
+            self.activate(name, version)
+        return version
+
+    def list_versions(self, name: str) -> List[Dict]:
+        """List metadata for every version of a model, newest first."""
+        model_path = self._model_path(name)
+        if not model_path.exists():
+            return []
+
+        versions = []
+        for path in model_path.iterdir():
+            meta_path = path / 'metadata.json'
+            if path.is_dir() and not path.name.startswith('.') and meta_path.exists():
+                with open(meta_path) as f:
+                    versions.append(json.load(f))
+        return sorted(versions, key=lambda meta: meta['version'], reverse=True)
+
+    def get_metadata(self, name: str, version: str) -> Dict:
+        with open(self._model_path(name) / version / 'metadata.json') as f:
+            return json.load(f)
+
+    def get_active_version(self, name: str) -> Optional[str]:
+        active_path = self._model_path(name) / 'ACTIVE'
+        if not active_path.exists():
+            return None
+        return active_path.read_text().strip() or None
+
+    def activate(self, name: str, version: str):
+        """Point ACTIVE at a version with an atomic file replace."""
+        model_path = self._model_path(name)
+        if not (model_path / version / 'metadata.json').exists():
+            raise ValueError(f"Unknown version for {name}: {version}")
+
+        with self._lock:
+            staging = model_path / f".ACTIVE.{uuid.uuid4().hex}"
+            staging.write_text(version)
+            os.replace(staging, model_path / 'ACTIVE')
+        logger.info(f"Activated {name} version {version}")
+
+    def load(self, name: str, version: str = None):
+        """Load a version (the active one by default) into a new model object.
+
+        Returns None if nothing has been registered yet.
+        """
+        version = version or self.get_active_version(name)
+        if version is None:
+            return None
+
+        metadata = self.get_metadata(name, version)
+        model = MODEL_CLASSES[name]()
+        model.load_native(
+            str(self._model_path(name) / version),
+            metadata['feature_columns'],
+            metadata['params']
+        )
+        model.training_params = metadata.get('training_params', {})
+        model.version = version
+        return model
+
+def _to_json_safe(value):
+    """Convert numpy scalars in nested metrics to plain Python values (NaN becomes None)."""
+    if isinstance(value, dict):
+        return {str(k): _to_json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json_safe(v) for v in value]
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
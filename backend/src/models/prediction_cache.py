@@ -0,0 +1,105 @@
+import numpy as np
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Callable, Dict, Hashable, Optional, Tuple
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PredictionCache:
+    """LRU cache of model probabilities keyed by model version and feature-row fingerprint.
+
+    Rows are fingerprinted with a 16-byte blake2b of their float64 bytes, so
+    identical inputs within a candle skip inference. The whole cache is
+    dropped when a newer candle is observed and when models are hot-swapped,
+    so stale probabilities are never served.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_candle = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.clears = 0
+
+    @staticmethod
+    def fingerprint(row: np.ndarray) -> bytes:
+        return blake2b(np.ascontiguousarray(row, dtype=np.float64).tobytes(), digest_size=16).digest()
+
+    def get_or_predict(
+        self,
+        model_key: Hashable,
+        X: np.ndarray,
+        predict: Callable[[np.ndarray], Optional[np.ndarray]]
+    ) -> Optional[np.ndarray]:
+        """Probabilities for each row of X, calling predict(row indices) only for misses.
+
+        Returns None if predict fails for the missing rows.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        keys = [(model_key, self.fingerprint(row)) for row in X]
+        probs = np.empty(len(keys))
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                value = self._entries.get(key)
+                if value is None:
+                    missing.append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    probs[i] = value
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if not missing:
+            return probs
+
+        missing = np.asarray(missing)
+        predicted = predict(missing)
+        if predicted is None:
+            return None
+        probs[missing] = predicted
+
+        with self._lock:
+            for i, value in zip(missing, np.asarray(predicted, dtype=float)):
+                self._entries[keys[i]] = float(value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return probs
+
+    def observe_candle(self, candle_timestamp):
+        """Drop every entry once a newer candle than any seen before shows up."""
+        with self._lock:
+            if self._last_candle is not None and candle_timestamp <= self._last_candle:
+                return
+            previous = self._last_candle
+            self._last_candle = candle_timestamp
+        if previous is not None:
+            self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.clears += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'evictions': self.evictions,
+                'clears': self.clears,
+                'last_candle': str(self._last_candle) if self._last_candle is not None else None
+            }
@@ -1,16 +1,48 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import xgboost as xgb
-from sklearn.model_selection import train_test_split
 import logging
 import pickle
+import os
+import time
+
+from ..feature_engineering.compact import CompactFeatures, select_feature_matrix
+from .tree_compiler import CompiledTreeEnsemble
+from .validation import ranking_metrics
+from .labels import binary_labels
 
 logger = logging.getLogger(__name__)
 
+class _StopAtDeadline(xgb.callback.TrainingCallback):
+    """Stop boosting once a wall-clock deadline has passed."""
+    
+    def __init__(self, deadline: float):
+        super().__init__()
+        self.deadline = deadline
+    
+    def after_iteration(self, model, epoch, evals_log) -> bool:
+        return time.time() > self.deadline
+
 class PumpDetectorModel:
     """ML model to detect potential pump opportunities in meme coins."""
     
+    DEFAULT_PARAMS = {
+        'n_estimators': 100,
+        'max_depth': 5,
+        'learning_rate': 0.1
+    }
+    
+    # Candidate values for hyperparameter search
+    SEARCH_SPACE = {
+        'max_depth': [3, 4, 5, 6, 8],
+        'learning_rate': [0.02, 0.05, 0.1, 0.2],
+        'subsample': [0.6, 0.8, 1.0],
+        'colsample_bytree': [0.5, 0.7, 1.0],
+        'min_child_weight': [1, 5, 20],
+        'reg_lambda': [0.1, 1.0, 10.0]
+    }
+    
     def __init__(
         self,
         lookback_period: int = 60,
@@ -21,89 +53,174 @@ class PumpDetectorModel:
         self.lookahead_period = lookahead_period
         self.pump_threshold = pump_threshold
         self.model = None
+        self.compiled = None  # CompiledTreeEnsemble for fast numpy scoring
+        self.parity_sample = None  # Rows compile() last checked; saved with the model and rechecked on load
+        self.version = None  # Registry version this model was loaded from
+        self.training_params = {}  # Hyperparameters the booster was trained with, reused for warm starts
         self.feature_columns = []
     
-    def prepare_training_data(self, df: pd.DataFrame) -> tuple:
-        """Prepare training data with pump labels."""
+    def build_dataset(self, df: pd.DataFrame, labels: pd.Series = None) -> tuple:
+        """Build time-ordered (X, y) with pump labels, without splitting.
+
+        labels overrides the default labels, e.g. with a LabelEngine excursion
+        label or a triple-barrier label aligned with df, whose positive class is
+        the upper barrier first (1). NaN rows are dropped.
+        """
         try:
-            df = df.copy()
+            if isinstance(df, CompactFeatures):
+                df = df.to_frame()
             
-            # Calculate future returns
-            df['future_return'] = df['close'].shift(-self.lookahead_period) / df['close'] - 1
-            
-            # Create pump label
-            df['is_pump'] = (df['future_return'] >= self.pump_threshold).astype(int)
-            
-            # Remove rows with NaN
-            df = df.dropna()
-            
-            if df.empty:
-                logger.warning("No training data after removing NaN values")
-                return None, None, None, None
+            if labels is None:
+                # Calculate future returns (labels are kept out of df to avoid copying it)
+                future_return = df['close'].shift(-self.lookahead_period) / df['close'] - 1
+                
+                # Create pump label
+                labels = (future_return >= self.pump_threshold).astype(int)
+                labels = labels.where(future_return.notna())
+            else:
+                labels = binary_labels(labels, triple_barrier_positive=1.0)
             
             # Define feature columns (exclude target and metadata)
             exclude_cols = ['timestamp', 'is_pump', 'future_return']
             self.feature_columns = [col for col in df.columns if col not in exclude_cols]
             
-            X = df[self.feature_columns]
-            y = df['is_pump']
+            # Remove rows with NaN
+            valid = df[self.feature_columns].notna().all(axis=1) & labels.notna()
             
-            # Split data
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42, stratify=y if len(y.unique()) > 1 else None
-            )
+            if not valid.any():
+                logger.warning("No training data after removing NaN values")
+                return None, None
+            
+            X = df.loc[valid, self.feature_columns]
+            y = labels[valid].astype(int).rename('is_pump')
             
-            return X_train, X_test, y_train, y_test
+            return X, y
             
         except Exception as e:
-            logger.error(f"Error preparing training data: {e}")
+            logger.error(f"Error building training data: {e}")
+            return None, None
+    
+    def prepare_training_data(self, df: pd.DataFrame, test_size: float = 0.2, labels: pd.Series = None) -> tuple:
+        """Split the dataset chronologically: the most recent rows are the test set.
+
+        The lookahead_period rows before the test set are dropped, since their
+        labels are computed from test-period prices.
+        """
+        X, y = self.build_dataset(df, labels)
+        if X is None:
             return None, None, None, None
+        
+        test_start = len(X) - max(1, int(len(X) * test_size))
+        train_end = test_start - self.lookahead_period
+        if train_end <= 0:
+            logger.warning("Not enough rows for a chronological train/test split")
+            return None, None, None, None
+        
+        return X.iloc[:train_end], X.iloc[test_start:], y.iloc[:train_end], y.iloc[test_start:]
     
-    def train(self, X_train, y_train, X_test, y_test) -> Dict:
-        """Train the pump detection model."""
+    def train(
+        self,
+        X_train,
+        y_train,
+        X_test=None,
+        y_test=None,
+        params: Dict = None,
+        early_stopping_rounds: int = None,
+        deadline: float = None
+    ) -> Dict:
+        """Train the pump detection model; params override DEFAULT_PARAMS.
+
+        With early_stopping_rounds, (X_test, y_test) is the early-stopping set
+        and the model is left uncompiled. Training stops at the deadline
+        (a time.time() value) if one is given.
+        """
         try:
             # Calculate scale_pos_weight for imbalanced data
             neg_count = (y_train == 0).sum()
             pos_count = (y_train == 1).sum()
             scale_pos_weight = neg_count / pos_count if pos_count > 0 else 1
+            self.training_params = {**self.DEFAULT_PARAMS, **(params or {}), 'scale_pos_weight': float(scale_pos_weight)}
             
             # Train XGBoost model
             self.model = xgb.XGBClassifier(
-                n_estimators=100,
-                max_depth=5,
-                learning_rate=0.1,
+                **{**self.DEFAULT_PARAMS, **(params or {})},
                 scale_pos_weight=scale_pos_weight,
                 random_state=42,
-                tree_method='hist'
+                tree_method='hist',
+                early_stopping_rounds=early_stopping_rounds,
+                eval_metric='aucpr' if early_stopping_rounds else None,
+                callbacks=[_StopAtDeadline(deadline)] if deadline else None
             )
             
-            self.model.fit(X_train, y_train)
+            if early_stopping_rounds:
+                self.model.fit(X_train, y_train, eval_set=[(X_test, y_test)], verbose=False)
+            else:
+                self.model.fit(X_train, y_train)
+                self.compile(X_test if X_test is not None else X_train[-1000:])
             
             # Evaluate
-            train_score = self.model.score(X_train, y_train)
-            test_score = self.model.score(X_test, y_test)
-            
-            logger.info(f"Pump Detector - Train Score: {train_score:.4f}, Test Score: {test_score:.4f}")
-            
-            return {
-                'train_score': train_score,
-                'test_score': test_score,
+            metrics = {
+                'train_score': self.model.score(X_train, y_train),
                 'feature_importance': dict(zip(self.feature_columns, self.model.feature_importances_))
             }
+            if early_stopping_rounds:
+                # Unset when the deadline stopped training before early stopping kicked in
+                booster = self.model.get_booster()
+                metrics['best_iteration'] = int(booster.attr('best_iteration') or booster.num_boosted_rounds() - 1)
+            if X_test is not None and len(X_test):
+                metrics['test_score'] = self.model.score(X_test, y_test)
+                metrics.update(ranking_metrics(y_test, self.predict_proba(X_test)))
+                logger.info(
+                    f"Pump Detector - Train Score: {metrics['train_score']:.4f}, "
+                    f"Test Score: {metrics['test_score']:.4f}, PR-AUC: {metrics['pr_auc']:.4f}"
+                )
+            
+            return metrics
             
         except Exception as e:
             logger.error(f"Error training pump detector: {e}")
             return {}
     
-    def predict_proba(self, features: pd.DataFrame) -> Optional[np.ndarray]:
+    def continue_training(self, X, y, n_estimators: int = 10) -> bool:
+        """Append n_estimators trees fit on (X, y) to the current booster.
+
+        The previous booster is copied, not modified, so a model that is
+        still serving can be used as the starting point.
+        """
+        try:
+            # Stored training params fill in what a booster or a natively loaded classifier lacks
+            params = {**self.DEFAULT_PARAMS, **self.training_params, 'random_state': 42, 'tree_method': 'hist'}
+            if isinstance(self.model, xgb.XGBClassifier):
+                params.update({k: v for k, v in self.model.get_params().items() if v is not None})
+            params.update(n_estimators=n_estimators, early_stopping_rounds=None, callbacks=None)
+            model = xgb.XGBClassifier(**params)
+            booster = self._booster()
+            best_iteration = booster.attr('best_iteration')
+            if best_iteration is not None:
+                # Continue from the trees that are actually served; the slice drops the stale attribute
+                booster = booster[:int(best_iteration) + 1]
+            model.fit(X[self.feature_columns], y, xgb_model=booster)
+            self.model = model
+            self.compile(X.tail(1000))
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error updating pump detector: {e}")
+            return False
+    
+    def predict_proba(self, features) -> Optional[np.ndarray]:
         """Predict pump probability."""
         if self.model is None:
             logger.warning("Model not trained yet")
             return None
         
         try:
-            # Ensure feature columns match
-            features = features[self.feature_columns]
+            # Ensure feature columns match (DataFrame, CompactFeatures or ndarray)
+            features = select_feature_matrix(features, self.feature_columns)
+            if self.compiled is not None and isinstance(features, np.ndarray):
+                return self.compiled.predict_proba(features)
+            if isinstance(self.model, xgb.Booster):
+                return self._predict_booster(features)
             proba = self.model.predict_proba(features)
             return proba[:, 1]  # Return probability of pump
             
@@ -111,6 +228,118 @@ class PumpDetectorModel:
             logger.error(f"Error predicting pump probability: {e}")
             return None
     
+    def _booster(self) -> xgb.Booster:
+        """Underlying booster, whether trained through sklearn or train_streaming."""
+        return self.model if isinstance(self.model, xgb.Booster) else self.model.get_booster()
+    
+    def _predict_booster(self, features) -> np.ndarray:
+        if isinstance(features, pd.DataFrame):
+            matrix = xgb.DMatrix(features)
+        else:
+            matrix = xgb.DMatrix(features, feature_names=self.feature_columns)
+        booster = self._booster()
+        # Early-stopped boosters predict with their best iteration, like the sklearn wrapper
+        best_iteration = booster.attr('best_iteration')
+        iteration_range = (0, int(best_iteration) + 1) if best_iteration is not None else (0, 0)
+        return booster.predict(matrix, iteration_range=iteration_range)
+    
+    def train_streaming(
+        self,
+        train_set,
+        validation_set=None,
+        params: Dict = None,
+        early_stopping_rounds: int = 20,
+        cache_dir: str = None
+    ) -> Dict:
+        """Train on a PartitionDataset through XGBoost's external-memory iterator.
+
+        Feature chunks are streamed from the feature store, so memory stays
+        bounded by one partition plus XGBoost's quantized pages. The trained
+        booster replaces self.model.
+        """
+        try:
+            labels = train_set.labels()
+            self.feature_columns = list(train_set.feature_columns)
+            pos_count = int(labels.sum())
+            neg_count = len(labels) - pos_count
+            
+            params = {**self.DEFAULT_PARAMS, **(params or {})}
+            self.training_params = {**params, 'scale_pos_weight': neg_count / pos_count if pos_count > 0 else 1}
+            num_boost_round = params.pop('n_estimators')
+            if 'n_jobs' in params:
+                params['nthread'] = params.pop('n_jobs')
+            booster_params = {
+                **params,
+                'objective': 'binary:logistic',
+                'eval_metric': 'aucpr',
+                'tree_method': 'hist',
+                'scale_pos_weight': neg_count / pos_count if pos_count > 0 else 1,
+                'seed': 42
+            }
+            
+            cache_prefix = os.path.join(cache_dir or '.', 'xgb-cache')
+            make_matrix = getattr(xgb, 'ExtMemQuantileDMatrix', xgb.DMatrix)
+            dtrain = make_matrix(train_set.xgb_iterator(cache_prefix + '-train'))
+            
+            evals = []
+            if validation_set is not None and validation_set.chunks:
+                validation_set.feature_columns = self.feature_columns
+                if len(validation_set):
+                    if make_matrix is xgb.DMatrix:
+                        dval = xgb.DMatrix(validation_set.xgb_iterator(cache_prefix + '-validation'))
+                    else:
+                        dval = make_matrix(validation_set.xgb_iterator(cache_prefix + '-validation'), ref=dtrain)
+                    evals = [(dval, 'validation')]
+            
+            booster = xgb.train(
+                booster_params,
+                dtrain,
+                num_boost_round=num_boost_round,
+                evals=evals,
+                early_stopping_rounds=early_stopping_rounds if evals else None,
+                verbose_eval=False
+            )
+            if evals and booster.attr('best_iteration') is not None:
+                # Keep only the trees up to the early-stopping point
+                booster = booster[:int(booster.attr('best_iteration')) + 1]
+            self.model = booster
+            
+            metrics = {
+                'train_rows': len(labels),
+                'feature_importance': booster.get_score(importance_type='gain')
+            }
+            if evals:
+                self.compile(validation_set.load_chunk(len(validation_set.chunks) - 1)[0])
+                y_val, scores = validation_set.predict(self.predict_proba)
+                metrics.update(ranking_metrics(y_val, scores))
+                metrics['validation_rows'] = len(y_val)
+                logger.info(f"Pump Detector (streaming) - {len(labels)} rows, PR-AUC: {metrics['pr_auc']:.4f}")
+            else:
+                self.compile()
+            
+            return metrics
+            
+        except Exception as e:
+            logger.error(f"Error training pump detector from stream: {e}")
+            return {}
+    
+    def compile(self, X_check: pd.DataFrame = None) -> bool:
+        """Flatten the trained trees for fast numpy scoring, checking parity on X_check."""
+        try:
+            compiled = CompiledTreeEnsemble.from_xgboost(self._booster(), self.feature_columns)
+            if X_check is not None and len(X_check):
+                X_check = select_feature_matrix(X_check, self.feature_columns)
+                sample = np.asarray(X_check, dtype=np.float64)[-256:]
+                compiled.check_parity(sample, self._predict_booster(sample))
+                self.parity_sample = sample
+            self.compiled = compiled
+            return True
+            
+        except Exception as e:
+            logger.warning(f"Pump detector not compiled, scoring with XGBoost: {e}")
+            self.compiled = None
+            return False
+    
     def save_model(self, filepath: str):
         """Save model to file."""
         try:
@@ -118,11 +347,7 @@ class PumpDetectorModel:
                 pickle.dump({
                     'model': self.model,
                     'feature_columns': self.feature_columns,
-                    'params': {
-                        'lookback_period': self.lookback_period,
-                        'lookahead_period': self.lookahead_period,
-                        'pump_threshold': self.pump_threshold
-                    }
+                    'params': self.get_params()
                 }, f)
             logger.info(f"Model saved to {filepath}")
         except Exception as e:
@@ -139,6 +364,36 @@ class PumpDetectorModel:
                 self.lookback_period = params['lookback_period']
                 self.lookahead_period = params['lookahead_period']
                 self.pump_threshold = params['pump_threshold']
+            self.compile()
             logger.info(f"Model loaded from {filepath}")
         except Exception as e:
-            logger.error(f"Error loading model: {e}")
\ No newline at end of file
+            logger.error(f"Error loading model: {e}")
+    
+    def get_params(self) -> Dict:
+        """Labeling parameters stored alongside the model."""
+        return {
+            'lookback_period': self.lookback_period,
+            'lookahead_period': self.lookahead_period,
+            'pump_threshold': self.pump_threshold
+        }
+    
+    def save_native(self, directory: str) -> str:
+        """Save the booster in XGBoost's JSON format, plus the parity sample if there is one."""
+        path = os.path.join(directory, 'model.json')
+        self._booster().save_model(path)
+        if self.parity_sample is not None:
+            np.save(os.path.join(directory, 'parity_sample.npy'), self.parity_sample)
+        return path
+    
+    def load_native(self, directory: str, feature_columns: List[str], params: Dict):
+        """Load a booster saved by save_native."""
+        model = xgb.XGBClassifier()
+        model.load_model(os.path.join(directory, 'model.json'))
+        self.model = model
+        self.feature_columns = list(feature_columns)
+        self.lookback_period = params['lookback_period']
+        self.lookahead_period = params['lookahead_period']
+        self.pump_threshold = params['pump_threshold']
+        # Falls back to the native predictor if the compiled trees disagree on the saved rows
+        sample_path = os.path.join(directory, 'parity_sample.npy')
+        self.compile(np.load(sample_path) if os.path.exists(sample_path) else None)
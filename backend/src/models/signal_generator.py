@@ -98,4 +98,72 @@ class SignalGenerator:
             
         except Exception as e:
             logger.error(f"Error scoring opportunity: {e}")
-            return 0.0
\ No newline at end of file
+            return 0.0
+    
+    # Action codes of generate_signals, indexing ACTIONS
+    HOLD, BUY, SELL = 0, 1, 2
+    ACTIONS = ('hold', 'buy', 'sell')
+    SIGNAL_DTYPE = np.dtype([('action', np.int8), ('confidence', np.float64), ('score', np.float64)])
+    
+    def generate_signals(
+        self,
+        pump_probs: np.ndarray,
+        exit_probs: np.ndarray,
+        has_position=False,
+        sentiment_scores=0.0,
+        volume_surge=False,
+        whale_activity=False
+    ) -> np.ndarray:
+        """Array version of generate_signal and score_opportunity.
+        
+        Inputs broadcast against pump_probs. Returns a structured array with
+        action (HOLD/BUY/SELL codes), confidence and score per row; reason
+        strings are only built by format_signal for rows that are emitted.
+        """
+        pump_probs = np.asarray(pump_probs, dtype=np.float64)
+        exit_probs = np.broadcast_to(np.asarray(exit_probs, dtype=np.float64), pump_probs.shape)
+        has_position = np.broadcast_to(np.asarray(has_position, dtype=bool), pump_probs.shape)
+        
+        sell = has_position & (exit_probs >= self.exit_threshold)
+        buy = ~has_position & (pump_probs >= self.pump_threshold) & (exit_probs < 0.5)
+        
+        signals = np.empty(pump_probs.shape, dtype=self.SIGNAL_DTYPE)
+        signals['action'] = np.where(sell, self.SELL, np.where(buy, self.BUY, self.HOLD))
+        signals['confidence'] = np.where(sell, exit_probs, np.where(buy, pump_probs, np.maximum(pump_probs, exit_probs)))
+        signals['score'] = self.score_opportunities(
+            pump_probs, exit_probs, sentiment_scores, volume_surge, whale_activity
+        )
+        return signals
+    
+    def score_opportunities(
+        self,
+        pump_probs: np.ndarray,
+        exit_probs: np.ndarray,
+        sentiment_scores=0.0,
+        volume_surge=False,
+        whale_activity=False
+    ) -> np.ndarray:
+        """Array version of score_opportunity (0-100 per row)."""
+        score = np.asarray(pump_probs, dtype=np.float64) * 60 - np.asarray(exit_probs, dtype=np.float64) * 20
+        score = score + 10 * (np.asarray(sentiment_scores) > 0.5)
+        score = score + 10 * np.asarray(volume_surge, dtype=bool)
+        score = score + 10 * np.asarray(whale_activity, dtype=bool)
+        return np.clip(score, 0, 100)
+    
+    def format_signal(self, signals: np.ndarray, i: int, pump_prob: float, exit_prob: float) -> Dict:
+        """The generate_signal dict for row i of generate_signals output."""
+        action = int(signals['action'][i])
+        if action == self.SELL:
+            reason = f'Exit signal detected (prob: {exit_prob:.2f})'
+        elif action == self.BUY:
+            reason = f'Pump detected (prob: {pump_prob:.2f})'
+        else:
+            reason = 'Waiting for clear signal'
+        
+        return {
+            'action': self.ACTIONS[action],
+            'confidence': float(signals['confidence'][i]),
+            'reason': reason,
+            'pump_prob': float(pump_prob),
+            'exit_prob': float(exit_prob)
+        }
@@ -0,0 +1,171 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+import xgboost as xgb
+import lightgbm as lgb
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PartitionDataset:
+    """Labeled training rows streamed one feature-store partition at a time.
+
+    Each chunk is one (symbol, day) partition, memory-mapped from the
+    FeatureStore and labeled with the model's build_dataset. The first
+    lookahead_period rows of the following partition are borrowed so rows
+    near the end of a day keep their labels, unless the next partition
+    belongs to the other side of the train/validation cutoff (that purges
+    the boundary). Only one chunk's features are in memory at a time; the
+    per-row labels of the whole set are kept for LightGBM.
+    """
+
+    def __init__(self, store, model, chunks: List[Tuple[str, str, Optional[str]]], timeframe: str = '1m'):
+        """chunks holds (symbol, partition, next partition or None) in training order."""
+        self.store = store
+        self.model = model
+        self.chunks = chunks
+        self.timeframe = timeframe
+        self.feature_columns: List[str] = []
+        self._cached: Tuple[int, Optional[Tuple[np.ndarray, np.ndarray]]] = (-1, None)
+        self._labels: Optional[List[np.ndarray]] = None
+
+    def load_chunk(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Get (X float32 in feature_columns order, y int8) for chunk i."""
+        if self._cached[0] == i:
+            return self._cached[1]
+
+        symbol, partition, next_partition = self.chunks[i]
+        frame = self.store.load_partition(symbol, self.timeframe, partition)
+        n_rows = len(frame)
+        if next_partition is not None:
+            lookahead = self.store.load_partition(symbol, self.timeframe, next_partition)
+            frame = pd.concat([frame, lookahead.iloc[:self.model.lookahead_period]], ignore_index=True)
+
+        X, y = self.model.build_dataset(frame)
+        if X is None:
+            X, y = frame.iloc[:0][self.model.feature_columns], pd.Series(dtype=np.int8)
+        keep = X.index < n_rows
+        if not self.feature_columns:
+            self.feature_columns = list(self.model.feature_columns)
+
+        chunk = (
+            np.ascontiguousarray(X.loc[keep, self.feature_columns].to_numpy(dtype=np.float32)),
+            y[keep].to_numpy(dtype=np.int8)
+        )
+        self._cached = (i, chunk)
+        return chunk
+
+    def scan(self) -> List[np.ndarray]:
+        """Labels of every chunk, from one pass over the data (computed once)."""
+        if self._labels is None:
+            self._labels = [self.load_chunk(i)[1] for i in range(len(self.chunks))]
+            if not self.feature_columns:
+                raise ValueError("No partitions to stream")
+        return self._labels
+
+    def labels(self) -> np.ndarray:
+        """All labels in streaming order (empty chunks contribute nothing)."""
+        labels = self.scan()
+        return np.concatenate(labels) if labels else np.empty(0, dtype=np.int8)
+
+    def __len__(self) -> int:
+        return sum(len(labels) for labels in self.scan())
+
+    def xgb_iterator(self, cache_prefix: str) -> 'PartitionIterator':
+        return PartitionIterator(self, cache_prefix)
+
+    def lgb_sequences(self) -> List['PartitionSequence']:
+        """One lgb.Sequence per non-empty chunk, aligned with labels()."""
+        return [PartitionSequence(self, i, len(labels)) for i, labels in enumerate(self.scan()) if len(labels)]
+
+    def predict(self, predict_fn) -> Tuple[np.ndarray, np.ndarray]:
+        """Score every chunk with predict_fn(X); returns (labels, scores)."""
+        labels, scores = [], []
+        for i in range(len(self.chunks)):
+            X, y = self.load_chunk(i)
+            if len(y):
+                labels.append(y)
+                scores.append(np.asarray(predict_fn(X)))
+        if not labels:
+            return np.empty(0), np.empty(0)
+        return np.concatenate(labels), np.concatenate(scores)
+
+class PartitionIterator(xgb.DataIter):
+    """XGBoost external-memory iterator over a PartitionDataset."""
+
+    def __init__(self, dataset: PartitionDataset, cache_prefix: str):
+        self.dataset = dataset
+        self._position = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> bool:
+        while self._position < len(self.dataset.chunks):
+            X, y = self.dataset.load_chunk(self._position)
+            self._position += 1
+            if len(y):
+                input_data(data=X, label=y, feature_names=self.dataset.feature_columns)
+                return True
+        return False
+
+    def reset(self):
+        self._position = 0
+
+class PartitionSequence(lgb.Sequence):
+    """One partition exposed to LightGBM's streaming Dataset construction."""
+
+    def __init__(self, dataset: PartitionDataset, index: int, size: int, batch_size: int = 4096):
+        self.dataset = dataset
+        self.index = index
+        self.size = size
+        self.batch_size = batch_size
+
+    def __getitem__(self, idx):
+        # LightGBM samples and bins sequences as float64, one batch at a time
+        return np.asarray(self.dataset.load_chunk(self.index)[0][idx], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return self.size
+
+def split_partitions(
+    store,
+    symbols: List[str],
+    timeframe: str = '1m',
+    validation_fraction: float = 0.1
+) -> Tuple[List[Tuple[str, str, Optional[str]]], List[Tuple[str, str, Optional[str]]], Dict]:
+    """Split stored partitions of many symbols at one date into train and validation chunks.
+
+    Days on or after the cutoff are validation for every symbol, so the
+    validation set is strictly later than the training set. Chunks are
+    ordered by day, then symbol.
+    """
+    partitions = {symbol: store.list_partitions(symbol, timeframe) for symbol in symbols}
+    days = sorted({day for days in partitions.values() for day in days})
+    if not days:
+        return [], [], {}
+
+    n_validation = max(1, int(round(len(days) * validation_fraction))) if len(days) > 1 else 0
+    cutoff = days[len(days) - n_validation] if n_validation else None
+
+    train, validation = [], []
+    for symbol, symbol_days in partitions.items():
+        for i, day in enumerate(symbol_days):
+            is_validation = cutoff is not None and day >= cutoff
+            following = symbol_days[i + 1] if i + 1 < len(symbol_days) else None
+            # Only borrow label rows from the next day if it is contiguous and on the same side
+            contiguous = following is not None and (pd.Timestamp(following) - pd.Timestamp(day)).days == 1
+            same_side = following is not None and (cutoff is not None and following >= cutoff) == is_validation
+            chunk = (symbol, day, following if contiguous and same_side else None)
+            (validation if is_validation else train).append(chunk)
+
+    def order(chunk):
+        return chunk[1], chunk[0]
+
+    window = {
+        'symbols': list(symbols),
+        'timeframe': timeframe,
+        'start': days[0],
+        'end': days[-1],
+        'validation_start': cutoff,
+        'partitions': len(train) + len(validation)
+    }
+    return sorted(train, key=order), sorted(validation, key=order), window
@@ -0,0 +1,287 @@
+import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+from datetime import datetime, timezone
+import asyncio
+import multiprocessing
+import tempfile
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+def report_progress(progress, job_id: str, stage: str, fraction: float):
+    """Publish a job's stage from inside a worker process."""
+    if progress is not None:
+        progress[job_id] = {'status': 'running', 'stage': stage, 'progress': fraction}
+
+def _run_job(fn: Callable, job_id: str, args: tuple, progress):
+    """Worker entry point; the job only reports running once a worker has picked it up."""
+    report_progress(progress, job_id, 'started', 0.0)
+    return fn(job_id, *args, progress)
+
+def train_and_register(
+    job_id: str,
+    symbol: str,
+    candles: pd.DataFrame,
+    config: Dict,
+    progress=None
+) -> Dict:
+    """Build features, train both models and register them (runs in a worker process).
+
+    The new versions are registered but not activated; the serving process
+    loads, activates and swaps them in.
+    """
+    from ..feature_engineering.market_features import MarketFeatureExtractor
+    from ..feature_engineering.feature_store import FeatureStore
+    from ..feature_engineering.multi_timeframe import MultiTimeframeFeatureBuilder
+    from .pump_detector import PumpDetectorModel
+    from .exit_predictor import ExitPredictorModel
+    from .model_registry import ModelRegistry, _to_json_safe
+    from .validation import TimeSeriesValidator
+    from .hyperparameter_search import HyperparameterSearch
+    from .feature_selection import FeaturePruner
+
+    market_features = MarketFeatureExtractor()
+    registry = ModelRegistry(config['registry_dir'])
+
+    report_progress(progress, job_id, 'extracting_features', 0.1)
+    if config.get('use_multi_timeframe'):
+        builder = MultiTimeframeFeatureBuilder(
+            market_features,
+            timeframes=config.get('timeframes'),
+            max_base_candles=len(candles),
+            feature_window=None  # every row needs its higher timeframe columns, not just the latest
+        )
+        # The last candle from the exchange is still forming
+        builder.update(symbol, candles.iloc[:-1])
+        df = builder.build_features(symbol)
+    else:
+        store = FeatureStore(config['feature_store_dir'], compact=config.get('compact_features', False))
+        df = store.load_or_build(symbol, '1m', candles, market_features.extract_all_features)
+
+    training_window = {
+        'symbol': symbol,
+        'timeframe': '1m',
+        'start': df['timestamp'].iloc[0].isoformat(),
+        'end': df['timestamp'].iloc[-1].isoformat(),
+        'rows': len(df)
+    }
+
+    result = {'versions': {}, 'metrics': {}}
+    stages = (
+        ('pump_detector', PumpDetectorModel, 0.3),
+        ('exit_predictor', ExitPredictorModel, 0.65)
+    )
+    validation = config.get('validation')
+    # HyperparameterSearch options; the budget is per model
+    search = config.get('search')
+    # FeaturePruner options; the pruned columns are what serving will extract
+    feature_selection = config.get('feature_selection')
+    for name, model_class, fraction in stages:
+        report_progress(progress, job_id, f'training_{name}', fraction)
+        model = model_class()
+        extra = {}
+        train_params = None
+        columns = None
+        if feature_selection:
+            X, y = model.build_dataset(df)
+            if X is None:
+                continue
+            columns, extra['feature_selection'] = FeaturePruner(**feature_selection).select(model, X, y)
+            model.feature_columns = list(columns)
+        
+        if search:
+            X, y = model.build_dataset(df)
+            if X is None:
+                continue
+            model.feature_columns = list(columns or model.feature_columns)
+            train_params, extra['search'] = HyperparameterSearch(**search).search(model, X, y)
+        
+        if validation:
+            # Folds and the final refit train in parallel; metrics are out-of-sample fold means
+            X, y = model.build_dataset(df)
+            if X is None:
+                continue
+            model.feature_columns = list(columns or model.feature_columns)
+            validator = TimeSeriesValidator(method=validation, n_splits=config.get('validation_splits', 5))
+            report, model = validator.evaluate(model, X, y, train_params)
+            if model is None:
+                continue
+            metrics = dict(report['mean'])
+            extra['validation'] = report
+        else:
+            X_train, X_test, y_train, y_test = model.prepare_training_data(df)
+            if X_train is None:
+                continue
+            model.feature_columns = list(columns or model.feature_columns)
+            metrics = model.train(
+                X_train[model.feature_columns], y_train, X_test[model.feature_columns], y_test, params=train_params
+            )
+            if not metrics:
+                continue
+        result['versions'][name] = registry.register(name, model, metrics, training_window, extra)
+        result['metrics'][name] = _to_json_safe({
+            k: v for k, v in metrics.items() if k not in ('feature_importance', 'k')
+        })
+
+    report_progress(progress, job_id, 'registered', 0.9)
+    return result
+
+def train_pooled_and_register(
+    job_id: str,
+    symbols: List[str],
+    config: Dict,
+    progress=None
+) -> Dict:
+    """Train both models on many symbols streamed from the feature store (runs in a worker process).
+
+    Only days already stored in the feature store are used; memory stays
+    bounded by one partition at a time however many symbols and days there are.
+    """
+    from ..feature_engineering.feature_store import FeatureStore
+    from .pump_detector import PumpDetectorModel
+    from .exit_predictor import ExitPredictorModel
+    from .model_registry import ModelRegistry, _to_json_safe
+    from .streaming_dataset import PartitionDataset, split_partitions
+
+    store = FeatureStore(config['feature_store_dir'])
+    registry = ModelRegistry(config['registry_dir'])
+    timeframe = config.get('timeframe', '1m')
+
+    train_chunks, validation_chunks, training_window = split_partitions(
+        store, symbols, timeframe, config.get('validation_fraction', 0.1)
+    )
+    if not train_chunks:
+        raise ValueError("No stored feature partitions for the requested symbols")
+
+    result = {'versions': {}, 'metrics': {}}
+    stages = (
+        ('pump_detector', PumpDetectorModel, 0.1),
+        ('exit_predictor', ExitPredictorModel, 0.5)
+    )
+    with tempfile.TemporaryDirectory(prefix='training-cache-') as cache_dir:
+        for name, model_class, fraction in stages:
+            report_progress(progress, job_id, f'training_{name}', fraction)
+            model = model_class()
+            train_set = PartitionDataset(store, model, train_chunks, timeframe)
+            validation_set = PartitionDataset(store, model, validation_chunks, timeframe)
+            metrics = model.train_streaming(train_set, validation_set, cache_dir=cache_dir)
+            if not metrics:
+                continue
+            result['versions'][name] = registry.register(name, model, metrics, training_window)
+            result['metrics'][name] = _to_json_safe({
+                k: v for k, v in metrics.items() if k not in ('feature_importance', 'k')
+            })
+
+    report_progress(progress, job_id, 'registered', 0.9)
+    return result
+
+class TrainingJobRunner:
+    """Run training jobs in a process pool and track their status.
+
+    Jobs move through queued -> running -> completed/failed. Worker processes
+    publish their current stage through a manager dict, so status reads never
+    touch the worker. Workers are spawned rather than forked, so they never
+    inherit the server's event loop or database client.
+    """
+
+    def __init__(self, max_workers: int = 1, max_jobs: int = 100):
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+        self._context = multiprocessing.get_context('spawn')
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._progress = None
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def _ensure_started(self):
+        if self._executor is None:
+            self._manager = self._context.Manager()
+            self._progress = self._manager.dict()
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self._context)
+
+    def create_job(self, kind: str, params: Dict) -> Dict:
+        """Register a new queued job and return it."""
+        job_id = uuid.uuid4().hex
+        now = datetime.now(timezone.utc).isoformat()
+        job = {
+            'job_id': job_id,
+            'kind': kind,
+            'params': params,
+            'status': 'queued',
+            'stage': 'queued',
+            'progress': 0.0,
+            'created_at': now,
+            'updated_at': now,
+            'result': None,
+            'error': None
+        }
+        self._jobs[job_id] = job
+
+        # Forget the oldest finished jobs
+        while len(self._jobs) > self.max_jobs:
+            oldest = next(
+                (jid for jid, j in self._jobs.items() if j['status'] in ('completed', 'failed')),
+                None
+            )
+            if oldest is None:
+                break
+            del self._jobs[oldest]
+        return dict(job)
+
+    def update(self, job_id: str, **fields):
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job.update(fields)
+            job['updated_at'] = datetime.now(timezone.utc).isoformat()
+
+    async def run_in_process(self, job_id: str, fn: Callable, *args):
+        """Run fn(job_id, *args, progress) in a worker process without blocking the loop."""
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, _run_job, fn, job_id, args, self._progress)
+        finally:
+            live = self._progress.pop(job_id, None)
+            if live:
+                self.update(job_id, **live)
+
+    def complete(self, job_id: str, result: Dict):
+        self.update(job_id, status='completed', stage='completed', progress=1.0, result=result)
+
+    def fail(self, job_id: str, error: str):
+        self.update(job_id, status='failed', stage='failed', error=error)
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """Get a job's status, including the live stage reported by its worker."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        job = dict(job)
+        if job['status'] in ('queued', 'running') and self._progress is not None:
+            live = self._progress.get(job_id)
+            if live:
+                job.update(live)
+        return job
+
+    def active_jobs(self, kind: str = None) -> List[Dict]:
+        """Jobs that are queued or running, optionally of one kind."""
+        return [
+            dict(job) for job in self._jobs.values()
+            if job['status'] in ('queued', 'running') and (kind is None or job['kind'] == kind)
+        ]
+
+    def list_jobs(self) -> List[Dict]:
+        """List jobs, newest first."""
+        return [self.get_job(job_id) for job_id in reversed(list(self._jobs))]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+            self._progress = None
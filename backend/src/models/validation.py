@@ -0,0 +1,198 @@
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+from sklearn.metrics import average_precision_score
+import multiprocessing
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+def precision_at_k(y_true, scores, k: int) -> float:
+    """Fraction of positives among the k highest-scored rows."""
+    y_true = np.asarray(y_true)
+    scores = np.asarray(scores)
+    k = min(k, len(scores))
+    if k <= 0:
+        return float('nan')
+    top = np.argpartition(-scores, k - 1)[:k]
+    return float(y_true[top].mean())
+
+def ranking_metrics(y_true, scores, top_fraction: float = 0.05) -> Dict:
+    """Precision at the top-scored fraction of rows and PR-AUC (average precision).
+
+    Accuracy is meaningless at these positive rates; only the top of the
+    ranking is ever traded. PR-AUC is NaN when the rows hold a single class.
+    """
+    y_true = np.asarray(y_true)
+    k = max(1, int(round(len(y_true) * top_fraction)))
+    has_both = 0 < y_true.sum() < len(y_true)
+    return {
+        'precision_at_k': precision_at_k(y_true, scores, k),
+        'k': k,
+        'pr_auc': float(average_precision_score(y_true, scores)) if has_both else float('nan'),
+        'positive_rate': float(y_true.mean()) if len(y_true) else float('nan')
+    }
+
+def walk_forward_splits(
+    n_rows: int,
+    n_splits: int = 5,
+    purge: int = 0,
+    test_size: int = None,
+    max_train_size: int = None
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Expanding-window splits: each fold trains on everything before its test block.
+
+    The last `purge` training rows before each test block are dropped, since
+    their labels look ahead into the test block.
+    """
+    test_size = test_size or n_rows // (n_splits + 1)
+    splits = []
+    for fold in range(n_splits):
+        test_start = n_rows - (n_splits - fold) * test_size
+        train_end = test_start - purge
+        if train_end <= 0:
+            continue
+        train_start = max(0, train_end - max_train_size) if max_train_size else 0
+        splits.append((
+            np.arange(train_start, train_end),
+            np.arange(test_start, min(test_start + test_size, n_rows))
+        ))
+    return splits
+
+def purged_kfold_splits(
+    n_rows: int,
+    n_splits: int = 5,
+    purge: int = 0,
+    embargo: int = 0
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Contiguous k-fold where training rows near each test block are removed.
+
+    `purge` rows before the block are dropped (their labels overlap it) and
+    `embargo` rows after it (their features overlap its labels).
+    """
+    bounds = np.linspace(0, n_rows, n_splits + 1).astype(int)
+    rows = np.arange(n_rows)
+    splits = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        keep = (rows < start - purge) | (rows >= end + embargo)
+        splits.append((rows[keep], rows[start:end]))
+    return splits
+
+def _fit_fold(model_class, label_params: Dict, feature_columns: List[str], train_params: Dict,
+              X: np.ndarray, y: np.ndarray, train_idx, test_idx, top_fraction: float) -> Dict:
+    """Train one fold in a worker process and score its test block."""
+    model = model_class(**label_params)
+    model.feature_columns = list(feature_columns)
+    # Named columns keep the boosters' feature names, which compile and the registry rely on
+    X_train = pd.DataFrame(X[train_idx], columns=feature_columns, copy=False)
+    y_train = y[train_idx]
+    X_test, y_test = None, None
+    if test_idx is not None:
+        X_test = pd.DataFrame(X[test_idx], columns=feature_columns, copy=False)
+        y_test = y[test_idx]
+
+    metrics = model.train(X_train, y_train, X_test, y_test, params=train_params)
+    if not metrics:
+        raise RuntimeError("Fold training failed")
+
+    result = {'train_rows': len(train_idx)}
+    if test_idx is None:
+        # Only the refit is shipped back to the parent
+        result['model'] = model
+    else:
+        result.update(ranking_metrics(y_test, model.predict_proba(X_test), top_fraction))
+        result['test_rows'] = len(test_idx)
+    return result
+
+class TimeSeriesValidator:
+    """Walk-forward or purged k-fold evaluation with folds trained in parallel.
+
+    Folds and the final refit on all rows run concurrently in spawned worker
+    processes, each model limited to one thread so the folds do not fight
+    over cores. The refit is returned as the model to register; its expected
+    performance is the mean of the fold metrics.
+    """
+
+    def __init__(
+        self,
+        method: str = 'walk_forward',
+        n_splits: int = 5,
+        top_fraction: float = 0.05,
+        embargo: int = 0,
+        max_workers: int = None
+    ):
+        if method not in ('walk_forward', 'purged_kfold'):
+            raise ValueError(f"Unknown validation method: {method}")
+        self.method = method
+        self.n_splits = n_splits
+        self.top_fraction = top_fraction
+        self.embargo = embargo
+        self.max_workers = max_workers or max(1, min(n_splits + 1, os.cpu_count() or 1))
+
+    def split(self, n_rows: int, purge: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        if self.method == 'walk_forward':
+            return walk_forward_splits(n_rows, self.n_splits, purge)
+        return purged_kfold_splits(n_rows, self.n_splits, purge, self.embargo)
+
+    def evaluate(self, model, X, y, train_params: Dict = None) -> Tuple[Dict, object]:
+        """Evaluate a model configuration on time-ordered (X, y).
+
+        X, y come from the model's build_dataset. Returns (report, final
+        model); the final model is None if the refit failed.
+        """
+        feature_columns = list(model.feature_columns) or list(X.columns)
+        X = np.ascontiguousarray(X[feature_columns].to_numpy(dtype=np.float64))
+        y = np.asarray(y, dtype=np.int64)
+        train_params = {'n_jobs': 1, **(train_params or {})}
+
+        # Labels look lookahead_period rows ahead
+        splits = self.split(len(y), model.lookahead_period)
+        jobs = [(train_idx, test_idx) for train_idx, test_idx in splits] + [(np.arange(len(y)), None)]
+
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context) as executor:
+            futures = [
+                executor.submit(
+                    _fit_fold, type(model), model.get_params(), feature_columns, train_params,
+                    X, y, train_idx, test_idx, self.top_fraction
+                )
+                for train_idx, test_idx in jobs
+            ]
+
+            folds = []
+            final_model = None
+            for i, future in enumerate(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Error in validation job {i}: {e}")
+                    continue
+                if jobs[i][1] is None:
+                    final_model = result['model']
+                else:
+                    folds.append({'fold': i, **result})
+
+        report = {
+            'method': self.method,
+            'n_splits': self.n_splits,
+            'top_fraction': self.top_fraction,
+            'folds': folds,
+            'mean': self._summarize(folds, np.nanmean),
+            'std': self._summarize(folds, np.nanstd)
+        }
+        logger.info(
+            f"{type(model).__name__} {self.method} validation - "
+            f"PR-AUC {report['mean'].get('pr_auc', float('nan')):.4f}, "
+            f"precision@k {report['mean'].get('precision_at_k', float('nan')):.4f}"
+        )
+        return report, final_model
+
+    @staticmethod
+    def _summarize(folds: List[Dict], reduce) -> Dict:
+        summary = {}
+        for key in ('precision_at_k', 'pr_auc', 'positive_rate'):
+            values = np.array([fold[key] for fold in folds], dtype=float)
+            summary[key] = float(reduce(values)) if len(values) and not np.isnan(values).all() else float('nan')
+        return summary
@@ -0,0 +1,258 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Tuple
+import math
+import time
+import logging
+
+from .portfolio import Portfolio
+from .risk_manager import RiskManager
+from ..models.signal_generator import SignalGenerator
+from ..models.fused_scorer import FusedScorer
+from ..feature_engineering.multi_timeframe import MultiTimeframeFeatureBuilder, TIMEFRAME_OFFSETS
+
+logger = logging.getLogger(__name__)
+
+class Backtester:
+    """Replay historical candles through the models and the trading rules.
+
+    Features, both models' probabilities and the flat/holding signal
+    decisions are computed once for the whole series in vectorized form.
+    Only the stateful part runs bar by bar: a simulated Portfolio,
+    RiskManager sizing, daily loss tracking and stop-loss/take-profit via
+    check_exit_conditions. A signal on bar t's close is filled at bar t+1's
+    open; stops are checked on each close. Results are in-sample for
+    whatever period the models were trained on.
+    """
+
+    def __init__(
+        self,
+        pump_detector,
+        exit_predictor,
+        feature_extractor=None,
+        signal_generator: SignalGenerator = None,
+        risk_params: Dict = None,
+        initial_cash: float = 10000.0,
+        fee_rate: float = 0.001
+    ):
+        self.pump_detector = pump_detector
+        self.exit_predictor = exit_predictor
+        self.feature_extractor = feature_extractor
+        self.signal_generator = signal_generator or SignalGenerator()
+        self.risk_params = risk_params or {}
+        self.initial_cash = initial_cash
+        self.fee_rate = fee_rate
+
+    def prepare(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Per-bar prices and both models' probabilities for candles or stored feature rows.
+
+        Depends only on the models, so one prepared frame can be replayed
+        with many SignalGenerator/RiskManager settings.
+        """
+        models = {'pump_detector': self.pump_detector, 'exit_predictor': self.exit_predictor}
+        columns = []
+        for model in models.values():
+            columns.extend(col for col in model.feature_columns if col not in columns)
+        if 'volume_ratio' not in columns:
+            columns.append('volume_ratio')
+
+        missing = [col for col in columns if col not in data.columns]
+        if missing:
+            if self.feature_extractor is None:
+                raise ValueError("Data lacks model feature columns and no feature extractor was given")
+            timeframes = self._higher_timeframes(missing)
+            if timeframes:
+                data = self._multi_timeframe_features(data, timeframes)
+            else:
+                data = self.feature_extractor.extract_features(data, columns)
+            missing = [col for col in columns if col not in data.columns]
+            if missing:
+                raise ValueError(f"Cannot build model feature columns: {', '.join(missing)}")
+
+        valid = data[[col for col in columns if col in data.columns]].notna().all(axis=1).to_numpy()
+        probs = FusedScorer().score(data.loc[valid], models)
+        pump_probs = np.full(len(data), np.nan)
+        exit_probs = np.full(len(data), np.nan)
+        pump_probs[valid] = probs['pump_detector'].to_numpy()
+        exit_probs[valid] = probs['exit_predictor'].to_numpy()
+
+        return pd.DataFrame({
+            'timestamp': pd.to_datetime(data['timestamp']).to_numpy(),
+            'open': data['open'].to_numpy(dtype=np.float64),
+            'close': data['close'].to_numpy(dtype=np.float64),
+            'pump_prob': pump_probs,
+            'exit_prob': exit_probs,
+            'volume_ratio': data['volume_ratio'].to_numpy(dtype=np.float64) if 'volume_ratio' in data.columns else np.ones(len(data)),
+            'valid': valid
+        })
+
+    def _higher_timeframes(self, columns: List[str]) -> List[str]:
+        """Timeframes of suffixed multi-timeframe columns such as 'rsi_15m'."""
+        timeframes = []
+        for col in columns:
+            if self.feature_extractor.registry.is_known(col):
+                continue
+            for timeframe in TIMEFRAME_OFFSETS:
+                suffix = f"_{timeframe}"
+                if (
+                    timeframe != '1m'
+                    and col.endswith(suffix)
+                    and self.feature_extractor.registry.is_known(col[:-len(suffix)])
+                    and timeframe not in timeframes
+                ):
+                    timeframes.append(timeframe)
+        return timeframes
+
+    def _multi_timeframe_features(self, data: pd.DataFrame, timeframes: List[str]) -> pd.DataFrame:
+        """Resample the 1m candles and join every higher timeframe, as live multi-timeframe scoring does."""
+        timestamps = pd.to_datetime(data['timestamp'])
+        if len(data) > 1 and timestamps.diff().median() != pd.Timedelta(minutes=1):
+            raise ValueError(f"Models use {', '.join(timeframes)} features, which need 1m candles")
+
+        builder = MultiTimeframeFeatureBuilder(
+            self.feature_extractor,
+            timeframes=timeframes,
+            max_base_candles=len(data),
+            feature_window=None
+        )
+        candles = data[['timestamp', 'open', 'high', 'low', 'close', 'volume']].assign(timestamp=timestamps)
+        builder.update('backtest', candles.reset_index(drop=True))
+        features = builder.build_features('backtest')
+        if features.empty:
+            raise ValueError("Could not build multi-timeframe features for the backtest")
+        return features
+
+    def decide(self, bars) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(buy when flat, buy confidence, sell when holding) for every bar, in one vectorized pass."""
+        generator = self.signal_generator
+        pump_probs = np.asarray(bars['pump_prob'])
+        exit_probs = np.asarray(bars['exit_prob'])
+        valid = np.asarray(bars['valid'])
+        volume_surge = np.asarray(bars['volume_ratio']) > 2.0
+        flat = generator.generate_signals(pump_probs, exit_probs, False, volume_surge=volume_surge)
+        holding = generator.generate_signals(pump_probs, exit_probs, True, volume_surge=volume_surge)
+        return (
+            valid & (flat['action'] == generator.BUY),
+            flat['confidence'],
+            valid & (holding['action'] == generator.SELL)
+        )
+
+    def run(self, data: pd.DataFrame, symbol: str, start=None, end=None) -> Dict:
+        """Backtest one symbol; start/end limit the traded bars (earlier rows still warm up features)."""
+        started = time.time()
+        bars = self.prepare(data)
+        prepared = time.time()
+
+        if start is not None:
+            bars = bars[bars['timestamp'] >= pd.Timestamp(start)]
+        if end is not None:
+            bars = bars[bars['timestamp'] < pd.Timestamp(end)]
+
+        result = self.run_prepared(bars.reset_index(drop=True), symbol)
+        result['metrics']['prepare_seconds'] = prepared - started
+        logger.info(
+            f"Backtest {symbol}: {result['metrics']['bars']} bars, {result['metrics']['total_trades']} trades, "
+            f"return {result['metrics']['total_return']:.2%} in {time.time() - started:.2f}s"
+        )
+        return result
+
+    def run_prepared(self, bars, symbol: str) -> Dict:
+        """Replay prepared bars (a frame from prepare, or a dict of its column arrays)."""
+        started = time.time()
+        timestamps = np.asarray(bars['timestamp']).astype('datetime64[ns]')
+        if len(timestamps) < 2:
+            raise ValueError("Not enough bars to backtest")
+        opens = np.asarray(bars['open'])
+        closes = np.asarray(bars['close'])
+        buys, confidence, sells = self.decide(bars)
+
+        portfolio, equity, in_market, exits = self._simulate(timestamps, opens, closes, buys, confidence, sells, symbol)
+
+        metrics = self._metrics(timestamps, opens, closes, equity)
+        metrics.update(portfolio.get_metrics())
+        metrics.update(
+            exposure=float(in_market.mean()),
+            stop_loss_exits=exits['stop_loss'],
+            take_profit_exits=exits['take_profit'],
+            signal_exits=exits['signal'],
+            simulate_seconds=time.time() - started
+        )
+        return {
+            'symbol': symbol,
+            'start': pd.Timestamp(timestamps[0]).isoformat(),
+            'end': pd.Timestamp(timestamps[-1]).isoformat(),
+            'metrics': metrics,
+            'trades': portfolio.trade_history,
+            'equity': pd.Series(equity, index=pd.DatetimeIndex(timestamps), name='equity')
+        }
+
+    def _simulate(self, timestamps: np.ndarray, opens: np.ndarray, closes: np.ndarray,
+                  buys: np.ndarray, confidence: np.ndarray, sells: np.ndarray, symbol: str):
+        portfolio = Portfolio(self.initial_cash)
+        risk_manager = RiskManager(**self.risk_params)
+        days = timestamps.astype('datetime64[D]')
+        n = len(timestamps)
+
+        equity = np.empty(n)
+        in_market = np.zeros(n, dtype=bool)
+        exits = {'stop_loss': 0, 'take_profit': 0, 'signal': 0}
+        pending = None  # 'buy' or 'sell' decided on the previous close
+        current_day = None
+        for i in range(n):
+            holding = symbol in portfolio.positions
+            if pending is not None:
+                timestamp = pd.Timestamp(timestamps[i]).to_pydatetime()
+                if pending == 'sell' and holding:
+                    portfolio.close_position(symbol, opens[i] * (1 - self.fee_rate), timestamp)
+                    exits['signal'] += 1
+                elif pending == 'buy' and not holding:
+                    self._open(portfolio, risk_manager, symbol, opens[i], confidence[i - 1], timestamp)
+                pending = None
+                holding = symbol in portfolio.positions
+
+            price = closes[i]
+            if holding:
+                portfolio.update_position_price(symbol, price)
+            if days[i] != current_day:
+                current_day = days[i]
+                risk_manager.reset_daily_tracking(portfolio.get_total_value())
+
+            in_market[i] = holding
+            if holding:
+                check = risk_manager.check_exit_conditions(portfolio.positions[symbol]['entry_price'], price)
+                if check['should_exit']:
+                    portfolio.close_position(
+                        symbol, price * (1 - self.fee_rate), pd.Timestamp(timestamps[i]).to_pydatetime()
+                    )
+                    exits['stop_loss' if check['reason'].startswith('Stop') else 'take_profit'] += 1
+                elif sells[i]:
+                    pending = 'sell'
+            elif buys[i]:
+                pending = 'buy'
+
+            equity[i] = portfolio.get_total_value()
+        return portfolio, equity, in_market, exits
+
+    def _open(self, portfolio: Portfolio, risk_manager: RiskManager, symbol: str,
+              price: float, confidence: float, timestamp):
+        fill = price * (1 + self.fee_rate)
+        value = portfolio.get_total_value()
+        quantity = risk_manager.calculate_position_size(value, fill, confidence)
+        can_trade, _ = risk_manager.check_can_trade(value, quantity * fill)
+        if can_trade and quantity > 0:
+            portfolio.open_position(symbol, quantity, fill, timestamp)
+
+    def _metrics(self, timestamps: np.ndarray, opens: np.ndarray, closes: np.ndarray, equity: np.ndarray) -> Dict:
+        returns = np.diff(equity) / equity[:-1]
+        span = (timestamps[-1] - timestamps[0]) / np.timedelta64(1, 's')
+        bars_per_year = (len(equity) - 1) / span * 365 * 24 * 3600 if span > 0 else 0
+        std = returns.std()
+        peak = np.maximum.accumulate(equity)
+
+        return {
+            'bars': len(equity),
+            'total_return': float(equity[-1] / self.initial_cash - 1),
+            'buy_and_hold_return': float(closes[-1] / opens[0] - 1),
+            'max_drawdown': float((equity / peak - 1).min()),
+            'sharpe': float(returns.mean() / std * math.sqrt(bars_per_year)) if std > 0 else 0.0
+        }
@@ -0,0 +1,122 @@
+from typing import Awaitable, Callable, Dict, List, Optional
+from datetime import datetime, timezone
+import asyncio
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class MarketScanner:
+    """Evaluate a symbol universe at every candle close and keep the ranked result in memory.
+
+    evaluate(symbols) does the actual work (fetch, features, models) and
+    returns {'signals': [...ranked...], 'missing': [...], ...}. After each
+    scan the result is published as an immutable snapshot together with its
+    JSON encoding and a per-symbol index, so readers (HTTP routes, websocket
+    broadcasts) only look things up and never trigger model work. Listeners
+    are awaited after each publish, e.g. to push the snapshot to clients.
+    """
+
+    def __init__(
+        self,
+        evaluate: Callable[[List[str]], Awaitable[Dict]],
+        universe: List[str],
+        candle_seconds: int = 60,
+        close_delay: float = 2.0
+    ):
+        self.evaluate = evaluate
+        self.universe = list(dict.fromkeys(universe))
+        self.candle_seconds = candle_seconds
+        self.close_delay = close_delay
+        self.scans = 0
+        self.failures = 0
+        self.last_duration = None
+        self._snapshot: Dict = {'scan_id': 0, 'timestamp': None, 'signals': [], 'missing': []}
+        self._snapshot_json = json.dumps(self._snapshot)
+        self._by_symbol: Dict[str, Dict] = {}
+        self._listeners: List[Callable[[Dict], Awaitable[None]]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def snapshot(self) -> Dict:
+        """Latest published scan (do not mutate)."""
+        return self._snapshot
+
+    @property
+    def snapshot_json(self) -> str:
+        """Latest scan, already encoded for websocket clients."""
+        return self._snapshot_json
+
+    def get_signal(self, symbol: str) -> Optional[Dict]:
+        return self._by_symbol.get(symbol)
+
+    def add_listener(self, listener: Callable[[Dict], Awaitable[None]]):
+        self._listeners.append(listener)
+
+    def set_universe(self, symbols: List[str]):
+        """Replace the universe; takes effect from the next scan."""
+        self.universe = list(dict.fromkeys(symbols))
+
+    def seconds_until_next_close(self, now: float = None) -> float:
+        now = time.time() if now is None else now
+        return self.candle_seconds - (now % self.candle_seconds) + self.close_delay
+
+    async def scan_once(self) -> Dict:
+        """Evaluate the universe now and publish the result."""
+        start = time.time()
+        # A set_universe during the scan must not relabel this scan's result
+        universe = self.universe
+        try:
+            result = await self.evaluate(universe)
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Error scanning market: {e}")
+            return self._snapshot
+
+        self.scans += 1
+        self.last_duration = time.time() - start
+        snapshot = {
+            **result,
+            'scan_id': self.scans,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'universe_size': len(universe),
+            'duration_seconds': self.last_duration
+        }
+        # Build everything readers need before swapping the references in
+        by_symbol = {item['symbol']: item for item in snapshot.get('signals', [])}
+        snapshot_json = json.dumps({'type': 'signals_snapshot', **snapshot})
+        self._snapshot, self._snapshot_json, self._by_symbol = snapshot, snapshot_json, by_symbol
+
+        for listener in self._listeners:
+            try:
+                await listener(snapshot)
+            except Exception as e:
+                logger.error(f"Error notifying scanner listener: {e}")
+        return snapshot
+
+    async def run(self):
+        """Scan immediately, then shortly after every candle close."""
+        while True:
+            await self.scan_once()
+            await asyncio.sleep(self.seconds_until_next_close())
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def get_stats(self) -> Dict:
+        return {
+            'running': self._task is not None and not self._task.done(),
+            'universe_size': len(self.universe),
+            'scans': self.scans,
+            'failures': self.failures,
+            'last_scan': self._snapshot['timestamp'],
+            'last_duration_seconds': self.last_duration,
+            'signals': len(self._snapshot.get('signals', []))
+        }
@@ -0,0 +1,129 @@
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional
+import inspect
+import itertools
+import multiprocessing
+import os
+import time
+import logging
+
+from .backtester import Backtester
+from .risk_manager import RiskManager
+from ..models.signal_generator import SignalGenerator
+
+logger = logging.getLogger(__name__)
+
+SIGNAL_PARAMS = [name for name in inspect.signature(SignalGenerator.__init__).parameters if name != 'self']
+RISK_PARAMS = [name for name in inspect.signature(RiskManager.__init__).parameters if name != 'self']
+
+# Shared prepared bars, attached once per worker process
+_sweep_bars: Dict[str, np.ndarray] = {}
+_sweep_blocks: List[shared_memory.SharedMemory] = []
+
+def _init_sweep_worker(specs: Dict[str, tuple]):
+    for name, (block_name, dtype, shape) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _sweep_blocks.append(block)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        array.flags.writeable = False
+        _sweep_bars[name] = array
+
+def _run_combination(params: Dict, symbol: str, initial_cash: float, fee_rate: float) -> Dict:
+    """Backtest one parameter combination on the shared bars."""
+    backtester = Backtester(
+        None,
+        None,
+        signal_generator=SignalGenerator(**{k: v for k, v in params.items() if k in SIGNAL_PARAMS}),
+        risk_params={k: v for k, v in params.items() if k in RISK_PARAMS},
+        initial_cash=initial_cash,
+        fee_rate=fee_rate
+    )
+    metrics = backtester.run_prepared(_sweep_bars, symbol)['metrics']
+    return {
+        **params,
+        'total_return': metrics['total_return'],
+        'max_drawdown': metrics['max_drawdown'],
+        'sharpe': metrics['sharpe'],
+        'trades': metrics['total_trades'],
+        'win_rate': metrics['win_rate'],
+        'exposure': metrics['exposure']
+    }
+
+class ParameterSweep:
+    """Backtest every combination of a SignalGenerator/RiskManager parameter grid in parallel.
+
+    Bars are prepared (features and both models' probabilities) once in
+    the parent. Their column arrays are copied into shared memory blocks
+    that every worker process maps read-only at startup, so each task only
+    ships its parameter dict and the sweep is bound by the replay loop
+    rather than data loading.
+    """
+
+    def __init__(self, max_workers: int = None, initial_cash: float = 10000.0, fee_rate: float = 0.001):
+        self.max_workers = max_workers or max(1, os.cpu_count() or 1)
+        self.initial_cash = initial_cash
+        self.fee_rate = fee_rate
+
+    @staticmethod
+    def expand_grid(grid: Dict[str, List]) -> List[Dict]:
+        """All combinations of a {param: [values]} grid."""
+        unknown = [name for name in grid if name not in SIGNAL_PARAMS and name not in RISK_PARAMS]
+        if unknown:
+            raise ValueError(f"Unknown sweep parameters: {unknown}")
+        names = list(grid)
+        return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+    def run(
+        self,
+        bars: pd.DataFrame,
+        grid: Dict[str, List],
+        symbol: str,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> pd.DataFrame:
+        """Result table (one row per combination, best Sharpe first) for bars from Backtester.prepare."""
+        combinations = self.expand_grid(grid)
+        if len(bars) < 2 or not combinations:
+            raise ValueError("Nothing to sweep")
+
+        start = time.time()
+        blocks = []
+        specs = {}
+        try:
+            for name in bars.columns:
+                values = np.ascontiguousarray(bars[name].to_numpy())
+                block = shared_memory.SharedMemory(create=True, size=max(1, values.nbytes))
+                blocks.append(block)
+                np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+                specs[name] = (block.name, values.dtype.str, values.shape)
+
+            rows = []
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(
+                max_workers=min(self.max_workers, len(combinations)),
+                mp_context=context,
+                initializer=_init_sweep_worker,
+                initargs=(specs,)
+            ) as executor:
+                futures = [
+                    executor.submit(_run_combination, params, symbol, self.initial_cash, self.fee_rate)
+                    for params in combinations
+                ]
+                for done, future in enumerate(as_completed(futures), 1):
+                    try:
+                        rows.append(future.result())
+                    except Exception as e:
+                        logger.error(f"Error in sweep backtest: {e}")
+                    if progress is not None:
+                        progress(done, len(combinations))
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+        logger.info(f"Swept {len(rows)}/{len(combinations)} combinations in {time.time() - start:.1f}s")
+        if not rows:
+            return pd.DataFrame()
+        return pd.DataFrame(rows).sort_values('sharpe', ascending=False).reset_index(drop=True)
@@ -12,7 +12,10 @@ class Portfolio:
         self.cash = initial_cash
         self.positions = {}  # symbol -> position info
         self.trade_history = []
+        self.closed_trades = 0
+        self.winning_trades = 0
         self.equity_curve = [{'timestamp': datetime.now(timezone.utc), 'value': initial_cash}]
+        self.listeners = []  # called with each trade record once it is applied
     
     def open_position(self, symbol: str, quantity: float, price: float, timestamp: datetime = None):
         """Open a new position."""
@@ -41,6 +44,7 @@ class Portfolio:
                 'pnl_pct': 0.0
             })
             
+            self._notify(self.trade_history[-1])
             logger.info(f"Opened position: {symbol} x{quantity} @ ${price:.6f}")
             return True
             
@@ -78,6 +82,9 @@ class Portfolio:
             })
             
             del self.positions[symbol]
+            self.closed_trades += 1
+            self.winning_trades += int(pnl > 0)
+            self._notify(self.trade_history[-1])
             
             logger.info(f"Closed position: {symbol} x{quantity} @ ${price:.6f}, PnL: ${pnl:.2f} ({pnl_pct:.2f}%)")
             return True
@@ -86,6 +93,13 @@ class Portfolio:
             logger.error(f"Error closing position: {e}")
             return False
     
+    def _notify(self, trade: Dict):
+        for listener in self.listeners:
+            try:
+                listener(trade)
+            except Exception as e:
+                logger.error(f"Error notifying portfolio listener: {e}")
+    
     def update_position_price(self, symbol: str, current_price: float):
         """Update current price for a position."""
         if symbol in self.positions:
@@ -107,9 +121,7 @@ class Portfolio:
             total_pnl_pct = (total_value / self.initial_cash - 1) * 100
             
             # Calculate win rate
-            closed_trades = [t for t in self.trade_history if t['action'] == 'sell']
-            winning_trades = [t for t in closed_trades if t['pnl'] > 0]
-            win_rate = len(winning_trades) / len(closed_trades) if closed_trades else 0.0
+            win_rate = self.winning_trades / self.closed_trades if self.closed_trades else 0.0
             
             return {
                 'initial_cash': self.initial_cash,
@@ -118,7 +130,7 @@ class Portfolio:
                 'total_pnl': total_pnl,
                 'total_pnl_pct': total_pnl_pct,
                 'active_positions': len(self.positions),
-                'total_trades': len(closed_trades),
+                'total_trades': self.closed_trades,
                 'win_rate': win_rate
             }
             
@@ -0,0 +1,279 @@
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Optional
+import asyncio
+import time
+import logging
+
+from pymongo.errors import BulkWriteError
+
+from .portfolio import Portfolio
+
+logger = logging.getLogger(__name__)
+
+class PortfolioStore:
+    """Write-behind persistence of a Portfolio to MongoDB.
+
+    Every trade the Portfolio applies is stamped with a sequence number and
+    appended to an in-memory queue; the caller never waits on the database.
+    A background task drains the queue into the portfolio_journal
+    collection with batched insert_many calls, and periodically upserts a
+    compact snapshot (cash, positions, the most recent trades, trade counts,
+    last sequence number and the summary fields the dashboard reads) into
+    the portfolio collection; the journal keeps the full trade history.
+    restore() rebuilds the Portfolio from the latest snapshot and replays
+    only the journal entries written after it.
+    """
+
+    def __init__(
+        self,
+        db,
+        user_id: str = 'default',
+        flush_interval: float = 1.0,
+        batch_size: int = 500,
+        snapshot_every: int = 100,
+        snapshot_interval: float = 60.0,
+        recent_trades: int = 10
+    ):
+        self.journal = db.portfolio_journal
+        self.snapshots = db.portfolio
+        self.user_id = user_id
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.snapshot_every = snapshot_every
+        self.snapshot_interval = snapshot_interval
+        self.recent_trades = recent_trades  # trades kept in the snapshot, as /api/portfolio shows
+        self.portfolio: Optional[Portfolio] = None
+        self.seq = 0
+        self.snapshot_seq = 0
+        self.last_snapshot = 0.0
+        self.day_start: Optional[Dict] = None  # {'date', 'value'} for today's P&L
+        self.journaled = 0
+        self.snapshots_written = 0
+        self.replayed = 0
+        self.failures = 0
+        self._failure_streak = 0
+        self._pending: deque = deque()
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, trade: Dict):
+        """Queue one applied trade for the journal (Portfolio listener, never blocks)."""
+        self.seq += 1
+        self._pending.append({
+            'user_id': self.user_id,
+            'seq': self.seq,
+            'symbol': trade['symbol'],
+            'action': trade['action'],
+            'quantity': float(trade['quantity']),
+            'price': float(trade['price']),
+            'timestamp': trade['timestamp'],
+            'pnl': float(trade['pnl']),
+            'pnl_pct': float(trade['pnl_pct'])
+        })
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    async def restore(self, portfolio: Portfolio) -> Dict:
+        """Load the latest snapshot plus the journal tail into portfolio, then start journaling it.
+
+        The state is rebuilt in a separate Portfolio and copied into portfolio
+        only once everything has loaded, so a failed or timed-out restore
+        leaves it untouched.
+        """
+        start = time.time()
+        await self.journal.create_index([('user_id', 1), ('seq', 1)], unique=True)
+
+        restored = Portfolio(portfolio.initial_cash)
+        seq = 0
+        day_start = None
+        doc = await self.snapshots.find_one({'user_id': self.user_id})
+        if doc is not None and 'seq' in doc:
+            self._apply_snapshot(restored, doc)
+            seq = doc['seq']
+            if doc.get('day_start'):
+                day_start = {'date': doc['day_start']['date'], 'value': doc['day_start']['value']}
+
+        tail = await self.journal.find(
+            {'user_id': self.user_id, 'seq': {'$gt': seq}}
+        ).sort('seq', 1).to_list(None)
+        snapshot_seq = seq
+        for event in tail:
+            timestamp = self._aware(event['timestamp'])
+            if event['action'] == 'buy':
+                restored.open_position(event['symbol'], event['quantity'], event['price'], timestamp)
+            else:
+                restored.close_position(event['symbol'], event['price'], timestamp)
+            seq = event['seq']
+
+        # No awaits from here on: the live portfolio changes all at once
+        for field in ('initial_cash', 'cash', 'positions', 'trade_history', 'closed_trades', 'winning_trades'):
+            setattr(portfolio, field, getattr(restored, field))
+        self.seq = seq
+        self.snapshot_seq = snapshot_seq
+        self.day_start = day_start
+        self.replayed = len(tail)
+        self.portfolio = portfolio
+        portfolio.listeners.append(self.record)
+        logger.info(
+            f"Restored portfolio '{self.user_id}' at seq {self.seq} "
+            f"({'snapshot + ' if doc else ''}{len(tail)} journal entries) in {time.time() - start:.2f}s"
+        )
+        return {'seq': self.seq, 'snapshot': doc is not None, 'replayed': len(tail)}
+
+    def _apply_snapshot(self, portfolio: Portfolio, doc: Dict):
+        portfolio.initial_cash = doc.get('initial_cash', portfolio.initial_cash)
+        portfolio.cash = doc['cash']
+        portfolio.positions = {
+            pos['symbol']: {
+                'quantity': pos['quantity'],
+                'entry_price': pos['entry_price'],
+                'entry_time': self._aware(pos['entry_time']),
+                'current_price': pos['current_price']
+            }
+            for pos in doc.get('positions', [])
+        }
+        portfolio.trade_history = [
+            {**trade, 'timestamp': self._aware(trade['timestamp'])}
+            for trade in doc.get('trade_history', [])
+        ]
+        # Older snapshots carried the full history instead of the counts
+        closed = [trade for trade in portfolio.trade_history if trade['action'] == 'sell']
+        portfolio.closed_trades = doc.get('closed_trades', len(closed))
+        portfolio.winning_trades = doc.get('winning_trades', sum(trade['pnl'] > 0 for trade in closed))
+
+    @staticmethod
+    def _aware(timestamp):
+        # Mongo hands back naive UTC datetimes
+        if isinstance(timestamp, datetime) and timestamp.tzinfo is None:
+            return timestamp.replace(tzinfo=timezone.utc)
+        return timestamp
+
+    async def flush(self) -> int:
+        """Write queued journal entries in batches; returns how many were written."""
+        written = 0
+        async with self._lock:
+            while self._pending:
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                try:
+                    await self.journal.insert_many(batch, ordered=True)
+                except BulkWriteError as e:
+                    # Ordered insert: everything before the first error landed
+                    errors = e.details.get('writeErrors', [])
+                    duplicate = bool(errors) and errors[0].get('code') == 11000
+                    done = e.details.get('nInserted', 0) + int(duplicate)  # a duplicate was journaled by a lost reply
+                    self._pending.extendleft(reversed(batch[done:]))
+                    written += done
+                    self.journaled += done
+                    if not duplicate:
+                        raise
+                    continue
+                except BaseException:
+                    # Includes cancellation mid-insert; the entries are written again later
+                    self._pending.extendleft(reversed(batch))
+                    raise
+                written += len(batch)
+                self.journaled += len(batch)
+        return written
+
+    def _snapshot_doc(self) -> Dict:
+        portfolio = self.portfolio
+        now = datetime.now(timezone.utc)
+        total_value = portfolio.get_total_value()
+        today = now.date().isoformat()
+        if self.day_start is None or self.day_start['date'] != today:
+            self.day_start = {'date': today, 'value': float(total_value)}
+        today_pl = total_value - self.day_start['value']
+        today_pl_percent = today_pl / self.day_start['value'] * 100 if self.day_start['value'] else 0.0
+
+        return {
+            'user_id': self.user_id,
+            'seq': self.seq,
+            'initial_cash': portfolio.initial_cash,
+            'cash': float(portfolio.cash),
+            'positions': [
+                {
+                    'symbol': symbol,
+                    'quantity': float(pos['quantity']),
+                    'entry_price': float(pos['entry_price']),
+                    'entry_time': pos['entry_time'],
+                    'current_price': float(pos['current_price'])
+                }
+                for symbol, pos in portfolio.positions.items()
+            ],
+            'trade_history': portfolio.trade_history[-self.recent_trades:],
+            'closed_trades': portfolio.closed_trades,
+            'winning_trades': portfolio.winning_trades,
+            'total_value': float(total_value),
+            'change_24h': today_pl_percent,  # since UTC midnight; no intraday value history is kept
+            'today_pl': today_pl,
+            'today_pl_percent': today_pl_percent,
+            'day_start': self.day_start,
+            'updated_at': now
+        }
+
+    async def snapshot(self):
+        """Upsert the current state as the latest snapshot."""
+        # Built synchronously, so it reflects exactly the trades up to doc['seq']
+        doc = self._snapshot_doc()
+        await self.snapshots.replace_one({'user_id': self.user_id}, doc, upsert=True)
+        self.snapshot_seq = doc['seq']
+        self.last_snapshot = time.time()
+        self.snapshots_written += 1
+
+    async def persist(self, force_snapshot: bool = False):
+        """Flush the journal, then snapshot if enough trades or time have passed."""
+        await self.flush()
+        if (
+            force_snapshot
+            or self.seq - self.snapshot_seq >= self.snapshot_every
+            or time.time() - self.last_snapshot >= self.snapshot_interval
+        ):
+            await self.snapshot()
+
+    async def run(self):
+        while True:
+            delay = min(self.flush_interval * 2 ** self._failure_streak, 60.0)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.persist()
+                self._failure_streak = 0
+            except Exception as e:
+                self.failures += 1
+                self._failure_streak += 1
+                logger.error(f"Error persisting portfolio: {e}")
+
+    def start(self):
+        if self.portfolio is None:
+            raise RuntimeError("restore() must run before persistence starts")
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def close(self):
+        """Stop the background task and write everything still queued."""
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self.portfolio is not None:
+            await self.persist(force_snapshot=True)
+
+    def get_stats(self) -> Dict:
+        return {
+            'running': self._task is not None and not self._task.done(),
+            'seq': self.seq,
+            'snapshot_seq': self.snapshot_seq,
+            'pending': len(self._pending),
+            'journaled': self.journaled,
+            'snapshots': self.snapshots_written,
+            'replayed_at_startup': self.replayed,
+            'failures': self.failures
+        }
@@ -0,0 +1,121 @@
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SignalStream:
+    """Push per-symbol signal changes to subscribed connections.
+
+    Dedup state is one (action, confidence bucket) pair per symbol, shared
+    by all clients. Each scanner snapshot is diffed against it and only
+    symbols whose pair changed produce a message, encoded once and sent to
+    that symbol's subscribers. Connections are sent to concurrently, so one
+    slow client does not hold up the others. New subscribers get each
+    symbol's entry from the latest scan straight away, so they never need
+    to poll; symbols missing from that scan are not replayed.
+    """
+
+    def __init__(self, bucket_size: float = 0.1):
+        self.bucket_size = bucket_size
+        self._subscribers: Dict[str, Set] = {}
+        self._state: Dict[str, Tuple[str, int]] = {}
+        self._current: Dict[str, Dict] = {}  # symbol -> entry in the latest scan
+        self._current_scan: Dict = {}
+        self.pushes = 0
+        self.changes = 0
+        self.unchanged = 0
+
+    def bucket(self, confidence: float) -> int:
+        return int(confidence // self.bucket_size)
+
+    def subscribe(self, connection, symbols: Iterable[str]) -> List[str]:
+        """Subscribe a connection; returns update messages for those symbols in the latest scan."""
+        messages = []
+        for symbol in symbols:
+            self._subscribers.setdefault(symbol, set()).add(connection)
+            if symbol in self._current:
+                messages.append(self._encode(self._current[symbol], self._current_scan))
+        return messages
+
+    @staticmethod
+    def _encode(item: Dict, snapshot: Dict) -> str:
+        return json.dumps({
+            'type': 'signal_update',
+            'symbol': item['symbol'],
+            'signal': item['signal'],
+            'current_price': item.get('current_price'),
+            'opportunity_score': item.get('opportunity_score'),
+            'scan_id': snapshot.get('scan_id'),
+            'timestamp': snapshot.get('timestamp')
+        })
+
+    def unsubscribe(self, connection, symbols: Optional[Iterable[str]] = None):
+        """Remove a connection from some symbols, or from all of them."""
+        for symbol in list(symbols if symbols is not None else self._subscribers):
+            subscribers = self._subscribers.get(symbol)
+            if subscribers is None:
+                continue
+            subscribers.discard(connection)
+            if not subscribers:
+                del self._subscribers[symbol]
+
+    def symbols(self) -> List[str]:
+        """Symbols with at least one subscriber."""
+        return list(self._subscribers)
+
+    def diff(self, snapshot: Dict) -> List[Tuple[str, str]]:
+        """(symbol, encoded message) for every symbol whose action or confidence bucket changed."""
+        changed = []
+        current = {}
+        for item in snapshot.get('signals', []):
+            symbol = item['symbol']
+            signal = item['signal']
+            current[symbol] = item
+            key = (signal['action'], self.bucket(signal['confidence']))
+            if self._state.get(symbol) == key:
+                self.unchanged += 1
+                continue
+
+            self._state[symbol] = key
+            changed.append((symbol, self._encode(item, snapshot)))
+        self._current = current
+        self._current_scan = {'scan_id': snapshot.get('scan_id'), 'timestamp': snapshot.get('timestamp')}
+        self.changes += len(changed)
+        return changed
+
+    async def publish(self, snapshot: Dict, send: Callable[[object, str], Awaitable[None]]):
+        """Diff a snapshot and send changed symbols to their subscribers.
+
+        Each connection gets its messages in order; connections are served
+        concurrently.
+        """
+        outbox: Dict[object, List[str]] = {}
+        for symbol, message in self.diff(snapshot):
+            for connection in self._subscribers.get(symbol, ()):
+                outbox.setdefault(connection, []).append(message)
+
+        async def deliver(connection, messages: List[str]):
+            for message in messages:
+                await send(connection, message)
+
+        results = await asyncio.gather(
+            *(deliver(connection, messages) for connection, messages in outbox.items()),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error pushing signal update: {result}")
+        self.pushes += sum(len(messages) for messages in outbox.values())
+
+    def get_stats(self) -> Dict:
+        return {
+            'bucket_size': self.bucket_size,
+            'subscribed_symbols': len(self._subscribers),
+            'subscriptions': sum(len(subscribers) for subscribers in self._subscribers.values()),
+            'tracked_symbols': len(self._state),
+            'changes': self.changes,
+            'unchanged': self.unchanged,
+            'pushes': self.pushes
+        }
@@ -10,9 +10,9 @@ import json
 import sys
 from pathlib import Path
 
-# Add the backend src directory to Python path
-backend_src = Path(__file__).parent / "backend" / "src"
-sys.path.insert(0, str(backend_src))
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent / "backend"
+sys.path.insert(0, str(backend_dir))
 
 async def test_api_endpoints():
     """Test all API endpoints."""
@@ -137,9 +137,9 @@ async def test_data_collectors():
     print("\n📊 Testing Data Collectors...")
     
     try:
-        from data_ingestion.exchange_collector import ExchangeDataCollector
-        from data_ingestion.onchain_collector import OnChainCollector
-        from data_ingestion.social_collector import SocialCollector
+        from src.data_ingestion.exchange_collector import ExchangeDataCollector
+        from src.data_ingestion.onchain_collector import OnChainCollector
+        from src.data_ingestion.social_collector import SocialCollector
         
         # Test exchange collector
         exchange = ExchangeDataCollector('binance')
@@ -171,9 +171,9 @@ async def test_ml_models():
     print("\n🤖 Testing ML Models...")
     
     try:
-        from models.pump_detector import PumpDetectorModel
-        from models.exit_predictor import ExitPredictorModel
-        from models.signal_generator import SignalGenerator
+        from src.models.pump_detector import PumpDetectorModel
+        from src.models.exit_predictor import ExitPredictorModel
+        from src.models.signal_generator import SignalGenerator
         
         # Initialize models
         pump_detector = PumpDetectorModel()
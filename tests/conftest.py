@@ -0,0 +1,75 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_dir))
+
+
+def synthetic_candles(n: int, start: str = '2024-01-01 00:00', seed: int = 0) -> pd.DataFrame:
+    """Random-walk 1m OHLCV candles."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.001, n)) * close
+    return pd.DataFrame({
+        'timestamp': pd.date_range(start, periods=n, freq='1min'),
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.lognormal(3, 0.5, n)
+    })
+
+
+@pytest.fixture
+def make_candles():
+    return synthetic_candles
+
+
+def synthetic_features(n: int = 3000, seed: int = 0) -> pd.DataFrame:
+    """Market features for synthetic_candles(n)."""
+    from src.feature_engineering.market_features import MarketFeatureExtractor
+    return MarketFeatureExtractor().extract_all_features(synthetic_candles(n, seed=seed))
+
+
+def trained_models(features: pd.DataFrame, **train_kwargs):
+    """Pump detector and exit predictor trained on features with thresholds loose enough for both classes."""
+    from src.models.exit_predictor import ExitPredictorModel
+    from src.models.pump_detector import PumpDetectorModel
+
+    pump_detector = PumpDetectorModel(pump_threshold=0.002)
+    X_train, X_test, y_train, y_test = pump_detector.prepare_training_data(features)
+    pump_detector.train(X_train, y_train, X_test, y_test, **train_kwargs)
+
+    exit_predictor = ExitPredictorModel(exit_threshold=-0.002)
+    X_train, X_test, y_train, y_test = exit_predictor.prepare_training_data(features)
+    exit_predictor.train(X_train, y_train, X_test, y_test, **train_kwargs)
+    return pump_detector, exit_predictor
+
+
+class FakeExchange:
+    """Exchange collector serving deterministic synthetic candles per symbol ('MISSING/...' has none)."""
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', limit: int = 500) -> pd.DataFrame:
+        if symbol.startswith('MISSING'):
+            return pd.DataFrame()
+        return synthetic_candles(limit, seed=sum(map(ord, symbol)))
+
+    async def fetch_order_book(self, symbol: str, limit: int = 100):
+        return {'bids': [], 'asks': []}
+
+
+@pytest.fixture(scope='module')
+def server_module():
+    """The API server module with trained models and a fake exchange, without startup tasks."""
+    import server
+
+    pump_detector, exit_predictor = trained_models(synthetic_features())
+    server.swap_models(pump_detector, exit_predictor)
+    server.exchange_collector = FakeExchange()
+    return server
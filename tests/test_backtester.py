@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.feature_engineering.market_features import MarketFeatureExtractor
+from src.trading.backtester import Backtester
+from tests.conftest import synthetic_candles
+
+
+def bars(opens, closes, pump, exits):
+    n = len(opens)
+    return {
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='1min').to_numpy(),
+        'open': np.asarray(opens, dtype=float),
+        'close': np.asarray(closes, dtype=float),
+        'pump_prob': np.asarray(pump, dtype=float),
+        'exit_prob': np.asarray(exits, dtype=float),
+        'volume_ratio': np.ones(n),
+        'valid': np.ones(n, dtype=bool)
+    }
+
+
+def test_signal_fills_at_next_open_and_sells_on_exit_signal():
+    backtester = Backtester(None, None, fee_rate=0.0)
+    result = backtester.run_prepared(bars(
+        opens=[100, 101, 102, 103, 104],
+        closes=[100, 102, 103, 104, 105],
+        pump=[0.9, 0.1, 0.1, 0.1, 0.1],
+        exits=[0.1, 0.1, 0.9, 0.1, 0.1]
+    ), 'TEST')
+
+    buy, sell = result['trades']
+    assert buy['action'] == 'buy' and buy['price'] == 101
+    assert buy['timestamp'] == pd.Timestamp('2024-01-01 00:01')
+    assert sell['action'] == 'sell' and sell['price'] == 103
+    assert result['metrics']['signal_exits'] == 1
+
+
+def test_stop_loss_exits_on_close():
+    backtester = Backtester(None, None, fee_rate=0.0, risk_params={'stop_loss_pct': 0.1})
+    result = backtester.run_prepared(bars(
+        opens=[100, 100, 95, 85, 85],
+        closes=[100, 96, 89, 85, 85],
+        pump=[0.9, 0.1, 0.1, 0.1, 0.1],
+        exits=[0.1, 0.1, 0.1, 0.1, 0.1]
+    ), 'TEST')
+
+    buy, sell = result['trades']
+    assert buy['price'] == 100
+    assert sell['price'] == 89
+    assert sell['timestamp'] == pd.Timestamp('2024-01-01 00:02')
+    assert result['metrics']['stop_loss_exits'] == 1
+    assert result['metrics']['exposure'] == pytest.approx(0.4)
+
+
+class ColumnsModel:
+    def __init__(self, feature_columns):
+        self.feature_columns = feature_columns
+
+
+def test_multi_timeframe_columns_are_built_from_candles():
+    backtester = Backtester(ColumnsModel(['rsi', 'rsi_5m']), ColumnsModel(['rsi_15m']), MarketFeatureExtractor())
+
+    timeframes = backtester._higher_timeframes(['rsi_5m', 'rsi_15m', 'price_change_5m'])
+    features = backtester._multi_timeframe_features(synthetic_candles(600), timeframes)
+
+    assert timeframes == ['5m', '15m']
+
+    assert len(features) == 600
+    assert {'rsi', 'rsi_5m', 'rsi_15m'} <= set(features.columns)
+    assert features[['rsi_5m', 'rsi_15m']].iloc[-1].notna().all()
+
+
+def test_unbuildable_columns_are_rejected():
+    backtester = Backtester(ColumnsModel(['rsi', 'sentiment_score']), ColumnsModel(['rsi']), MarketFeatureExtractor())
+
+    with pytest.raises(ValueError, match='sentiment_score'):
+        backtester.prepare(synthetic_candles(300))
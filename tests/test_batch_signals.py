@@ -0,0 +1,39 @@
+import pytest
+from fastapi.testclient import TestClient
+
+SYMBOLS = ['AAA/USDT', 'BBB/USDT', 'CCC/USDT', 'DDD/USDT']
+
+
+def test_batch_matches_single_symbol_signals(server_module):
+    client = TestClient(server_module.app)
+
+    batch = client.post('/api/signals/batch', json={'symbols': SYMBOLS, 'cascade': False})
+    assert batch.status_code == 200
+    by_symbol = {item['symbol']: item for item in batch.json()['signals']}
+    assert sorted(by_symbol) == SYMBOLS
+
+    for symbol in SYMBOLS:
+        single = client.post('/api/signals/generate', json={'symbol': symbol}).json()
+        item = by_symbol[symbol]
+        assert item['signal']['pump_prob'] == pytest.approx(single['signal']['pump_prob'], abs=1e-9)
+        assert item['signal']['exit_prob'] == pytest.approx(single['signal']['exit_prob'], abs=1e-9)
+        assert item['signal']['action'] == single['signal']['action']
+        assert item['opportunity_score'] == pytest.approx(single['opportunity_score'])
+        assert item['current_price'] == pytest.approx(single['current_price'])
+
+
+def test_batch_reports_missing_symbols_and_ranks_by_score(server_module):
+    client = TestClient(server_module.app)
+
+    result = client.post('/api/signals/batch', json={'symbols': SYMBOLS + ['MISSING/USDT'], 'cascade': False}).json()
+
+    assert result['missing'] == ['MISSING/USDT']
+    scores = [item['opportunity_score'] for item in result['signals']]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_batch_rejects_too_many_symbols(server_module, monkeypatch):
+    monkeypatch.setenv('MAX_BATCH_SYMBOLS', '2')
+    client = TestClient(server_module.app)
+
+    assert client.post('/api/signals/batch', json={'symbols': SYMBOLS}).status_code == 400
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from src.models.cascade import CascadeScreener
+
+
+def test_live_stats_use_the_last_closed_candle(make_candles):
+    candles = make_candles(300)
+    # The forming candle has only a sliver of its volume so far
+    candles.loc[candles.index[-1], 'volume'] = 0.01
+    screener = CascadeScreener(window=20)
+
+    live = screener.compute_stats({'BTC/USDT': candles}).loc['BTC/USDT']
+    closed = screener.rolling_stats(candles.iloc[:-1]).iloc[-1]
+
+    np.testing.assert_allclose(live[['volume_ratio', 'return_z']], closed[['volume_ratio', 'return_z']])
+
+
+def test_repeated_calibration_does_not_compound(make_candles):
+    candles = make_candles(3000)
+    screener = CascadeScreener(window=20)
+    stats = screener.rolling_stats(candles)
+    labels = pd.Series((stats['volume_ratio'] > 1.8).astype(float), index=stats.index)
+
+    first = screener.calibrate(stats, labels, target_recall=0.9)
+    second = screener.calibrate(stats, labels, target_recall=0.9)
+
+    assert first['volume_ratio_threshold'] == second['volume_ratio_threshold']
+    assert first['return_z_threshold'] == second['return_z_threshold']
@@ -0,0 +1,57 @@
+import numpy as np
+
+from src.feature_engineering.compact import CompactCandles, CompactFeatures
+from src.feature_engineering.feature_cache import FeatureCache
+from src.feature_engineering.feature_store import FeatureStore
+from src.feature_engineering.market_features import MarketFeatureExtractor
+from tests.conftest import synthetic_candles
+
+
+def assert_close_to_float64(compact, reference, tolerance=1e-6):
+    """Every column within tolerance of that column's largest float64 magnitude."""
+    columns = [col for col in reference.columns if col != 'timestamp']
+    assert list(compact['timestamp']) == list(reference['timestamp'])
+    actual = compact[columns].to_numpy(dtype=np.float64)
+    expected = reference[columns].to_numpy(dtype=np.float64)
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    scale = np.nanmax(np.abs(expected), axis=0)
+    assert (np.nan_to_num(np.abs(actual - expected)) <= tolerance * scale).all()
+
+
+def test_compact_features_round_trip_within_float32_tolerance():
+    extractor = MarketFeatureExtractor()
+    candles = synthetic_candles(500)
+    reference = extractor.extract_all_features(candles)
+
+    packed = CompactFeatures.from_frame('BTC/USDT', reference)
+    assert packed.values.dtype == np.float32
+    assert_close_to_float64(packed.to_frame(), reference)
+
+    from_compact_candles = extractor.extract_compact(CompactCandles.from_frame('BTC/USDT', candles))
+    # float32 inputs: differences grow through rolling statistics, but stay small
+    assert_close_to_float64(from_compact_candles.to_frame(), reference, tolerance=1e-3)
+
+
+def test_compact_cache_stores_float32_frames():
+    extractor = MarketFeatureExtractor()
+    candles = synthetic_candles(500)
+    reference = extractor.extract_features(candles)
+    cache = FeatureCache(compact=True)
+
+    cached = cache.get_or_compute('BTC/USDT', '1m', candles, extractor.extract_features, 'v1')
+
+    assert (cached.drop(columns='timestamp').dtypes == np.float32).all()
+    assert cache.get_stats()['bytes'] < reference.memory_usage(index=True, deep=True).sum() * 0.6
+    assert_close_to_float64(cached, reference)
+
+
+def test_compact_store_writes_float32_partitions(tmp_path):
+    extractor = MarketFeatureExtractor()
+    candles = synthetic_candles(2 * 1440)
+    store = FeatureStore(str(tmp_path), compact=True)
+
+    features = store.load_or_build('BTC/USDT', '1m', candles, extractor.extract_all_features)
+    loaded = store.load('BTC/USDT', '1m')
+
+    assert (loaded.drop(columns='timestamp').dtypes == np.float32).all()
+    assert_close_to_float64(loaded.iloc[-len(features):].reset_index(drop=True), features)
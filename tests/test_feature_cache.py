@@ -0,0 +1,48 @@
+from src.feature_engineering.feature_cache import FeatureCache
+from src.feature_engineering.market_features import MarketFeatureExtractor
+from tests.conftest import synthetic_candles
+
+
+def test_hit_for_same_candles():
+    cache = FeatureCache()
+    extractor = MarketFeatureExtractor()
+    candles = synthetic_candles(200)
+
+    first = cache.get_or_compute('BTC/USDT', '1m', candles, extractor.extract_features, 'v1')
+    second = cache.get_or_compute('BTC/USDT', '1m', candles.copy(), extractor.extract_features, 'v1')
+
+    assert second is first
+    assert cache.get_stats()['hits'] == 1
+
+
+def test_miss_when_forming_candle_ticks():
+    cache = FeatureCache()
+    extractor = MarketFeatureExtractor()
+    candles = synthetic_candles(200)
+    first = cache.get_or_compute('BTC/USDT', '1m', candles, extractor.extract_features, 'v1')
+
+    ticked = candles.copy()
+    ticked.loc[ticked.index[-1], 'close'] *= 1.01
+    ticked.loc[ticked.index[-1], 'volume'] += 5.0
+    second = cache.get_or_compute('BTC/USDT', '1m', ticked, extractor.extract_features, 'v1')
+
+    assert second is not first
+    assert second['close'].iloc[-1] == ticked['close'].iloc[-1]
+    assert cache.get_stats()['misses'] == 2
+
+
+def test_evicts_least_recently_used_over_max_bytes():
+    extractor = MarketFeatureExtractor()
+    candles = synthetic_candles(200)
+    size = int(extractor.extract_features(candles).memory_usage(index=True, deep=True).sum())
+    cache = FeatureCache(max_bytes=int(size * 2.5))
+
+    for symbol in ['A', 'B', 'C']:
+        cache.get_or_compute(symbol, '1m', candles, extractor.extract_features, 'v1')
+
+    stats = cache.get_stats()
+    assert stats['entries'] == 2
+    assert stats['evictions'] == 1
+    assert stats['bytes'] <= cache.max_bytes
+    assert cache.get(FeatureCache.make_key('A', '1m', candles, 'v1')) is None
+    assert cache.get(FeatureCache.make_key('C', '1m', candles, 'v1')) is not None
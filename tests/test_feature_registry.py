@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.feature_engineering.feature_registry import FeatureRegistry
+from src.feature_engineering.market_features import MarketFeatureExtractor
+from tests.conftest import synthetic_candles
+
+
+def baseline_features(df: pd.DataFrame) -> pd.DataFrame:
+    """The hand-written extract_all_features the registry replaced."""
+    df = df.copy()
+    df['returns'] = df['close'].pct_change()
+    df['log_returns'] = np.log(df['close'] / df['close'].shift(1))
+    df['price_change_1m'] = df['close'].pct_change(1)
+    df['price_change_5m'] = df['close'].pct_change(5)
+    df['price_change_15m'] = df['close'].pct_change(15)
+    df['volume_change'] = df['volume'].pct_change()
+    df['volume_ma_5'] = df['volume'].rolling(5).mean()
+    df['volume_ma_15'] = df['volume'].rolling(15).mean()
+    df['volume_ratio'] = df['volume'] / df['volume_ma_15']
+    df['volatility_5'] = df['returns'].rolling(5).std()
+    df['volatility_15'] = df['returns'].rolling(15).std()
+    delta = df['close'].diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    df['rsi'] = 100 - (100 / (1 + gain / (loss + 1e-10)))
+    df['macd'] = df['close'].ewm(span=12).mean() - df['close'].ewm(span=26).mean()
+    df['macd_signal'] = df['macd'].ewm(span=9).mean()
+    df['macd_diff'] = df['macd'] - df['macd_signal']
+    df['bb_middle'] = df['close'].rolling(20).mean()
+    bb_std = df['close'].rolling(20).std()
+    df['bb_upper'] = df['bb_middle'] + bb_std * 2
+    df['bb_lower'] = df['bb_middle'] - bb_std * 2
+    df['bb_width'] = (df['bb_upper'] - df['bb_lower']) / df['bb_middle']
+    df['bb_position'] = (df['close'] - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'] + 1e-10)
+    df['momentum_5'] = df['close'] - df['close'].shift(5)
+    df['momentum_15'] = df['close'] - df['close'].shift(15)
+    df['high_low_range'] = (df['high'] - df['low']) / df['close']
+    df['close_position'] = (df['close'] - df['low']) / (df['high'] - df['low'] + 1e-10)
+    return df
+
+
+def test_registry_matches_baseline_features():
+    candles = synthetic_candles(500)
+    expected = baseline_features(candles)
+
+    features = MarketFeatureExtractor().extract_all_features(candles)
+
+    assert list(features.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(features, expected, check_exact=False, rtol=1e-12)
+
+
+def test_subset_computes_only_requested_columns_with_baseline_values():
+    candles = synthetic_candles(500)
+    expected = baseline_features(candles)
+
+    features = MarketFeatureExtractor().extract_features(candles, ['macd_diff', 'volume_ratio', 'bb_position'])
+
+    assert list(features.columns) == list(candles.columns) + ['volume_ratio', 'macd_diff', 'bb_position']
+    for column in ['macd_diff', 'volume_ratio', 'bb_position']:
+        np.testing.assert_allclose(features[column], expected[column], rtol=1e-12, equal_nan=True)
+
+
+def test_unknown_dependencies_are_rejected():
+    registry = FeatureRegistry()
+    registry.register('_range', ['high', 'low'], lambda high, low: high - low)
+
+    with pytest.raises(ValueError):
+        registry.register('ratio', ['_range', 'missing'], lambda a, b: a / b)
+    with pytest.raises(KeyError):
+        registry.resolve(['missing'])
+    assert registry.resolve(['_range']) == ['_range']
+    assert registry.outputs == []
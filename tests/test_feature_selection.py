@@ -0,0 +1,36 @@
+from src.models.feature_selection import FeaturePruner
+from src.models.pump_detector import PumpDetectorModel
+
+from tests.conftest import synthetic_features
+
+
+def pump_dataset():
+    model = PumpDetectorModel(pump_threshold=0.002)
+    X, y = model.build_dataset(synthetic_features())
+    return model, X, y
+
+
+def test_smallest_candidate_within_tolerance_is_selected():
+    model, X, y = pump_dataset()
+    pruner = FeaturePruner(candidate_k=(8, 12), tolerance=1.0)
+    columns, report = pruner.select(model, X, y, train_params={'n_estimators': 20})
+
+    assert len(columns) == 8 and report['selected'] == 8
+    assert report['columns'] == columns and set(columns) <= set(X.columns)
+    assert [trial['k'] for trial in report['trials']] == [8]
+    assert 0 < report['baseline'] <= 1
+
+
+def test_single_class_holdout_keeps_every_column():
+    model, X, y = pump_dataset()
+    pruner = FeaturePruner(candidate_k=(8, 12))
+    # No positives in the holdout: PR-AUC is undefined, so no candidate can be validated
+    test_start = len(X) - int(len(X) * pruner.test_size)
+    y = y.copy()
+    y.iloc[test_start:] = 0
+
+    columns, report = pruner.select(model, X, y, train_params={'n_estimators': 20})
+
+    assert columns == list(X.columns)
+    assert report['selected'] == len(X.columns)
+    assert report['baseline'] is None and report['trials'] == []
@@ -0,0 +1,55 @@
+import numpy as np
+
+from src.feature_engineering.feature_store import FeatureStore
+from src.feature_engineering.market_features import MarketFeatureExtractor
+
+
+class CountingExtractor:
+    def __init__(self):
+        self.extractor = MarketFeatureExtractor()
+        self.rows = []
+
+    def __call__(self, candles):
+        self.rows.append(len(candles))
+        return self.extractor.extract_all_features(candles)
+
+
+def test_stored_days_are_reused_when_window_starts_mid_day(tmp_path, make_candles):
+    store = FeatureStore(str(tmp_path))
+    # 2024-01-01 12:00 .. 2024-01-04 06:00: partial, complete, complete, partial
+    candles = make_candles(3 * 1440, start='2024-01-01 12:00')
+
+    first = CountingExtractor()
+    built = store.load_or_build('BTC/USDT', '1m', candles, first, warmup=100)
+    assert store.list_partitions('BTC/USDT', '1m') == ['2024-01-02', '2024-01-03']
+    assert len(built) == len(candles) - 100
+    assert built['timestamp'].iloc[0] == candles['timestamp'].iloc[100]
+
+    # Later fetch: starts at 18:00 and runs to 2024-01-04 18:00
+    later = make_candles(3 * 1440 + 360, start='2024-01-01 12:00').iloc[360:].reset_index(drop=True)
+    second = CountingExtractor()
+    rebuilt = store.load_or_build('BTC/USDT', '1m', later, second, warmup=100)
+
+    # Only the partial days are computed: the leading one in full, the trailing one from its warm-up rows
+    assert second.rows == [360, 100 + 1080]
+    assert len(rebuilt) == len(later) - 100
+    assert rebuilt['timestamp'].iloc[0] == later['timestamp'].iloc[100]
+    assert rebuilt['timestamp'].iloc[-1] == later['timestamp'].iloc[-1]
+    assert rebuilt['timestamp'].is_monotonic_increasing and rebuilt['timestamp'].is_unique
+
+    stored_day = built[built['timestamp'].dt.strftime('%Y-%m-%d') == '2024-01-03'].reset_index(drop=True)
+    reused_day = rebuilt[rebuilt['timestamp'].dt.strftime('%Y-%m-%d') == '2024-01-03'].reset_index(drop=True)
+    np.testing.assert_allclose(
+        reused_day[stored_day.columns[1:]].to_numpy(dtype=float),
+        stored_day[stored_day.columns[1:]].to_numpy(dtype=float)
+    )
+
+
+def test_window_without_complete_day_is_computed(tmp_path, make_candles):
+    store = FeatureStore(str(tmp_path))
+    candles = make_candles(500, start='2024-01-01 12:00')
+    extract = CountingExtractor()
+    features = store.load_or_build('BTC/USDT', '1m', candles, extract)
+
+    assert len(features) == len(candles) - 100
+    assert store.list_partitions('BTC/USDT', '1m') == []
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from src.models.fused_scorer import FusedScorer
+from src.models.pump_detector import PumpDetectorModel
+from src.models.prediction_cache import PredictionCache
+from tests.conftest import synthetic_features, trained_models
+
+
+@pytest.fixture(scope='module')
+def scoring_setup():
+    features = synthetic_features()
+    pump_detector, exit_predictor = trained_models(features)
+    rows = features.dropna().tail(600)
+    return rows, {'pump_detector': pump_detector, 'exit_predictor': exit_predictor}
+
+
+def separate_scores(rows, models):
+    return {name: model.predict_proba(rows[model.feature_columns]) for name, model in models.items()}
+
+
+@pytest.mark.parametrize('options', [
+    {},
+    {'concurrent_min_rows': 1},
+    {'compiled_max_rows': 0},
+    {'prediction_cache': PredictionCache()}
+], ids=['sequential', 'concurrent', 'native', 'cached'])
+def test_fused_scores_match_separate_model_calls(scoring_setup, options):
+    rows, models = scoring_setup
+    scorer = FusedScorer(**options)
+    expected = separate_scores(rows, models)
+
+    for _ in range(2):
+        result = scorer.score(rows, models)
+        assert list(result.columns) == list(models) and result.index.equals(rows.index)
+        for name in models:
+            np.testing.assert_allclose(result[name].to_numpy(), expected[name], rtol=1e-6, atol=1e-9)
+    scorer.shutdown()
+
+
+def test_conflicting_column_orders_still_match(scoring_setup):
+    rows, models = scoring_setup
+    # A model trained on the pump detector's columns in reverse order cannot read a contiguous slice
+    reversed_model = PumpDetectorModel(pump_threshold=0.002)
+    X, y = reversed_model.build_dataset(synthetic_features())
+    reversed_model.feature_columns = list(reversed(reversed_model.feature_columns))
+    reversed_model.train(X[reversed_model.feature_columns], y, params={'n_estimators': 20})
+    conflicting = {'pump_detector': models['pump_detector'], 'reversed': reversed_model}
+
+    union, selectors = FusedScorer.plan_layout({name: model.feature_columns for name, model in conflicting.items()})
+    assert isinstance(selectors['pump_detector'], slice)
+    assert [union[i] for i in selectors['reversed']] == reversed_model.feature_columns
+
+    expected = separate_scores(rows, conflicting)
+    result = FusedScorer().score(rows, conflicting, index=np.arange(len(rows)) + 1000)
+    assert result.index[0] == 1000
+    for name in conflicting:
+        np.testing.assert_allclose(result[name].to_numpy(), expected[name], rtol=1e-6, atol=1e-9)
+
+
+def test_untrained_models_get_the_default_probability(scoring_setup):
+    rows, models = scoring_setup
+    result = FusedScorer(default_prob=0.5).score(
+        rows.head(3), {'pump_detector': PumpDetectorModel(), 'exit_predictor': models['exit_predictor']}
+    )
+    assert (result['pump_detector'] == 0.5).all()
+    np.testing.assert_allclose(
+        result['exit_predictor'].to_numpy(),
+        models['exit_predictor'].predict_proba(rows.head(3)[models['exit_predictor'].feature_columns]),
+        rtol=1e-6
+    )
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from src.models.hyperparameter_search import HyperparameterSearch
+
+
+class QualityModel:
+    """Stand-in model whose validation ranking improves with its 'quality' param."""
+
+    DEFAULT_PARAMS = {'quality': 0.1, 'n_estimators': 100}
+    SEARCH_SPACE = {'quality': [0.0, 0.2, 0.4, 0.6, 0.8, 1.0]}
+
+    def __init__(self, lookahead_period: int = 5):
+        self.lookahead_period = lookahead_period
+        self.feature_columns = ['signal', 'noise']
+        self.quality = None
+
+    def get_params(self):
+        return {'lookahead_period': self.lookahead_period}
+
+    def train(self, X_train, y_train, X_val, y_val, params=None, early_stopping_rounds=None, deadline=None):
+        self.quality = params['quality']
+        return {'best_iteration': params['n_estimators'] // 2 - 1}
+
+    def predict_proba(self, features):
+        return self.quality * features['signal'].to_numpy() + features['noise'].to_numpy()
+
+
+def search_data(n: int = 4000, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    y = pd.Series((rng.random(n) < 0.2).astype(int))
+    X = pd.DataFrame({'signal': y.astype(float), 'noise': rng.random(n)})
+    return X, y
+
+
+def test_successive_halving_keeps_the_best_configuration():
+    X, y = search_data()
+    search = HyperparameterSearch(
+        n_trials=7, budget_seconds=120, min_rounds=10, max_rounds=90, eta=3, max_workers=2
+    )
+    best_params, summary = search.search(QualityModel(), X, y)
+
+    assert [(rung['rounds'], rung['trials']) for rung in summary['rungs']] == [(10, 7), (30, 2), (90, 1)]
+    assert all(rung['completed'] for rung in summary['rungs'])
+    assert best_params == {'quality': 1.0, 'n_estimators': 45}
+    assert summary['best']['pr_auc'] == 1.0
+    assert summary['leaderboard'][0]['params'] == {'quality': 1.0}
+
+
+def test_sampled_configurations_are_distinct_and_include_defaults():
+    configs = HyperparameterSearch(n_trials=7).sample_configs(QualityModel.SEARCH_SPACE)
+
+    assert configs[0] == {}
+    assert sorted(config['quality'] for config in configs[1:]) == QualityModel.SEARCH_SPACE['quality']
@@ -0,0 +1,18 @@
+from src.models.incremental import IncrementalUpdater
+
+
+def test_failed_rebuilds_back_off_until_one_succeeds():
+    updater = IncrementalUpdater(rebuild_cooldown=60, max_rebuild_cooldown=200)
+    assert updater.can_start_rebuild(now=0)
+
+    assert updater.rebuild_finished(False, now=0) == 60
+    assert not updater.can_start_rebuild(now=59)
+    assert updater.can_start_rebuild(now=60)
+
+    assert updater.rebuild_finished(False, now=60) == 120
+    assert updater.rebuild_finished(False, now=180) == 200
+    assert not updater.can_start_rebuild(now=379)
+
+    assert updater.rebuild_finished(True, now=380) == 0
+    assert updater.can_start_rebuild(now=380)
+    assert updater.failed_rebuilds == 0
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.feature_engineering.market_features import MarketFeatureExtractor
+from src.models.exit_predictor import ExitPredictorModel
+from src.models.labels import LabelEngine, binary_labels
+from src.models.pump_detector import PumpDetectorModel
+
+
+def test_triple_barrier_labels_train_binary_models(make_candles):
+    df = MarketFeatureExtractor().extract_all_features(make_candles(2000))
+    barrier = LabelEngine(horizons=(15,)).compute(df).triple_barrier(0.003, 0.003, 15)
+    assert {-1.0, 1.0} <= set(barrier.dropna().unique())
+
+    _, pump_y = PumpDetectorModel().build_dataset(df, barrier)
+    _, exit_y = ExitPredictorModel().build_dataset(df, barrier)
+
+    assert set(pump_y.unique()) == {0, 1}
+    assert set(exit_y.unique()) == {0, 1}
+    assert (pump_y == (barrier[pump_y.index] == 1)).all()
+    assert (exit_y == (barrier[exit_y.index] == -1)).all()
+
+
+def test_binary_labels_pass_through_and_reject_other_values():
+    labels = pd.Series([0.0, 1.0, np.nan, 1.0], name='reaches_0.2_15')
+    pd.testing.assert_series_equal(binary_labels(labels, 1.0), labels)
+
+    with pytest.raises(ValueError):
+        binary_labels(pd.Series([0.01, -0.02, 0.5]), 1.0)
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import random
+
+from src.trading.market_scanner import MarketScanner
+
+
+def make_evaluate(delays: random.Random):
+    """Evaluator that takes a few event-loop turns per scan and tags each signal with its round."""
+    rounds = {'n': 0}
+
+    async def evaluate(symbols):
+        rounds['n'] += 1
+        current = rounds['n']
+        signals = []
+        for rank, symbol in enumerate(symbols):
+            await asyncio.sleep(delays.random() * 0.002)
+            signals.append({'symbol': symbol, 'round': current, 'rank': rank})
+        if current % 5 == 0:
+            raise RuntimeError('exchange unavailable')
+        return {'signals': signals, 'missing': []}
+
+    return evaluate
+
+
+def check_consistent(scanner: MarketScanner):
+    snapshot = scanner.snapshot
+    encoded = json.loads(scanner.snapshot_json)
+    signals = snapshot['signals']
+
+    assert encoded['scan_id'] == snapshot['scan_id']
+    assert encoded.get('signals', []) == signals
+    assert len({item['round'] for item in signals}) <= 1
+    if snapshot['scan_id']:
+        assert snapshot['universe_size'] == len(signals)
+    for item in signals:
+        assert scanner.get_signal(item['symbol']) is item
+    return snapshot['scan_id']
+
+
+def test_readers_never_see_a_mixed_snapshot_during_scans():
+    universes = [['AAA', 'BBB', 'CCC'], ['BBB', 'DDD'], ['EEE', 'AAA', 'FFF', 'GGG']]
+    scanner = MarketScanner(make_evaluate(random.Random(0)), universes[0])
+    published = []
+
+    async def listener(snapshot):
+        published.append(snapshot['scan_id'])
+        assert scanner.snapshot is snapshot
+        await asyncio.sleep(0)
+
+    scanner.add_listener(listener)
+
+    async def main():
+        seen = []
+        done = asyncio.Event()
+
+        async def reader():
+            while not done.is_set():
+                seen.append(check_consistent(scanner))
+                await asyncio.sleep(0)
+
+        async def writer():
+            for i in range(20):
+                scan = asyncio.create_task(scanner.scan_once())
+                await asyncio.sleep(0.001)
+                # Takes effect from the next scan, never the one in flight
+                scanner.set_universe(universes[i % len(universes)])
+                await scan
+            done.set()
+
+        await asyncio.gather(writer(), *(reader() for _ in range(4)))
+        return seen
+
+    seen = asyncio.run(main())
+
+    assert scanner.scans == 16 and scanner.failures == 4
+    assert published == list(range(1, 17))
+    assert seen == sorted(seen) and seen[-1] == 16
+    check_consistent(scanner)
+    # Symbols dropped from the universe are no longer served
+    assert scanner.get_signal('CCC') is None
+    assert scanner.get_stats()['signals'] == len(scanner.snapshot['signals'])
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.models.model_registry import ModelRegistry
+from tests.conftest import synthetic_features, trained_models
+
+
+def test_activate_and_roll_back(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    assert registry.load('pump_detector') is None
+
+    first, _ = trained_models(synthetic_features(seed=1))
+    second, _ = trained_models(synthetic_features(seed=2))
+    v1 = registry.register('pump_detector', first, metrics={'pr_auc': 0.1}, activate=True)
+    v2 = registry.register('pump_detector', second, activate=True)
+
+    assert [meta['version'] for meta in registry.list_versions('pump_detector')] == [v2, v1]
+    assert registry.get_active_version('pump_detector') == v2
+
+    X = synthetic_features(seed=3)[first.feature_columns].dropna().to_numpy()
+    registry.activate('pump_detector', v1)
+    rolled_back = registry.load('pump_detector')
+
+    assert registry.get_active_version('pump_detector') == v1
+    assert rolled_back.version == v1
+    assert registry.get_metadata('pump_detector', v1)['metrics'] == {'pr_auc': 0.1}
+    np.testing.assert_allclose(rolled_back.predict_proba(X), first.predict_proba(X), atol=1e-6)
+    assert not np.allclose(rolled_back.predict_proba(X), second.predict_proba(X))
+
+
+def test_unknown_versions_and_models_are_rejected(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    pump_detector, _ = trained_models(synthetic_features())
+    version = registry.register('pump_detector', pump_detector)
+
+    assert registry.get_active_version('pump_detector') is None
+    with pytest.raises(ValueError):
+        registry.activate('pump_detector', 'no-such-version')
+    with pytest.raises(ValueError):
+        registry.register('sentiment_model', pump_detector)
+    assert registry.load('pump_detector', version).version == version
+
+
+def test_activate_endpoint_hot_swaps_serving_model(server_module, tmp_path, monkeypatch):
+    registry = ModelRegistry(str(tmp_path))
+    monkeypatch.setattr(server_module, 'model_registry', registry)
+    first, _ = trained_models(synthetic_features(seed=1))
+    v1 = registry.register('pump_detector', first)
+    registry.register('pump_detector', trained_models(synthetic_features(seed=2))[0], activate=True)
+    client = TestClient(server_module.app)
+
+    response = client.post('/api/models/activate', json={'model': 'pump_detector', 'version': v1})
+
+    assert response.status_code == 200
+    assert server_module.serving_models()['pump_detector'].version == v1
+    assert client.get('/api/models/versions').json()['pump_detector']['serving'] == v1
+    assert client.post('/api/models/activate', json={'model': 'pump_detector', 'version': 'nope'}).status_code == 404
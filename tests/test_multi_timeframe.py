@@ -0,0 +1,29 @@
+from src.feature_engineering.market_features import MarketFeatureExtractor
+from src.feature_engineering.multi_timeframe import MultiTimeframeFeatureBuilder
+
+
+def test_full_history_gets_higher_timeframe_columns(make_candles):
+    candles = make_candles(3000)
+    builder = MultiTimeframeFeatureBuilder(
+        MarketFeatureExtractor(),
+        timeframes=['5m'],
+        max_base_candles=len(candles),
+        feature_window=None
+    )
+    builder.update('BTC/USDT', candles)
+    features = builder.build_features('BTC/USDT')
+
+    assert len(features) == len(candles)
+    # Only the 5m indicators' own warm-up may be missing, not everything before the last 200 bars
+    assert features['close_5m'].notna().sum() > len(candles) - 10
+    assert features['rsi_5m'].notna().sum() > len(candles) - 200 * 5
+
+
+def test_feature_window_limits_serving_rows(make_candles):
+    candles = make_candles(3000)
+    builder = MultiTimeframeFeatureBuilder(MarketFeatureExtractor(), timeframes=['5m'], feature_window=200)
+    builder.update('BTC/USDT', candles)
+    features = builder.build_features('BTC/USDT')
+
+    assert features['close_5m'].notna().sum() <= 200 * 5 + 5
+    assert features['close_5m'].notna().iloc[-1]
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from src.feature_engineering.order_book_features import OrderBookFeatureExtractor, OrderBookHistory
+
+BOOK = {
+    'timestamp': 1_700_000_000_000,
+    'bids': [[99.8, 1.0], [99.4, 2.0]],
+    'asks': [[100.2, 3.0], [100.7, 4.0]]
+}
+
+
+def test_imbalance_depth_and_microprice():
+    features = OrderBookFeatureExtractor().extract_from_books([BOOK]).iloc[0]
+
+    assert features['mid_price'] == pytest.approx(100.0)
+    assert features['spread'] == pytest.approx(0.4 / 99.8)
+    assert features['imbalance_l1'] == pytest.approx((1 - 3) / 4)
+    assert features['imbalance_l5'] == pytest.approx((3 - 7) / 10)
+    assert features['order_book_imbalance'] == pytest.approx((3 - 7) / 10)
+    # 20 bps touch, 60/70 bps second level
+    assert (features['bid_depth_10bps'], features['ask_depth_10bps']) == (0.0, 0.0)
+    assert (features['bid_depth_25bps'], features['ask_depth_25bps']) == (1.0, 3.0)
+    assert (features['bid_depth_100bps'], features['ask_depth_100bps']) == (3.0, 7.0)
+    assert features['depth_imbalance_100bps'] == pytest.approx((3 - 7) / 10)
+    assert features['microprice'] == pytest.approx((99.8 * 3 + 100.2 * 1) / 4)
+
+
+def test_one_sided_and_empty_books():
+    books = [
+        BOOK,
+        {'timestamp': BOOK['timestamp'] + 1000, 'bids': BOOK['bids'], 'asks': []},
+        {'timestamp': BOOK['timestamp'] + 2000, 'bids': [], 'asks': []}
+    ]
+    features = OrderBookFeatureExtractor().extract_from_books(books)
+
+    assert len(features) == 3
+    one_sided, empty = features.iloc[1], features.iloc[2]
+    assert np.isnan(one_sided['spread']) and np.isnan(one_sided['microprice'])
+    assert one_sided['bid_volume'] == 3.0 and one_sided['ask_volume'] == 0.0
+    assert one_sided['imbalance_l5'] == pytest.approx(1.0)
+    assert np.isnan(empty['spread'])
+    assert empty['imbalance_l5'] == 0.0
+    assert OrderBookFeatureExtractor().extract_from_books([]).empty
+
+
+def test_history_records_two_sided_books_and_bounds_length():
+    history = OrderBookHistory(max_snapshots=2)
+
+    assert not history.record('BTC/USDT', {'bids': BOOK['bids'], 'asks': []})
+    for i in range(3):
+        assert history.record('BTC/USDT', {**BOOK, 'timestamp': BOOK['timestamp'] + i * 1000})
+
+    features = history.features('BTC/USDT')
+    assert len(features) == 2
+    assert features['timestamp'].iloc[0].value // 10**6 == BOOK['timestamp'] + 1000
+    latest = history.latest('BTC/USDT')
+    assert latest['imbalance_l1'] == pytest.approx(-0.5)
+    assert history.latest('ETH/USDT') is None
+    assert history.get_stats() == {'symbols': 1, 'snapshots': 2, 'max_snapshots': 2}
@@ -0,0 +1,50 @@
+import pytest
+
+from src.feature_engineering.market_features import MarketFeatureExtractor
+from src.models.signal_generator import SignalGenerator
+from src.trading.backtester import Backtester
+from src.trading.parameter_sweep import ParameterSweep
+from tests.conftest import synthetic_candles, synthetic_features, trained_models
+
+GRID = {'pump_threshold': [0.4, 0.6], 'exit_threshold': [0.5, 0.8], 'stop_loss_pct': [0.01, 0.15]}
+METRICS = {
+    'total_return': 'total_return',
+    'max_drawdown': 'max_drawdown',
+    'sharpe': 'sharpe',
+    'trades': 'total_trades',
+    'win_rate': 'win_rate',
+    'exposure': 'exposure'
+}
+
+
+def test_sweep_matches_sequential_backtests():
+    pump_detector, exit_predictor = trained_models(synthetic_features())
+    bars = Backtester(pump_detector, exit_predictor, MarketFeatureExtractor()).prepare(synthetic_candles(2000, seed=7))
+    progress = []
+
+    table = ParameterSweep(max_workers=2, fee_rate=0.0005).run(
+        bars, GRID, 'TEST', lambda done, total: progress.append((done, total))
+    )
+
+    assert len(table) == 8 and progress[-1] == (8, 8)
+    assert table['sharpe'].is_monotonic_decreasing
+    assert table['trades'].sum() > 0
+    for row in table.to_dict(orient='records'):
+        sequential = Backtester(
+            None,
+            None,
+            signal_generator=SignalGenerator(pump_threshold=row['pump_threshold'], exit_threshold=row['exit_threshold']),
+            risk_params={'stop_loss_pct': row['stop_loss_pct']},
+            fee_rate=0.0005
+        ).run_prepared(bars, 'TEST')['metrics']
+        for column, metric in METRICS.items():
+            assert row[column] == pytest.approx(sequential[metric], nan_ok=True), (row, column)
+
+
+def test_unknown_parameters_are_rejected():
+    with pytest.raises(ValueError, match='Unknown sweep parameters'):
+        ParameterSweep.expand_grid({'pump_threshold': [0.5], 'leverage': [2]})
+    assert ParameterSweep.expand_grid({'pump_threshold': [0.5, 0.7], 'max_position_size': [0.1]}) == [
+        {'pump_threshold': 0.5, 'max_position_size': 0.1},
+        {'pump_threshold': 0.7, 'max_position_size': 0.1}
+    ]
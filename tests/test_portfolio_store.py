@@ -0,0 +1,128 @@
+import asyncio
+import copy
+
+import pytest
+
+from src.trading.portfolio import Portfolio
+from src.trading.portfolio_store import PortfolioStore
+
+
+class Cursor:
+    def __init__(self, docs, delay):
+        self.docs = docs
+        self.delay = delay
+
+    def sort(self, key, direction):
+        self.docs.sort(key=lambda doc: doc[key], reverse=direction < 0)
+        return self
+
+    async def to_list(self, length):
+        await asyncio.sleep(self.delay)
+        return self.docs
+
+
+class Collection:
+    """Just enough of a motor collection for PortfolioStore."""
+
+    def __init__(self):
+        self.docs = []
+        self.delay = 0.0
+
+    async def create_index(self, keys, unique=False):
+        pass
+
+    async def insert_many(self, docs, ordered=True):
+        await asyncio.sleep(self.delay)
+        self.docs.extend(copy.deepcopy(docs))
+
+    async def find_one(self, query):
+        return next((copy.deepcopy(doc) for doc in self.docs if doc['user_id'] == query['user_id']), None)
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.docs = [d for d in self.docs if d['user_id'] != query['user_id']] + [copy.deepcopy(doc)]
+
+    def find(self, query):
+        return Cursor([copy.deepcopy(doc) for doc in self.docs if doc['seq'] > query['seq']['$gt']], self.delay)
+
+
+class Database:
+    def __init__(self):
+        self.portfolio_journal = Collection()
+        self.portfolio = Collection()
+
+
+def trade(portfolio, count):
+    for i in range(count):
+        portfolio.open_position(f'S{i}', 1.0, 10.0)
+        portfolio.close_position(f'S{i}', 12.0 if i % 2 == 0 else 9.0)
+
+
+def test_restore_round_trip_from_snapshot_and_journal_tail():
+    async def main():
+        db = Database()
+        portfolio = Portfolio()
+        store = PortfolioStore(db, snapshot_every=1000)
+        await store.restore(portfolio)
+
+        trade(portfolio, 15)
+        await store.persist(force_snapshot=True)
+        portfolio.open_position('OPEN', 2.0, 5.0)
+        portfolio.update_position_price('OPEN', 6.0)
+        await store.flush()
+
+        restored = Portfolio()
+        restored_store = PortfolioStore(db)
+        info = await restored_store.restore(restored)
+        return db, portfolio, restored, restored_store, info
+
+    db, portfolio, restored, restored_store, info = asyncio.run(main())
+
+    assert info == {'seq': 31, 'snapshot': True, 'replayed': 1}
+    assert len(db.portfolio.docs[0]['trade_history']) == 10
+    assert restored.cash == pytest.approx(portfolio.cash)
+    assert list(restored.positions) == ['OPEN']
+    assert restored.get_metrics()['win_rate'] == portfolio.get_metrics()['win_rate']
+    assert restored.get_metrics()['total_trades'] == 15
+    assert restored.trade_history[-1]['symbol'] == 'OPEN'
+    assert restored_store.seq == 31
+
+
+def test_timed_out_restore_leaves_portfolio_untouched():
+    async def main():
+        db = Database()
+        portfolio = Portfolio()
+        store = PortfolioStore(db)
+        await store.restore(portfolio)
+        trade(portfolio, 3)
+        await store.persist(force_snapshot=True)
+
+        db.portfolio_journal.delay = 0.5  # the snapshot is in, the journal tail is not
+        live = Portfolio()
+        live.open_position('LIVE', 1.0, 10.0)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(PortfolioStore(db).restore(live), timeout=0.05)
+        return live
+
+    live = asyncio.run(main())
+    assert list(live.positions) == ['LIVE']
+    assert len(live.trade_history) == 1
+
+
+def test_close_requeues_batch_interrupted_mid_insert():
+    async def main():
+        db = Database()
+        portfolio = Portfolio()
+        store = PortfolioStore(db, flush_interval=0.01)
+        await store.restore(portfolio)
+        store.start()
+
+        db.portfolio_journal.delay = 0.2
+        trade(portfolio, 2)
+        await asyncio.sleep(0.05)  # the background flush is now inside insert_many
+        db.portfolio_journal.delay = 0.0
+        await store.close()
+        return db, store
+
+    db, store = asyncio.run(main())
+    assert [doc['seq'] for doc in db.portfolio_journal.docs] == [1, 2, 3, 4]
+    assert store.get_stats()['pending'] == 0
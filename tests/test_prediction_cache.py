@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from src.models.prediction_cache import PredictionCache
+
+
+class CountingPredict:
+    """Scores rows of X by their sum and records which row indices it was asked for."""
+
+    def __init__(self, X):
+        self.X = np.asarray(X, dtype=np.float64)
+        self.calls = []
+
+    def __call__(self, missing):
+        self.calls.append(list(missing))
+        return self.X[missing].sum(axis=1)
+
+
+def test_identical_rows_hit_and_changed_rows_miss():
+    cache = PredictionCache()
+    X = np.arange(12, dtype=float).reshape(4, 3)
+    predict = CountingPredict(X)
+
+    first = cache.get_or_predict('v1', X, predict)
+    again = cache.get_or_predict('v1', X.copy(), CountingPredict(X))
+    np.testing.assert_array_equal(first, X.sum(axis=1))
+    np.testing.assert_array_equal(again, first)
+    assert predict.calls == [[0, 1, 2, 3]]
+
+    # One ulp of change in one value is a new fingerprint; the other rows still hit
+    changed = X.copy()
+    changed[2, 1] = np.nextafter(changed[2, 1], np.inf)
+    repredict = CountingPredict(changed)
+    probs = cache.get_or_predict('v1', changed, repredict)
+    assert repredict.calls == [[2]]
+    np.testing.assert_array_equal(probs, changed.sum(axis=1))
+
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (7, 5, 5)
+
+
+def test_model_version_is_part_of_the_key():
+    cache = PredictionCache()
+    X = np.array([[1.0, 1.0, 1.0], [2.0, 2.0, 2.0]])
+    cache.get_or_predict('v1', X, CountingPredict(X))
+    other = CountingPredict(X)
+    cache.get_or_predict('v2', X, other)
+    assert other.calls == [[0, 1]]
+    assert cache.get_stats()['entries'] == 4
+
+
+def test_failed_prediction_is_not_cached():
+    cache = PredictionCache()
+    X = np.ones((1, 3))
+    assert cache.get_or_predict('v1', X, lambda missing: None) is None
+    assert cache.get_stats()['entries'] == 0
+    np.testing.assert_array_equal(cache.get_or_predict('v1', X, CountingPredict(X)), [3.0])
+
+
+def test_newer_candle_clears_and_lru_evicts():
+    cache = PredictionCache(max_entries=2)
+    rows = [np.full((1, 3), float(i)) for i in range(3)]
+    for row in rows:
+        cache.get_or_predict('v1', row, CountingPredict(row))
+    assert cache.get_stats()['evictions'] == 1
+    # The oldest row was evicted, the newest two are still served from the cache
+    oldest = CountingPredict(rows[0])
+    cache.get_or_predict('v1', rows[0], oldest)
+    assert oldest.calls == [[0]]
+
+    now = pd.Timestamp('2024-01-01 00:05')
+    cache.observe_candle(now)
+    cache.observe_candle(now)
+    cache.observe_candle(now - pd.Timedelta(minutes=1))
+    assert cache.get_stats()['entries'] == 2
+    cache.observe_candle(now + pd.Timedelta(minutes=1))
+    stats = cache.get_stats()
+    assert stats['entries'] == 0 and stats['clears'] == 1
@@ -0,0 +1,41 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from src.models.signal_generator import SignalGenerator
+
+# Probabilities on and around every threshold the rules compare against
+PROBS = [0.0, 0.2, 0.4999, 0.5, 0.5999, 0.6, 0.6999, 0.7, 0.9, 1.0]
+
+
+def grid():
+    rows = list(itertools.product(PROBS, PROBS, [False, True], [0.0, 0.5, 0.8], [False, True], [False, True]))
+    return [np.array(column) for column in zip(*rows)]
+
+
+@pytest.mark.parametrize('thresholds', [{}, {'pump_threshold': 0.5, 'exit_threshold': 0.9}])
+def test_generate_signals_matches_scalar_rules_row_by_row(thresholds):
+    generator = SignalGenerator(**thresholds)
+    pump, exit_, position, sentiment, surge, whale = grid()
+
+    signals = generator.generate_signals(pump, exit_, position, sentiment, surge, whale)
+
+    assert signals.shape == pump.shape
+    for i in range(len(pump)):
+        expected = generator.generate_signal(pump[i], exit_[i], bool(position[i]))
+        assert generator.format_signal(signals, i, pump[i], exit_[i]) == expected
+        assert signals['confidence'][i] == expected['confidence']
+        assert signals['score'][i] == pytest.approx(
+            generator.score_opportunity(pump[i], exit_[i], sentiment[i], bool(surge[i]), bool(whale[i])), abs=1e-12
+        )
+
+
+def test_scalar_inputs_broadcast_against_pump_probs():
+    generator = SignalGenerator()
+    pump = np.array([0.1, 0.8, 0.95])
+
+    signals = generator.generate_signals(pump, 0.3, has_position=False, volume_surge=True)
+
+    assert [generator.ACTIONS[a] for a in signals['action']] == ['hold', 'buy', 'buy']
+    np.testing.assert_allclose(signals['score'], [generator.score_opportunity(p, 0.3, volume_surge=True) for p in pump])
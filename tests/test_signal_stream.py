@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+from src.trading.signal_stream import SignalStream
+
+
+def snapshot(scan_id, signals):
+    return {
+        'scan_id': scan_id,
+        'timestamp': f'2024-01-01T00:0{scan_id}:00',
+        'signals': [
+            {'symbol': symbol, 'signal': {'action': action, 'confidence': 0.8}, 'current_price': price}
+            for symbol, action, price in signals
+        ]
+    }
+
+
+def test_subscribe_replays_only_current_scan():
+    stream = SignalStream()
+    stream.diff(snapshot(1, [('AAA', 'BUY', 1.0), ('BBB', 'BUY', 2.0)]))
+    stream.diff(snapshot(2, [('AAA', 'BUY', 1.5)]))
+
+    messages = [json.loads(m) for m in stream.subscribe('ws', ['AAA', 'BBB'])]
+
+    assert [m['symbol'] for m in messages] == ['AAA']
+    assert messages[0]['scan_id'] == 2
+    assert messages[0]['current_price'] == 1.5
+
+
+def test_slow_subscriber_does_not_block_others():
+    stream = SignalStream()
+    stream.subscribe('slow', ['AAA'])
+    stream.subscribe('fast', ['AAA'])
+    received = []
+
+    async def send(connection, message):
+        if connection == 'slow':
+            await asyncio.sleep(0.2)
+        received.append((connection, asyncio.get_running_loop().time()))
+
+    async def main():
+        start = asyncio.get_running_loop().time()
+        await stream.publish(snapshot(1, [('AAA', 'BUY', 1.0)]), send)
+        return start
+
+    start = asyncio.run(main())
+    assert received[0][0] == 'fast'
+    assert received[0][1] - start < 0.1
+    assert stream.pushes == 2
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from src.feature_engineering.feature_store import FeatureStore
+from src.feature_engineering.market_features import MarketFeatureExtractor
+from src.models.pump_detector import PumpDetectorModel
+from src.models.streaming_dataset import PartitionDataset, split_partitions
+
+
+def stored_features(tmp_path, make_candles, days: int = 5, warmup: int = 100):
+    """A feature store holding `days` complete days of one symbol, plus the same features in memory."""
+    store = FeatureStore(str(tmp_path))
+    candles = make_candles(warmup + days * 1440, start='2023-12-31 22:20')
+    features = store.load_or_build('BTC/USDT', '1m', candles, MarketFeatureExtractor().extract_all_features, warmup=warmup)
+    return store, features.reset_index(drop=True)
+
+
+def in_memory_dataset(model, features: pd.DataFrame, days):
+    frame = features[features['timestamp'].dt.strftime('%Y-%m-%d').isin(days)].reset_index(drop=True)
+    X, y = model.build_dataset(frame)
+    return X.astype(np.float32), y
+
+
+def test_partition_chunks_match_the_in_memory_dataset(tmp_path, make_candles):
+    store, features = stored_features(tmp_path, make_candles)
+    train_chunks, validation_chunks, window = split_partitions(store, ['BTC/USDT'], validation_fraction=0.2)
+    assert [chunk[1] for chunk in train_chunks] == ['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04']
+    assert [chunk[1] for chunk in validation_chunks] == ['2024-01-05']
+    # The last training day does not borrow label rows from the validation day
+    assert train_chunks[-1][2] is None and window['validation_start'] == '2024-01-05'
+
+    model = PumpDetectorModel(pump_threshold=0.002)
+    train_set = PartitionDataset(store, model, train_chunks)
+    X_train, y_train = in_memory_dataset(PumpDetectorModel(pump_threshold=0.002), features, [c[1] for c in train_chunks])
+
+    streamed = np.concatenate([train_set.load_chunk(i)[0] for i in range(len(train_chunks))])
+    assert train_set.feature_columns == list(X_train.columns)
+    np.testing.assert_array_equal(streamed, X_train.to_numpy())
+    np.testing.assert_array_equal(train_set.labels(), y_train.to_numpy())
+    assert len(train_set) == len(y_train)
+
+
+def test_streaming_training_matches_in_memory_training(tmp_path, make_candles):
+    store, features = stored_features(tmp_path / 'store', make_candles)
+    train_chunks, validation_chunks, _ = split_partitions(store, ['BTC/USDT'], validation_fraction=0.2)
+    params = {'n_estimators': 30, 'max_depth': 3, 'n_jobs': 1}
+
+    streaming = PumpDetectorModel(pump_threshold=0.002)
+    train_set = PartitionDataset(store, streaming, train_chunks)
+    metrics = streaming.train_streaming(train_set, params=params, cache_dir=str(tmp_path))
+    assert metrics['train_rows'] == len(train_set)
+
+    in_memory = PumpDetectorModel(pump_threshold=0.002)
+    X_train, y_train = in_memory_dataset(in_memory, features, [c[1] for c in train_chunks])
+    X_val, _ = in_memory_dataset(PumpDetectorModel(pump_threshold=0.002), features, [c[1] for c in validation_chunks])
+    assert in_memory.train(X_train, y_train, params=params)
+
+    np.testing.assert_allclose(
+        streaming.predict_proba(X_val.to_numpy()), in_memory.predict_proba(X_val.to_numpy()), atol=1e-5
+    )
@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+import pytest
+
+from src.models.training_jobs import TrainingJobRunner, report_progress
+
+
+def sleeping_job(job_id, seconds, progress):
+    report_progress(progress, job_id, 'sleeping', 0.5)
+    time.sleep(seconds)
+    return {'job_id': job_id, 'slept': seconds}
+
+
+def failing_job(job_id, progress):
+    raise ValueError('no candles')
+
+
+def test_jobs_queue_run_and_finish_in_worker_process():
+    runner = TrainingJobRunner(max_workers=1)
+
+    async def main():
+        first = runner.create_job('train', {'symbol': 'A'})['job_id']
+        second = runner.create_job('train', {'symbol': 'B'})['job_id']
+        running = asyncio.create_task(runner.run_in_process(first, sleeping_job, 1.0))
+        queued = asyncio.create_task(runner.run_in_process(second, sleeping_job, 0.0))
+
+        deadline = time.time() + 60
+        while runner.get_job(first)['status'] != 'running' and time.time() < deadline:
+            await asyncio.sleep(0.05)
+        seen = runner.get_job(first), runner.get_job(second)
+
+        runner.complete(first, await running)
+        runner.complete(second, await queued)
+
+        failed = runner.create_job('train', {})['job_id']
+        with pytest.raises(ValueError):
+            await runner.run_in_process(failed, failing_job)
+        runner.fail(failed, 'no candles')
+        return first, second, failed, seen
+
+    try:
+        first, second, failed, (running_view, queued_view) = asyncio.run(main())
+    finally:
+        runner.shutdown()
+
+    assert (running_view['status'], running_view['stage'], running_view['progress']) == ('running', 'sleeping', 0.5)
+    assert queued_view['status'] == 'queued'
+    assert runner.get_job(first)['status'] == 'completed'
+    assert runner.get_job(first)['result'] == {'job_id': first, 'slept': 1.0}
+    assert runner.get_job(failed)['status'] == 'failed'
+    assert runner.get_job(failed)['error'] == 'no candles'
+    assert [job['job_id'] for job in runner.list_jobs()] == [failed, second, first]
+    assert runner.active_jobs() == []
+
+
+def test_oldest_finished_jobs_are_forgotten():
+    runner = TrainingJobRunner(max_jobs=2)
+    first = runner.create_job('train', {})['job_id']
+    runner.complete(first, {})
+    active = runner.create_job('train', {})['job_id']
+    newest = runner.create_job('sweep', {})['job_id']
+
+    assert runner.get_job(first) is None
+    assert [job['job_id'] for job in runner.active_jobs()] == [active, newest]
+    assert [job['job_id'] for job in runner.active_jobs('sweep')] == [newest]
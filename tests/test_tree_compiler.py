@@ -0,0 +1,61 @@
+import numpy as np
+
+from src.models.model_registry import ModelRegistry
+from src.models.tree_compiler import CompiledTreeEnsemble
+from tests.conftest import synthetic_features, trained_models
+
+
+def native_proba(model, X):
+    if hasattr(model.model, 'predict_proba'):
+        return model.model.predict_proba(X)[:, 1]
+    return model._booster().predict(X)
+
+
+def test_compiled_matches_native_models():
+    features = synthetic_features()
+    pump_detector, exit_predictor = trained_models(features)
+
+    for model in (pump_detector, exit_predictor):
+        assert model.compiled is not None
+        X = features[model.feature_columns].dropna()
+        np.testing.assert_allclose(model.compiled.predict_proba(X.to_numpy()), native_proba(model, X), atol=1e-5)
+
+
+def test_compiled_matches_early_stopped_and_warm_started_models():
+    features = synthetic_features()
+    pump_detector, exit_predictor = trained_models(features, early_stopping_rounds=3, params={'n_estimators': 200})
+
+    for model in (pump_detector, exit_predictor):
+        X = features[model.feature_columns].dropna()
+        assert model.compile(X.tail(500))
+        assert model.compiled.n_trees < 200
+        np.testing.assert_allclose(model.compiled.predict_proba(X.to_numpy()), native_proba(model, X), atol=1e-5)
+
+        y = (X.iloc[:, 0] > X.iloc[:, 0].median()).astype(int)
+        assert model.continue_training(X, y, n_estimators=5)
+        assert model.compiled is not None
+        np.testing.assert_allclose(model.compiled.predict_proba(X.to_numpy()), native_proba(model, X), atol=1e-5)
+
+
+def test_load_native_checks_parity_and_falls_back(tmp_path, monkeypatch):
+    features = synthetic_features()
+    pump_detector, exit_predictor = trained_models(features, early_stopping_rounds=3, params={'n_estimators': 200})
+    registry = ModelRegistry(str(tmp_path))
+
+    for name, model in (('pump_detector', pump_detector), ('exit_predictor', exit_predictor)):
+        X = features[model.feature_columns].dropna()
+        model.compile(X.tail(500))
+        registry.register(name, model, activate=True)
+
+        loaded = registry.load(name)
+        assert loaded.compiled is not None
+        np.testing.assert_allclose(loaded.predict_proba(X.to_numpy()), native_proba(model, X), atol=1e-5)
+
+    # Compiled trees that disagree with the library on the saved rows are not served
+    original = CompiledTreeEnsemble.predict_margin
+    monkeypatch.setattr(CompiledTreeEnsemble, 'predict_margin', lambda self, X: original(self, X) + 0.5)
+    for name, model in (('pump_detector', pump_detector), ('exit_predictor', exit_predictor)):
+        X = features[model.feature_columns].dropna()
+        loaded = registry.load(name)
+        assert loaded.compiled is None
+        np.testing.assert_allclose(loaded.predict_proba(X.to_numpy()), native_proba(model, X), atol=1e-6)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from src.models.validation import TimeSeriesValidator, purged_kfold_splits, ranking_metrics, walk_forward_splits
+
+
+@pytest.mark.parametrize('purge', [0, 15])
+def test_walk_forward_trains_only_on_the_past_minus_purge(purge):
+    splits = walk_forward_splits(1200, n_splits=5, purge=purge)
+
+    assert len(splits) == 5
+    previous_test_end = None
+    for train, test in splits:
+        assert len(np.intersect1d(train, test)) == 0
+        assert train.max() == test.min() - purge - 1
+        assert train.min() == 0
+        assert np.all(np.diff(test) == 1)
+        if previous_test_end is not None:
+            assert test.min() == previous_test_end + 1
+        previous_test_end = test.max()
+    assert previous_test_end == 1199
+
+
+def test_walk_forward_caps_training_window():
+    for train, test in walk_forward_splits(1200, n_splits=3, purge=10, max_train_size=100):
+        assert len(train) == 100
+        assert train.max() == test.min() - 11
+
+
+def test_purged_kfold_blocks_cover_rows_and_keep_purge_and_embargo_gaps():
+    purge, embargo = 20, 7
+    splits = purged_kfold_splits(1000, n_splits=4, purge=purge, embargo=embargo)
+
+    tests = np.concatenate([test for _, test in splits])
+    np.testing.assert_array_equal(tests, np.arange(1000))
+    for train, test in splits:
+        start, end = test.min(), test.max()
+        assert len(np.intersect1d(train, test)) == 0
+        before = train[train < start]
+        after = train[train > end]
+        assert len(before) + len(after) == len(train)
+        if len(before):
+            assert before.max() == start - purge - 1
+        if len(after):
+            assert after.min() == end + embargo + 1
+
+
+def test_validator_rejects_unknown_method_and_dispatches_splits():
+    with pytest.raises(ValueError):
+        TimeSeriesValidator(method='shuffle')
+
+    kfold = TimeSeriesValidator(method='purged_kfold', n_splits=4, embargo=5).split(400, purge=10)
+    assert [len(test) for _, test in kfold] == [100] * 4
+    walk = TimeSeriesValidator(n_splits=4).split(400, purge=10)
+    assert all(train.max() < test.min() for train, test in walk)
+
+
+def test_ranking_metrics_precision_at_top_and_single_class():
+    y = np.array([0, 0, 1, 0, 1, 0, 0, 0, 0, 0])
+    scores = np.linspace(0, 1, 10)[::-1]  # row 0 scores highest
+    scores[4] = 2.0
+
+    metrics = ranking_metrics(y, scores, top_fraction=0.1)
+    assert metrics['k'] == 1 and metrics['precision_at_k'] == 1.0
+    assert np.isnan(ranking_metrics(np.zeros(10), scores)['pr_auc'])